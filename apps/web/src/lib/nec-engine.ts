@@ -124,7 +124,23 @@ const zValues: Record<SeismicZone, number> = {
   VI: 0.5,
 };
 
-export function calculateSpectrum(input: SpectrumInput): SpectrumResult {
+export type DesignSpectrum = {
+  input: SpectrumInput;
+  z: number;
+  eta: number;
+  fa: number;
+  fd: number;
+  fs: number;
+  falloff: number;
+  t0: number;
+  tc: number;
+  tl: number;
+  sa: (period: number) => number;
+  si: (period: number) => number;
+  evaluate: (periods: ArrayLike<number>) => { sa: Float64Array; si: Float64Array };
+};
+
+export function designSpectrum(input: SpectrumInput): DesignSpectrum {
   if (input.rFactor <= 0 || input.importance <= 0 || input.phiP <= 0 || input.phiE <= 0) {
     throw new Error("Todos los factores deben ser mayores que cero.");
   }
@@ -138,24 +154,39 @@ export function calculateSpectrum(input: SpectrumInput): SpectrumResult {
   const t0 = (0.1 * fs * fd) / fa;
   const tc = (0.55 * fs * fd) / fa;
   const tl = 2.4 * fd;
+  const reduction = input.rFactor * input.phiP * input.phiE;
+
+  const sa = (period: number) => {
+    if (period > 0 && period <= t0) return z * fa * (1 + ((eta - 1) * period) / t0);
+    if (period > tc) return eta * z * fa * (tc / period) ** falloff;
+    return period > t0 ? eta * z * fa : z * fa;
+  };
+  const si = (period: number) => (input.importance * sa(period)) / reduction;
+  const evaluate = (periods: ArrayLike<number>) => {
+    const saValues = new Float64Array(periods.length);
+    const siValues = new Float64Array(periods.length);
+    for (let index = 0; index < periods.length; index += 1) {
+      saValues[index] = sa(periods[index]);
+      siValues[index] = (input.importance * saValues[index]) / reduction;
+    }
+    return { sa: saValues, si: siValues };
+  };
+
+  return { input, z, eta, fa, fd, fs, falloff, t0, tc, tl, sa, si, evaluate };
+}
+
+export function calculateSpectrum(input: SpectrumInput): SpectrumResult {
+  const spectrum = designSpectrum(input);
   const points: SpectrumPoint[] = [];
 
   for (let index = 0; index < 1000; index += 1) {
     const period = (6 * index) / 999;
-    let sa = z * fa;
-
-    if (period > 0 && period <= t0) {
-      sa = z * fa * (1 + ((eta - 1) * period) / t0);
-    } else if (period > t0 && period <= tc) {
-      sa = eta * z * fa;
-    } else if (period > tc) {
-      sa = eta * z * fa * (tc / period) ** falloff;
-    }
-
+    const sa = spectrum.sa(period);
     const se = sa;
-    const si = (input.importance * sa) / (input.rFactor * input.phiP * input.phiE);
+    const si = spectrum.si(period);
     points.push({ period, sa, se, si });
   }
 
+  const { z, eta, fa, fd, fs, falloff, t0, tc, tl } = spectrum;
   return { input, z, eta, fa, fd, fs, falloff, t0, tc, tl, points };
 }
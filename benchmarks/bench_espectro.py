@@ -0,0 +1,277 @@
+"""
+Benchmarks del motor de cálculo, las exportaciones, la gráfica y el arranque
+
+Uso:
+    python benchmarks/bench_espectro.py                          # solo mide
+    python benchmarks/bench_espectro.py --guardar baseline.json  # mide y guarda la línea base
+    python benchmarks/bench_espectro.py --comparar baseline.json # falla si alguna métrica empeora
+
+En modo comparación el proceso termina con código 1 si algún benchmark tarda
+más que la línea base multiplicada por (1 + tolerancia).
+"""
+
+import argparse
+import datetime
+import fnmatch
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(RAIZ, 'src'))
+
+# Los benchmarks no deben leer ni llenar la caché de espectros del usuario
+os.environ['ESPECTRO_NEC_CACHE'] = 'off'
+
+import matplotlib  # noqa: E402
+
+matplotlib.use('Agg')
+
+import numpy as np  # noqa: E402
+
+from espectro_nec import seismic_calculations as sc  # noqa: E402
+
+BASELINE = os.path.join(RAIZ, 'benchmarks', 'baseline.json')
+
+# Caso de referencia: la combinación por defecto de la interfaz
+ENTRADA = ('V', 'D', 'Costa (Excepto Esmeralda)', 8.0, 1.3, 1.0, 1.0)
+
+
+def medir(func, rondas=7, tiempo_ronda=0.2):
+    """
+    Mide func() con rondas de varias repeticiones, al estilo de timeit
+
+    Returns:
+        Diccionario con 'segundos' (mínimo por llamada), 'mediana' y 'llamadas'
+    """
+    func()  # calentamiento: cachés, importaciones diferidas
+    inicio = time.perf_counter()
+    func()
+    una = max(time.perf_counter() - inicio, 1e-7)
+    repeticiones = max(1, int(tiempo_ronda / una))
+
+    tiempos = []
+    for _ in range(rondas):
+        inicio = time.perf_counter()
+        for _ in range(repeticiones):
+            func()
+        tiempos.append((time.perf_counter() - inicio) / repeticiones)
+    return {'segundos': min(tiempos), 'mediana': statistics.median(tiempos), 'llamadas': rondas * repeticiones}
+
+
+def _parametros_referencia():
+    zona, suelo, region, R, I, phi_p, phi_e = ENTRADA
+    parametros, eta, Z = sc.calculate_parameters(suelo, zona, region)
+    return (Z, parametros['Fa'], parametros['Fd'], parametros['Fs'], eta, R, I, phi_p, phi_e, parametros['r'])
+
+
+def bench_motor():
+    zona, suelo, region = ENTRADA[:3]
+    factores = _parametros_referencia()
+    rng = np.random.default_rng(0)
+    n = 10_000
+    suelos = rng.integers(len(sc.SUELOS), size=n)
+    zonas = rng.integers(len(sc.ZONAS), size=n)
+    regiones = rng.integers(len(sc.REGIONES), size=n)
+    parametros, eta, Z = sc.calculate_parameters_many(suelos[:1000], zonas[:1000], regiones[:1000])
+    R = rng.choice([1, 1.5, 2.5, 3, 4, 5, 6, 7, 8], size=1000)
+    I = rng.choice([1, 1.3, 1.5], size=1000)
+
+    yield 'motor.parametros.escalar', lambda: sc.calculate_parameters(suelo, zona, region)
+    yield 'motor.parametros.lote_10000', lambda: sc.calculate_parameters_many(suelos, zonas, regiones)
+    yield 'motor.espectro.escalar', lambda: sc.calculate_spectrum(*factores)
+    yield 'motor.espectro.adaptativo', lambda: sc.calculate_spectrum(*factores, muestreo='adaptativo', tol=1e-4)
+    espectro = sc.DesignSpectrum.from_labels(suelo, zona, region, *ENTRADA[3:])
+    periodos = rng.uniform(0, 4, size=5000)
+    yield 'motor.evaluar.escalar', lambda: espectro.sa(0.73)
+    yield 'motor.evaluar.periodos_5000', lambda: espectro.evaluate(periodos)
+    yield 'motor.espectro.lote_1000', lambda: sc.calculate_spectrum_many(
+        Z, parametros['Fa'], parametros['Fd'], parametros['Fs'], eta, R, I, 1.0, 1.0, parametros['r'])
+
+    from espectro_nec import sensitivity
+    yield 'motor.barrido.9x3x10x10x6', lambda: sensitivity.parameter_sweep(suelo, sc.ZONAS, region)
+
+
+def bench_exportaciones(directorio):
+    from matplotlib.figure import Figure
+    from espectro_nec.export_utilities import write_etabs, write_excel, write_image, write_pdf_report
+
+    T, Sa, Se, Si, *_ = sc.calculate_spectrum(*_parametros_referencia())
+    zona, suelo, region, R, I, phi_p, phi_e = ENTRADA
+    fig = Figure(figsize=(8, 6))
+    ax = fig.add_subplot()
+    ax.plot(T, Sa, 'b-')
+    ax.plot(T, Si, 'r-')
+
+    def ruta(nombre):
+        return os.path.join(directorio, nombre)
+
+    yield 'exportar.etabs', lambda: write_etabs(ruta('espectro.txt'), T, Si)
+    yield 'exportar.excel', lambda: write_excel(ruta('espectro.xlsx'), T, Sa, Se, Si, zona, suelo, region, R, I,
+                                                phi_p, phi_e)
+    yield 'exportar.imagen', lambda: write_image(ruta('espectro.png'), fig)
+    yield 'exportar.pdf', lambda: write_pdf_report(ruta('reporte.pdf'), T, Sa, Se, Si, zona, suelo, region, R, I,
+                                                   phi_p, phi_e)
+    yield 'exportar.pdf_raster', lambda: write_pdf_report(ruta('reporte_raster.pdf'), T, Sa, Se, Si, zona, suelo,
+                                                          region, R, I, phi_p, phi_e, fig, vector=False)
+
+
+def bench_grafica():
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+    from espectro_nec.app import EspectroSismicoApp
+
+    # Se ejercita el código real de la aplicación sobre un lienzo Agg, sin Tk
+    app = object.__new__(EspectroSismicoApp)
+    app.fig = Figure(figsize=(8, 6))
+    app.ax = app.fig.add_subplot()
+    app.canvas = FigureCanvasAgg(app.fig)
+    app._crear_artistas()
+
+    # Igual que ENTRADA con R = 7 (mismos límites) y en zona I (límites distintos)
+    entradas = (ENTRADA, (*ENTRADA[:3], 7.0, *ENTRADA[4:]), ('I', *ENTRADA[1:]))
+    resultados = [EspectroSismicoApp.calcular_espectro(*entrada) for entrada in entradas]
+
+    def completa():
+        # Alterna entre espectros con límites distintos: fuerza canvas.draw()
+        app.actualizar_grafica(resultados[0])
+        app.actualizar_grafica(resultados[2])
+
+    def blit():
+        # Mismos límites: solo se restaura el fondo y se redibujan los artistas
+        app.actualizar_grafica(resultados[0])
+        app.actualizar_grafica(resultados[1])
+
+    yield 'grafica.actualizar_completa', completa
+    yield 'grafica.actualizar_blit', blit
+
+
+def bench_arranque():
+    from espectro_nec.main import _import_times
+
+    def importar():
+        tiempos, _ = _import_times('espectro_nec.app')
+        return sum(segundos for _, segundos in tiempos)
+
+    def medir_importacion(rondas=5):
+        tiempos = [importar() for _ in range(rondas)]
+        return {'segundos': min(tiempos), 'mediana': statistics.median(tiempos), 'llamadas': rondas}
+
+    yield 'arranque.importar_app', medir_importacion
+
+
+def ejecutar(filtro='*', rondas=7, tiempo_ronda=0.2):
+    """
+    Ejecuta los benchmarks cuyo nombre coincide con filtro (patrón fnmatch)
+
+    Returns:
+        Diccionario nombre -> resultado de medir
+    """
+    resultados = {}
+    with tempfile.TemporaryDirectory() as directorio:
+        grupos = (bench_motor(), bench_exportaciones(directorio), bench_grafica(), bench_arranque())
+        for grupo in grupos:
+            for nombre, func in grupo:
+                if not fnmatch.fnmatch(nombre, filtro):
+                    continue
+                if nombre.startswith('arranque.'):
+                    resultado = func()
+                else:
+                    resultado = medir(func, rondas, tiempo_ronda)
+                resultados[nombre] = resultado
+                print(f"{nombre:<32}{_formato(resultado['segundos']):>12}  (mediana {_formato(resultado['mediana'])})",
+                      flush=True)
+    return resultados
+
+
+def _formato(segundos):
+    if segundos < 1e-3:
+        return f"{segundos * 1e6:.1f} µs"
+    if segundos < 1:
+        return f"{segundos * 1e3:.2f} ms"
+    return f"{segundos:.2f} s"
+
+
+def metadatos():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=RAIZ, capture_output=True,
+                                text=True).stdout.strip()
+    except OSError:
+        commit = ''
+    return {
+        'fecha': datetime.datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'matplotlib': matplotlib.__version__,
+        'plataforma': platform.platform(),
+        'procesador': platform.processor() or platform.machine(),
+    }
+
+
+def comparar(resultados, base, tolerancia):
+    """
+    Compara resultados con la línea base
+
+    Returns:
+        Lista de (nombre, segundos, segundos_base, cociente) de las métricas que empeoran más que tolerancia
+    """
+    regresiones = []
+    print(f"\n{'benchmark':<32}{'actual':>12}{'base':>12}{'cociente':>10}")
+    for nombre, resultado in resultados.items():
+        anterior = base['resultados'].get(nombre)
+        if anterior is None:
+            print(f"{nombre:<32}{_formato(resultado['segundos']):>12}{'—':>12}{'nuevo':>10}")
+            continue
+        cociente = resultado['segundos'] / anterior['segundos']
+        marca = '  REGRESIÓN' if cociente > 1 + tolerancia else ''
+        print(f"{nombre:<32}{_formato(resultado['segundos']):>12}{_formato(anterior['segundos']):>12}"
+              f"{cociente:>9.2f}x{marca}")
+        if marca:
+            regresiones.append((nombre, resultado['segundos'], anterior['segundos'], cociente))
+    return regresiones
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--guardar', nargs='?', const=BASELINE, metavar='JSON',
+                        help="Guarda los resultados como línea base (por defecto benchmarks/baseline.json)")
+    parser.add_argument('--comparar', nargs='?', const=BASELINE, metavar='JSON',
+                        help="Compara con una línea base y termina con código 1 si hay regresiones")
+    parser.add_argument('--tolerancia', type=float, default=0.25,
+                        help="Empeoramiento admitido en modo comparación (por defecto 0.25 = 25 %%)")
+    parser.add_argument('-k', '--filtro', default='*', help="Patrón de nombres a ejecutar (p. ej. 'motor.*')")
+    parser.add_argument('--rondas', type=int, default=7, help="Rondas por benchmark (se toma la mínima)")
+    args = parser.parse_args(argv)
+
+    base = None
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as archivo:
+            base = json.load(archivo)
+        if base.get('metadatos', {}).get('plataforma') != platform.platform():
+            print(f"Aviso: la línea base se registró en {base['metadatos'].get('plataforma')}", file=sys.stderr)
+
+    resultados = ejecutar(args.filtro, rondas=args.rondas)
+
+    if args.guardar:
+        with open(args.guardar, 'w', encoding='utf-8') as archivo:
+            json.dump({'metadatos': metadatos(), 'resultados': resultados}, archivo, indent=2, ensure_ascii=False)
+            archivo.write('\n')
+        print(f"\nLínea base guardada en {args.guardar}")
+
+    if base is not None:
+        regresiones = comparar(resultados, base, args.tolerancia)
+        if regresiones:
+            print(f"\n{len(regresiones)} regresiones por encima de {args.tolerancia:.0%}", file=sys.stderr)
+            return 1
+        print(f"\nSin regresiones por encima de {args.tolerancia:.0%}")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -1,19 +1,15 @@
+import importlib.util
+import multiprocessing
 import os
 import subprocess
 import sys
 
+RUNTIME_DEPS = ("numpy", "matplotlib", "pandas", "openpyxl", "reportlab", "ttkbootstrap")
+
 
 def _has_runtime_deps():
-    try:
-        import numpy  # noqa: F401
-        import matplotlib  # noqa: F401
-        import pandas  # noqa: F401
-        import openpyxl  # noqa: F401
-        import reportlab  # noqa: F401
-        import ttkbootstrap  # noqa: F401
-        return True
-    except (ImportError, ModuleNotFoundError):
-        return False
+    # find_spec localiza los paquetes sin importarlos, así el arranque no paga su carga
+    return all(importlib.util.find_spec(name) is not None for name in RUNTIME_DEPS)
 
 
 def _install_deps():
@@ -62,4 +58,7 @@ def main():
 
 
 if __name__ == "__main__":
+    # Debe ir antes que todo: en el ejecutable congelado los procesos de trabajo
+    # entran por este archivo y no deben validar dependencias ni abrir la interfaz
+    multiprocessing.freeze_support()
     main()
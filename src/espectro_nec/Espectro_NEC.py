@@ -6,6 +6,11 @@ from tkinter import ttk, messagebox, filedialog
 import pandas as pd
 import os
 
+try:
+    from .seismic_calculations import calculate_spectrum_many
+except ImportError:
+    from seismic_calculations import calculate_spectrum_many
+
 try:
     from reportlab.lib.pagesizes import letter
     from reportlab.lib import colors
@@ -203,28 +208,9 @@ class EspectroSismicoApp:
         return parametros[tipo_suelo], eta_zona[region], Z_valores[zona_sismica]
     
     def espectro_diseno(self, T, Z, Fa, Fd, Fs, eta, R, I, phi_P, phi_E, r=1):
-        T0 = 0.1 * Fs * Fd / Fa
-        Tc = 0.55 * Fs * Fd / Fa
-        TL = 2.4 * Fd
-
-        Sa = np.zeros_like(T)
-        Se = np.zeros_like(T)
-        Si = np.zeros_like(T)
-
-        for i, t in enumerate(T):
-            if t == 0:
-                Sa[i] = Z*Fa
-            elif t <= T0:
-                Sa[i] = Z * Fa * (1 + (eta - 1) * t / T0)
-            elif T0 < t <= Tc:
-                Sa[i] = eta * Z * Fa
-            else:
-                Sa[i] = eta * Z * Fa * (Tc / t)**r 
-
-            Se[i] = Sa[i]
-            Si[i] = (I * Sa[i]) / (R * phi_P * phi_E)
+        _, Sa, Se, Si, T0, Tc, TL = calculate_spectrum_many(Z, Fa, Fd, Fs, eta, R, I, phi_P, phi_E, r, T=T)
 
-        return Sa, Se, Si, T0, Tc, TL
+        return Sa[0], Se[0], Si[0], float(T0[0]), float(Tc[0]), float(TL[0])
     
     def generar_espectro(self):
         try:
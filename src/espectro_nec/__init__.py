@@ -1,3 +1,3 @@
 "Calculo de espectro sísmico NEC." 
 
-__all__ = ["constants", "seismic_calculations", "export_utilities", "ui_components", "app", "main"]
+__all__ = ["constants", "seismic_calculations", "export_utilities", "dialogs", "ui_components", "app", "main", "batch", "service", "spectrum_cache", "lateral_force", "modal_analysis", "ground_motion", "uncertainty", "sensitivity", "bulk_export", "result_store", "geotech"]
@@ -1,13 +1,38 @@
+import math
+import os
+import pickle
+import time
 import tkinter as tk
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
 from ttkbootstrap.dialogs import Messagebox
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
 
-from .ui_components import create_input_panel
+from .ui_components import create_input_panel, create_status_bar
 from .seismic_calculations import parse_values, calculate_parameters, calculate_spectrum
-from .export_utilities import export_to_excel, save_image, generate_pdf_report, export_to_etabs
+from .dialogs import ask_open_paths, ask_save_path
+from .export_utilities import write_excel, write_image, write_pdf_report, write_etabs
+from .export_worker import ExportWorker
+from .spectrum_cache import default_cache
+from . import instrumentation
+from .instrumentation import span
+
+# Espera tras el último cambio antes de recalcular, y periodo de sondeo del resultado
+PREVIEW_DEBOUNCE_MS = 150
+PREVIEW_POLL_MS = 15
+
+# Espera máxima (s) a que termine la exportación en curso al cerrar la ventana
+CIERRE_TIMEOUT_S = 2.0
+
+# Error máximo de interpolación lineal (g) del espectro exportado a ETABS
+ETABS_TOLERANCIA = 1e-4
+
+# Colores de los espectros de acelerogramas, distintos de los de Sa, Si y T0/Tc/TL
+COLORES_REGISTRO = ('C1', 'C4', 'C5', 'C7', 'C8', 'C6')
+
 
 class EspectroSismicoApp:
     def __init__(self, root: ttk.Window):
@@ -35,28 +60,39 @@ class EspectroSismicoApp:
             'phi_p_var': tk.DoubleVar(value=0.9),
             'phi_e_var': tk.DoubleVar(value=0.9),
         }
+        self.vista_previa_var = tk.BooleanVar(value=False)
         
-        # Datos de espectro calculados
-        self.T = None
-        self.Sa = None
-        self.Se = None
-        self.Si = None
+        # Espectro calculado (SpectrumResult) y las entradas que lo produjeron
+        self.entradas = None
+        self.resultado = None
         
         # Crear la interfaz
         create_input_panel(self.panel_izquierdo, self.variables, self.generar_espectro, 
                            self.exportar_excel, self.guardar_imagen, self.generar_reporte_pdf,
-                           self.exportar_etabs)
+                           self.exportar_etabs, vista_previa_var=self.vista_previa_var,
+                           registros_callback=self.cargar_registros,
+                           quitar_registros_callback=self.quitar_registros,
+                           barrido_callback=self.abrir_barrido)
         
         # Configurar el panel para la gráfica
-        self.fig, self.ax = plt.subplots(figsize=(8, 6))
+        self.fig = Figure(figsize=(8, 6))
+        self.ax = self.fig.add_subplot()
         self.canvas = FigureCanvasTkAgg(self.fig, master=self.panel_derecho)
         self.canvas_widget = self.canvas.get_tk_widget()
         self.canvas_widget.pack(fill=BOTH, expand=True)
+        self._crear_artistas()
         
         # Añadir barra de herramientas de navegación
         self.toolbar_frame = ttk.Frame(self.panel_derecho)
         self.toolbar_frame.pack(fill=X)
         self.toolbar = NavigationToolbar2Tk(self.canvas, self.toolbar_frame)
+
+        # Barra de estado y cola de exportaciones en segundo plano
+        self.status_bar = create_status_bar(self.panel_derecho, self.cancelar_exportacion,
+                                            self.guardar_traza if instrumentation.enabled() else None)
+        self.export_worker = ExportWorker(self.root, self.actualizar_estado_exportacion)
+        self.marcas_exportacion = {}
+        self.root.protocol("WM_DELETE_WINDOW", self.cerrar)
         
         # Hacer que la ventana sea redimensionable
         self.root.columnconfigure(1, weight=1)
@@ -64,6 +100,9 @@ class EspectroSismicoApp:
         
         # Iniciar valores por defecto
         self.set_default_values()
+
+        # Vista previa en vivo (opcional): recalcula al cambiar las entradas
+        self._configurar_vista_previa()
     
     def set_default_values(self):
         # Establecer valores por defecto para los combos
@@ -79,108 +118,389 @@ class EspectroSismicoApp:
             elif combo_name == 'i_var':
                 widget.set('1.0 - Edificaciones esenciales')
     
-    def generar_espectro(self):
-        try:
-            # Parsear valores de la interfaz
+    @staticmethod
+    def calcular_espectro(zona_sismica, tipo_suelo, region, r_valor, i_valor, phi_p, phi_e, **muestreo):
+        """
+        Calcula parámetros y espectro; devuelve el SpectrumResult que recibe actualizar_grafica.
+        No toca la interfaz, por lo que puede ejecutarse fuera del hilo de Tk.
+        Las opciones de muestreo se pasan a calculate_spectrum; si la caché de
+        espectros está disponible, el resultado se toma de ella cuando existe.
+        """
+        # Calcular parámetros
+        with span("calculate_parameters"):
+            parametros, eta, Z = calculate_parameters(tipo_suelo, zona_sismica, region)
+        Fa, Fd, Fs, r = parametros['Fa'], parametros['Fd'], parametros['Fs'], parametros['r']
+        
+        # Generar el espectro (o recuperarlo de la caché compartida entre sesiones)
+        cache = default_cache()
+        calcular = calculate_spectrum if cache is None else cache.calculate_spectrum
+        with span("calculate_spectrum", **muestreo):
+            return calcular(Z, Fa, Fd, Fs, eta, r_valor, i_valor, phi_p, phi_e, r, **muestreo)
+
+    def _leer_entradas(self):
+        with span("parse_values"):
             zona_sismica, tipo_suelo, region, r_valor, i_valor = parse_values(self.variables)
             phi_p = float(self.variables['phi_p_var'].get())
             phi_e = float(self.variables['phi_e_var'].get())
+        return zona_sismica, tipo_suelo, region, r_valor, i_valor, phi_p, phi_e
+
+    def _mostrar_espectro(self, resultado, entradas, marca=None):
+        # Guardar el espectro calculado y las entradas que lo produjeron
+        self.entradas = entradas
+        self.resultado = resultado
+        
+        # Actualizar la gráfica
+        self.actualizar_grafica(resultado)
+        if self.export_worker.pendientes:
+            return
+        if marca is not None and instrumentation.enabled():
+            # Con instrumentación, el desglose por fase desde que se leyeron las entradas
+            self.status_bar["mensaje_var"].set(instrumentation.format_spans(instrumentation.since(marca)))
+        else:
+            self.status_bar["mensaje_var"].set(f"Gráfica actualizada en {self.tiempos_frame[-1] * 1000:.1f} ms")
+
+    def generar_espectro(self):
+        try:
+            # Parsear valores de la interfaz
+            marca = instrumentation.mark()
+            entradas = self._leer_entradas()
+            zona_sismica, tipo_suelo, region, r_valor, i_valor, phi_p, phi_e = entradas
             
             # Verificar valores válidos
             if r_valor <= 0 or i_valor <= 0 or phi_p <= 0 or phi_e <= 0:
                 Messagebox.showerror("Error", "Todos los factores deben ser mayores que cero.")
                 return
                 
-            # Calcular parámetros
-            parametros, eta, Z = calculate_parameters(tipo_suelo, zona_sismica, region)
-            Fa, Fd, Fs, r = parametros['Fa'], parametros['Fd'], parametros['Fs'], parametros['r']
-            
-            # Generar el espectro
-            T, Sa, Se, Si, T0, Tc, TL = calculate_spectrum(Z, Fa, Fd, Fs, eta, r_valor, i_valor, phi_p, phi_e, r)
-            
-            # Guardar datos calculados
-            self.T = T
-            self.Sa = Sa
-            self.Se = Se
-            self.Si = Si
-            
-            # Actualizar la gráfica
-            self.actualizar_grafica(T, Sa, Se, Si, T0, Tc, TL, Z, Fa, Fd, Fs, eta, r_valor, i_valor, phi_p, phi_e)
+            self._mostrar_espectro(self.calcular_espectro(*entradas), entradas, marca)
             
             # Mostrar mensaje de éxito
             Messagebox.showinfo("Éxito", "Espectro generado correctamente.")
             
         except Exception as e:
             Messagebox.showerror("Error", f"Error al generar el espectro: {str(e)}")
+
+    def _configurar_vista_previa(self):
+        self.preview_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="vista-previa")
+        self.preview_after_id = None
+        self.preview_future = None
+        self.preview_generacion = 0
+        for variable in (*self.variables.values(), self.vista_previa_var):
+            variable.trace_add('write', self._on_entrada_cambiada)
+
+    def _on_entrada_cambiada(self, *_):
+        if not self.vista_previa_var.get():
+            return
+        # Debounce: cada cambio reinicia la espera antes de recalcular
+        if self.preview_after_id is not None:
+            self.root.after_cancel(self.preview_after_id)
+        self.preview_after_id = self.root.after(PREVIEW_DEBOUNCE_MS, self._lanzar_vista_previa)
+
+    def _lanzar_vista_previa(self):
+        self.preview_after_id = None
+        marca = instrumentation.mark()
+        try:
+            entradas = self._leer_entradas()
+        except (tk.TclError, ValueError, IndexError):
+            self.status_bar["mensaje_var"].set("Vista previa: entrada incompleta")
+            return
+        if min(entradas[3:]) <= 0:
+            self.status_bar["mensaje_var"].set("Vista previa: todos los factores deben ser mayores que cero")
+            return
+
+        # Una entrada nueva deja obsoleto cualquier cálculo anterior
+        self.preview_generacion += 1
+        if self.preview_future is not None:
+            self.preview_future.cancel()
+        self.preview_future = self.preview_executor.submit(self.calcular_espectro, *entradas)
+        self.root.after(PREVIEW_POLL_MS, self._revisar_vista_previa, self.preview_future, self.preview_generacion,
+                        entradas, marca)
+
+    def _revisar_vista_previa(self, future, generacion, entradas, marca=None):
+        if generacion != self.preview_generacion or future.cancelled():
+            return  # resultado obsoleto: se descarta
+        if not future.done():
+            self.root.after(PREVIEW_POLL_MS, self._revisar_vista_previa, future, generacion, entradas, marca)
+            return
+        error = future.exception()
+        if error is not None:
+            self.status_bar["mensaje_var"].set(f"Vista previa: {error}")
+            return
+        self._mostrar_espectro(future.result(), entradas, marca)
     
-    def actualizar_grafica(self, T, Sa, Se, Si, T0, Tc, TL, Z, Fa, Fd, Fs, eta, R, I, phi_P, phi_E):
-        # Limpiar la gráfica anterior
-        self.ax.clear()
-        
-        # Graficar los espectros
-        self.ax.plot(T, Sa, 'b-', label='Sa (Espectro de aceleración)')
-        self.ax.plot(T, Si, 'r-', label='Si (Espectro inelástico)')
-        
-        # Marcar puntos de cambio
-        self.ax.axvline(x=T0, color='g', linestyle='--', alpha=0.7, label=f'T0 = {T0:.2f}s')
-        self.ax.axvline(x=Tc, color='m', linestyle='--', alpha=0.7, label=f'Tc = {Tc:.2f}s')
-        self.ax.axvline(x=TL, color='c', linestyle='--', alpha=0.7, label=f'TL = {TL:.2f}s')
-        
+    def _crear_artistas(self):
+        # Los artistas se crean una sola vez y se actualizan en sitio; al ser
+        # 'animated' no entran en el fondo cacheado y se dibujan con blitting
+        self.linea_sa, = self.ax.plot([], [], 'b-', label='Sa (Espectro de aceleración)', animated=True)
+        self.linea_si, = self.ax.plot([], [], 'r-', label='Si (Espectro inelástico)', animated=True)
+        self.linea_t0 = self.ax.axvline(x=0, color='g', linestyle='--', alpha=0.7, label='T0', animated=True)
+        self.linea_tc = self.ax.axvline(x=0, color='m', linestyle='--', alpha=0.7, label='Tc', animated=True)
+        self.linea_tl = self.ax.axvline(x=0, color='c', linestyle='--', alpha=0.7, label='TL', animated=True)
+        self.lineas = (self.linea_sa, self.linea_si, self.linea_t0, self.linea_tc, self.linea_tl)
+
         # Añadir título y etiquetas
-        self.ax.set_xlim(0, max(5, TL + 0.1))
         self.ax.set_title('Espectro de Diseño Sísmico NEC')
         self.ax.set_xlabel('Período T (s)')
         self.ax.set_ylabel('Aceleración Sa (g)')
         self.ax.grid(True)
-        self.ax.legend()
+        self.leyenda = self.ax.legend(loc='upper right')
+        self.leyenda.set_animated(True)
+
+        # Información de parámetros
+        self.info_text = self.ax.text(0.02, 0.02, '', transform=self.ax.transAxes,
+                                      bbox=dict(facecolor='white', alpha=0.8), animated=True)
+
+        self.artistas = (*self.lineas, self.leyenda, self.info_text)
+        for artista in self.artistas:
+            artista.set_visible(False)
+
+        # Espectros de acelerogramas superpuestos (ver cargar_registros)
+        self.lineas_registro = []
+        self.maximo_registros = 0.0
+
+        self.limites = None
+        self.fondo = None
+        self.tiempos_frame = deque(maxlen=50)
+        self.canvas.mpl_connect('draw_event', self._on_draw)
+
+    def _on_draw(self, event):
+        # Tras cada dibujo completo (primer dibujo, redimensionado, zoom) se cachea el fondo
+        self.fondo = self.canvas.copy_from_bbox(self.fig.bbox)
+        self._dibujar_artistas()
+
+    def _dibujar_artistas(self):
+        for artista in self.artistas:
+            self.fig.draw_artist(artista)
+
+    @staticmethod
+    def _limite_superior(valor, paso=0.25):
+        # Redondear hacia arriba para que cambios pequeños de Sa no muevan el eje
+        return paso * math.ceil(1.1 * valor / paso)
+
+    def actualizar_grafica(self, resultado):
+        with span("actualizar_grafica"):
+            self._actualizar_grafica(resultado)
+
+    def _actualizar_grafica(self, resultado):
+        inicio = time.perf_counter()
+        T, Sa, _, Si, T0, Tc, TL = resultado
+
+        # Actualizar los espectros
+        self.linea_sa.set_data(T, Sa)
+        self.linea_si.set_data(T, Si)
+        
+        # Marcar puntos de cambio
+        for linea, nombre, valor in ((self.linea_t0, 'T0', T0), (self.linea_tc, 'Tc', Tc), (self.linea_tl, 'TL', TL)):
+            linea.set_xdata([valor, valor])
+            linea.set_label(f'{nombre} = {valor:.2f}s')
+        for texto, linea in zip(self.leyenda.get_texts(), self.lineas):
+            texto.set_text(linea.get_label())
         
         # Añadir información de parámetros
-        info_text = (f"Z = {Z:.2f}g, R = {R}, I = {I}\n"
-                    f"Fa = {Fa:.2f}, Fd = {Fd:.2f}, Fs = {Fs:.2f}, η = {eta:.2f}\n"
-                    f"φP = {phi_P:.2f}, φE = {phi_E:.2f}")
-        self.ax.text(0.02, 0.02, info_text, transform=self.ax.transAxes, 
-                    bbox=dict(facecolor='white', alpha=0.8))
-        
-        # Actualizar el lienzo
-        self.canvas.draw()
+        self.info_text.set_text(f"Z = {resultado.Z:.2f}g, R = {resultado.R}, I = {resultado.I}\n"
+                                f"Fa = {resultado.Fa:.2f}, Fd = {resultado.Fd:.2f}, Fs = {resultado.Fs:.2f}, "
+                                f"η = {resultado.eta:.2f}\n"
+                                f"φP = {resultado.phi_P:.2f}, φE = {resultado.phi_E:.2f}")
+        for artista in self.artistas:
+            artista.set_visible(True)
+
+        # Los ejes (y el fondo cacheado) solo se recalculan cuando cambian los límites
+        limites = ((0, max(5, TL + 0.1)),
+                   (0, self._limite_superior(max(Sa.max(), Si.max(), self.maximo_registros))))
+        if limites != self.limites or self.fondo is None:
+            self.limites = limites
+            self.ax.set_xlim(*limites[0])
+            self.ax.set_ylim(*limites[1])
+            with span("canvas.draw"):
+                self.canvas.draw()
+        else:
+            with span("canvas.blit"):
+                self.canvas.restore_region(self.fondo)
+                self._dibujar_artistas()
+                self.canvas.blit(self.fig.bbox)
+
+        self.tiempos_frame.append(time.perf_counter() - inicio)
     
+    def cargar_registros(self):
+        paths = ask_open_paths("registros")
+        if not paths:
+            return
+        from .ground_motion import record_spectra
+        job = self.export_worker.submit(f"Registros: {len(paths)} acelerogramas", record_spectra, paths)
+        self.marcas_exportacion[job.id] = ("registros", instrumentation.mark())
+
+    def quitar_registros(self):
+        self._mostrar_registros([])
+
+    def _mostrar_registros(self, resultados):
+        # Los registros son artistas animados adicionales; la leyenda se rehace para incluirlos
+        for linea in self.lineas_registro:
+            linea.remove()
+        self.lineas_registro = []
+        for k, resultado in enumerate(resultados):
+            j = int(abs(resultado['amortiguamientos'] - 0.05).argmin())
+            zeta = resultado['amortiguamientos'][j]
+            linea, = self.ax.plot(resultado['T'], resultado['PSA'][j], color=COLORES_REGISTRO[k % len(COLORES_REGISTRO)], linewidth=1,
+                                  alpha=0.8, label=f"{resultado['nombre']} (PSA, ζ = {zeta:.0%})", animated=True)
+            self.lineas_registro.append(linea)
+        self.maximo_registros = max((linea.get_ydata().max() for linea in self.lineas_registro), default=0.0)
+
+        self.leyenda.remove()
+        self.leyenda = self.ax.legend(loc='upper right')
+        self.leyenda.set_animated(True)
+        self.leyenda.set_visible(self.resultado is not None or bool(self.lineas_registro))
+        self.artistas = (*self.lineas, *self.lineas_registro, self.leyenda, self.info_text)
+
+        self.limites = None  # fuerza un dibujo completo con los nuevos límites
+        if self.resultado is not None:
+            self.actualizar_grafica(self.resultado)
+        else:
+            self.ax.set_ylim(0, self._limite_superior(max(self.maximo_registros, 0.25)))
+            self.canvas.draw()
+
+    def abrir_barrido(self):
+        try:
+            zona_sismica, tipo_suelo, region, r_valor, i_valor, phi_p, phi_e = self._leer_entradas()
+        except (tk.TclError, ValueError, IndexError):
+            Messagebox.showerror("Error", "Complete las entradas antes de abrir el barrido.")
+            return
+        from .sensitivity import (NOMBRES_EJES, VALORES_I, VALORES_PHI, VALORES_R, ZONAS, parameter_sweep,
+                                  plot_sweep, write_sweep)
+
+        # Todas las zonas y los valores de los menús para R, I, ØP y ØE, con el suelo y la región actuales
+        with span("barrido"):
+            resultado = parameter_sweep(tipo_suelo, ZONAS, region, VALORES_R, VALORES_I, VALORES_PHI, VALORES_PHI)
+        # Los ejes que no se dibujan se fijan en el valor más cercano a las entradas actuales
+        actuales = {'zona': ZONAS.index(zona_sismica), 'R': r_valor, 'I': i_valor, 'phi_p': phi_p, 'phi_e': phi_e}
+        indices = {eje: valor if eje == 'zona' else
+                   min(range(len(resultado['valores'][eje])), key=lambda k: abs(resultado['valores'][eje][k] - valor))
+                   for eje, valor in actuales.items()}
+        ejes = {NOMBRES_EJES[eje]: eje for eje in resultado['ejes']}
+        periodos = {'Meseta': None, **{f"T = {t:g} s": k for k, t in enumerate(resultado['periodos'].tolist())}}
+
+        ventana = ttk.Toplevel(self.root)
+        ventana.title(f"Sensibilidad de Si · Suelo {tipo_suelo} · {region}")
+        controles = ttk.Frame(ventana, padding="10 10 10 0")
+        controles.pack(fill=X)
+        x_var, y_var, periodo_var = tk.StringVar(value='Factor R'), tk.StringVar(value='Factor ØP'), tk.StringVar(value='Meseta')
+        for columna, (texto, variable, valores) in enumerate((("Eje X:", x_var, list(ejes)), ("Eje Y:", y_var, list(ejes)),
+                                                              ("Período:", periodo_var, list(periodos)))):
+            ttk.Label(controles, text=texto).grid(column=2 * columna, row=0, sticky=W, padx=(0 if columna == 0 else 10, 4))
+            combo = ttk.Combobox(controles, textvariable=variable, values=valores, width=16, state="readonly")
+            combo.grid(column=2 * columna + 1, row=0, sticky=W)
+        ttk.Button(controles, text="Exportar...", bootstyle="info",
+                   command=lambda: self._encolar_exportacion("barrido", "Barrido", write_sweep, resultado)).grid(
+            column=6, row=0, padx=(10, 0))
+
+        fig = Figure(figsize=(6.5, 5))
+        canvas = FigureCanvasTkAgg(fig, master=ventana)
+        canvas.get_tk_widget().pack(fill=BOTH, expand=True, padx=10, pady=10)
+
+        def dibujar(*_):
+            x, y = ejes[x_var.get()], ejes[y_var.get()]
+            if x == y:
+                return
+            fig.clear()
+            ax = fig.add_subplot()
+            mapa = plot_sweep(ax, resultado, x, y, periodos[periodo_var.get()], indices)
+            fig.colorbar(mapa, ax=ax, label='Si (g)')
+            canvas.draw_idle()
+
+        for variable in (x_var, y_var, periodo_var):
+            variable.trace_add('write', dibujar)
+        dibujar()
+
+    def _snapshot_figura(self):
+        # Copia independiente de la figura (conserva zoom y estilo) para renderizarla
+        # en el hilo de exportación sin tocar el lienzo de Tk
+        copia = pickle.loads(pickle.dumps(self.fig))
+        for artista in copia.findobj(lambda a: a.get_animated()):
+            artista.set_animated(False)
+        return copia
+
+    def _encolar_exportacion(self, kind, descripcion, func, *args):
+        file_path = ask_save_path(kind)
+        if not file_path:
+            return
+        job = self.export_worker.submit(f"{descripcion}: {os.path.basename(file_path)}", func, file_path, *args)
+        self.marcas_exportacion[job.id] = (kind, instrumentation.mark())
+
+    def actualizar_estado_exportacion(self, job):
+        pendientes = self.export_worker.pendientes
+        en_cola = len(pendientes) - 1 if pendientes else 0
+        sufijo = f" · {en_cola} en cola" if en_cola > 0 else ""
+
+        if job.estado == 'error':
+            Messagebox.showerror("Error", f"Error en la exportación ({job.descripcion}): {job.error}")
+            texto = f"Error: {job.descripcion}"
+        elif job.estado == 'completado':
+            texto = f"Completado: {job.descripcion}"
+            kind, marca = self.marcas_exportacion.pop(job.id, (None, None))
+            if kind == "registros":
+                self._mostrar_registros(job.resultado)
+            if marca is not None and instrumentation.enabled():
+                # Tramos de las fases de esta exportación ('pdf.build', 'excel.escribir', ...)
+                tramos = [t for t in instrumentation.since(marca) if t['nombre'].startswith(f"{kind}.")]
+                texto += f" · {instrumentation.format_spans(tramos)}"
+        elif job.estado == 'cancelado':
+            texto = f"Cancelado: {job.descripcion}"
+        else:
+            texto = f"{job.mensaje}… {job.progreso:.0%}"
+
+        self.status_bar["mensaje_var"].set(texto + sufijo)
+        self.status_bar["progreso"].configure(value=job.progreso if not job.terminado else 0.0)
+        self.status_bar["cancelar"].configure(state=NORMAL if pendientes else DISABLED)
+
+    def cerrar(self):
+        # Cancelar exportaciones y cálculos en segundo plano antes de destruir la ventana
+        self.export_worker.shutdown(timeout=CIERRE_TIMEOUT_S)
+        if self.preview_after_id is not None:
+            self.root.after_cancel(self.preview_after_id)
+        self.preview_executor.shutdown(wait=False, cancel_futures=True)
+        self.root.destroy()
+
+    def cancelar_exportacion(self):
+        self.export_worker.cancel()
+
+    def guardar_traza(self):
+        file_path = ask_save_path("traza")
+        if not file_path:
+            return
+        try:
+            n = instrumentation.write_chrome_trace(file_path)
+        except OSError as e:
+            Messagebox.showerror("Error", f"No se pudo guardar la traza: {e}")
+            return
+        self.status_bar["mensaje_var"].set(f"Traza guardada: {n} tramos en {os.path.basename(file_path)}")
+
     def exportar_excel(self):
-        if self.T is None or self.Sa is None:
+        if self.resultado is None:
             Messagebox.showerror("Error", "Primero debe generar el espectro.")
             return
         
-        # Obtener parámetros para el encabezado del Excel
-        zona_sismica, tipo_suelo, region, r_valor, i_valor = parse_values(self.variables)
-        phi_p = float(self.variables['phi_p_var'].get())
-        phi_e = float(self.variables['phi_e_var'].get())
-        
-        # Llamar a la función de exportación
-        export_to_excel(self.T, self.Sa, self.Se, self.Si, zona_sismica, tipo_suelo, region, 
-                       r_valor, i_valor, phi_p, phi_e)
+        # Encabezado del Excel con las entradas que produjeron el espectro, no las
+        # que el usuario haya editado después
+        self._encolar_exportacion("excel", "Excel", write_excel, *self.resultado[:4], *self.entradas)
     
     def exportar_etabs(self):
-        if self.T is None or self.Si is None:
+        if self.resultado is None:
             Messagebox.showerror("Error", "Primero debe generar el espectro.")
             return
         
-        export_to_etabs(self.T, self.Si)
+        # Malla adaptativa: T0, Tc y TL exactos y ~60-120 puntos con error de interpolación <= ETABS_TOLERANCIA
+        adaptativo = self.calcular_espectro(*self.entradas, muestreo='adaptativo', tol=ETABS_TOLERANCIA)
+        self._encolar_exportacion("etabs", "ETABS", write_etabs, adaptativo.T, adaptativo.Si)
 
     def guardar_imagen(self):
-        if self.Sa is None:
+        if self.resultado is None:
             Messagebox.showerror("Error", "Primero debe generar el espectro.")
             return
         
-        save_image(self.fig)
+        self._encolar_exportacion("imagen", "Imagen", write_image, self._snapshot_figura())
     
     def generar_reporte_pdf(self):
-        if self.T is None or self.Sa is None:
+        if self.resultado is None:
             Messagebox.showerror("Error", "Primero debe generar el espectro.")
             return
         
-        # Obtener parámetros actuales
-        zona_sismica, tipo_suelo, region, r_valor, i_valor = parse_values(self.variables)
-        phi_p = float(self.variables['phi_p_var'].get())
-        phi_e = float(self.variables['phi_e_var'].get())
-        
-        generate_pdf_report(self.T, self.Sa, self.Se, self.Si, zona_sismica, tipo_suelo, region,
-                           r_valor, i_valor, phi_p, phi_e, self.fig)
\ No newline at end of file
+        # Parámetros del espectro mostrado, no los editados después
+        self._encolar_exportacion("pdf", "Reporte PDF", write_pdf_report, *self.resultado[:4], *self.entradas)
@@ -0,0 +1,392 @@
+"""Cálculo de espectros por lotes sin interfaz gráfica (subcomando ``espectro-nec batch``)."""
+
+import csv
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import numpy as np
+
+from .seismic_calculations import (
+    N_PERIODOS,
+    REGION_CODIGOS,
+    SUELO_CODIGOS,
+    T_MAX,
+    ZONA_CODIGOS,
+    calculate_parameters_many,
+    calculate_spectrum_many,
+    characteristic_periods,
+    encode_labels,
+    parse_inputs,
+)
+from . import instrumentation
+from .instrumentation import span
+from .spectrum_cache import default_cache, default_cache_path, grid_digest, spectrum_key
+
+
+# Columnas aceptadas en la entrada; también se aceptan los nombres del motor web
+COLUMNAS = ('id', 'zona_sismica', 'tipo_suelo', 'region', 'r', 'i', 'phi_p', 'phi_e')
+ALIAS_COLUMNAS = {
+    'zone': 'zona_sismica',
+    'soil': 'tipo_suelo',
+    'rFactor': 'r',
+    'importance': 'i',
+    'phiP': 'phi_p',
+    'phiE': 'phi_e',
+}
+
+# Resultados escalares por fila y su nombre en la salida ('r' ya es el factor R de entrada)
+RESULTADOS_ESCALARES = ('Z', 'eta', 'Fa', 'Fd', 'Fs', 'r', 'T0', 'Tc', 'TL')
+COLUMNAS_ESCALARES = ('Z', 'eta', 'Fa', 'Fd', 'Fs', 'r_caida', 'T0', 'Tc', 'TL')
+
+
+def read_rows(path):
+    """
+    Lee las filas de proyectos de un archivo CSV o JSONL sin cargarlo completo
+
+    Args:
+        path: Ruta del archivo (.csv o .jsonl); '-' lee JSONL desde stdin
+
+    Yields:
+        Diccionarios con las columnas normalizadas de COLUMNAS
+    """
+    if path == '-':
+        filas = (json.loads(linea) for linea in sys.stdin if linea.strip())
+        yield from _normalizar(filas)
+        return
+
+    with open(path, newline='', encoding='utf-8-sig') as archivo:
+        if path.lower().endswith('.csv'):
+            yield from _normalizar(csv.DictReader(archivo))
+        else:
+            yield from _normalizar(json.loads(linea) for linea in archivo if linea.strip())
+
+
+def _normalizar(filas):
+    for numero, fila in enumerate(filas, start=1):
+        fila = {ALIAS_COLUMNAS.get(clave, clave): valor for clave, valor in fila.items()}
+        fila.setdefault('id', str(numero))
+        fila.setdefault('phi_p', 1.0)
+        fila.setdefault('phi_e', 1.0)
+        yield fila
+
+
+def _chunks(iterable, size):
+    iterador = iter(iterable)
+    while bloque := list(islice(iterador, size)):
+        yield bloque
+
+
+def _leer_bloques(path, size):
+    bloques = _chunks(read_rows(path), size)
+    while True:
+        with span("batch.leer"):
+            bloque = next(bloques, None)
+        if bloque is None:
+            return
+        yield bloque
+
+
+def compute_block(filas, T=None, cache_path=None):
+    """
+    Calcula los espectros de un bloque de filas en una sola pasada vectorizada
+
+    Args:
+        filas: Lista de diccionarios devueltos por read_rows
+        T: Malla de períodos común (por defecto la de calculate_spectrum_many)
+        cache_path: Archivo de SpectrumCache a consultar antes de calcular
+            (None para no usar caché)
+
+    Returns:
+        Diccionario con 'filas' válidas, arreglos de parámetros y espectros
+        ('Z', 'eta', 'Fa', 'Fd', 'Fs', 'r', 'T', 'Sa', 'Si', 'T0', 'Tc', 'TL'),
+        las entradas ya validadas ('codigo_zona', 'codigo_suelo', 'codigo_region',
+        'R', 'I', 'phi_P', 'phi_E') y la lista 'errores' de tuplas (id, mensaje)
+    """
+    marca = instrumentation.mark()
+    with span("batch.parsear", filas=len(filas)):
+        validas, entradas, errores = _parse_block(filas)
+
+    resultado = {'filas': validas, 'errores': errores}
+    if entradas:
+        zona, suelo, region, r_valor, i_valor, phi_p, phi_e = zip(*entradas)
+        codigos = {
+            'codigo_zona': encode_labels(zona, ZONA_CODIGOS),
+            'codigo_suelo': encode_labels(suelo, SUELO_CODIGOS),
+            'codigo_region': encode_labels(region, REGION_CODIGOS),
+        }
+        with span("batch.parametros"):
+            parametros, eta, Z = calculate_parameters_many(
+                codigos['codigo_suelo'], codigos['codigo_zona'], codigos['codigo_region'])
+        factores = (Z, parametros['Fa'], parametros['Fd'], parametros['Fs'], eta,
+                    r_valor, i_valor, phi_p, phi_e, parametros['r'])
+        cache = default_cache(cache_path) if cache_path is not None else None
+        with span("batch.espectro", filas=len(entradas), cache=cache is not None):
+            if cache is None:
+                T, Sa, _, Si, T0, Tc, TL = calculate_spectrum_many(*factores, T=T)
+            else:
+                T, Sa, Si, T0, Tc, TL = _compute_cached(cache, factores, T)
+        resultado.update(parametros, Z=Z, eta=eta, T=T, Sa=Sa, Si=Si, T0=T0, Tc=Tc, TL=TL)
+        resultado.update(codigos, R=np.asarray(r_valor, dtype=np.float64), I=np.asarray(i_valor, dtype=np.float64),
+                         phi_P=np.asarray(phi_p, dtype=np.float64), phi_E=np.asarray(phi_e, dtype=np.float64))
+
+    if instrumentation.enabled():
+        # Los tramos viajan con el bloque para sumarse en el proceso principal
+        resultado['tramos'] = instrumentation.since(marca)
+    return resultado
+
+
+def block_results(bloque):
+    """
+    Recorre un bloque de compute_block como un mapeo por proyecto
+
+    Returns:
+        Generador de diccionarios con las columnas de entrada, los escalares de
+        COLUMNAS_ESCALARES, 'T' y las filas 'Sa' y 'Si' (vistas del bloque)
+    """
+    for k, fila in enumerate(bloque['filas']):
+        resultado = {clave: fila.get(clave) for clave in COLUMNAS}
+        for clave, columna in zip(RESULTADOS_ESCALARES, COLUMNAS_ESCALARES):
+            resultado[columna] = bloque[clave][k]
+        resultado['T'] = bloque['T']
+        resultado['Sa'] = bloque['Sa'][k]
+        resultado['Si'] = bloque['Si'][k]
+        yield resultado
+
+
+def _parse_block(filas):
+    validas, entradas, errores = [], [], []
+    for fila in filas:
+        try:
+            zona, suelo, region, r_valor, i_valor = parse_inputs(
+                fila['zona_sismica'], fila['tipo_suelo'], fila['region'], fila['r'], fila['i']
+            )
+            phi_p, phi_e = float(fila['phi_p']), float(fila['phi_e'])
+            if r_valor <= 0 or i_valor <= 0 or phi_p <= 0 or phi_e <= 0:
+                raise ValueError("Todos los factores deben ser mayores que cero.")
+            for valor, codigos, nombre in ((suelo, SUELO_CODIGOS, 'tipo de suelo'),
+                                           (zona, ZONA_CODIGOS, 'zona sísmica'),
+                                           (region, REGION_CODIGOS, 'región')):
+                if valor not in codigos:
+                    raise ValueError(f"Valor de {nombre} no reconocido: {valor!r}")
+        except (KeyError, ValueError) as e:
+            errores.append((fila.get('id'), f"{type(e).__name__}: {e}"))
+            continue
+        validas.append(fila)
+        entradas.append((zona, suelo, region, r_valor, i_valor, phi_p, phi_e))
+    return validas, entradas, errores
+
+
+def _compute_cached(cache, factores, T):
+    # Solo se calculan (en una pasada vectorizada) las filas que no están en la caché
+    if T is None:
+        T = np.linspace(0, T_MAX, N_PERIODOS)
+    factores = np.broadcast_arrays(*(np.asarray(f, dtype=np.float64) for f in factores))
+    digest_T = grid_digest(T)
+    claves = [spectrum_key(T, *fila, digest_T=digest_T) for fila in np.column_stack(factores).tolist()]
+    encontrados = cache.get_many(claves)
+
+    Sa = np.empty((len(claves), T.size))
+    Si = np.empty((len(claves), T.size))
+    faltan = []
+    for k, clave in enumerate(claves):
+        if clave in encontrados:
+            Sa[k], Si[k] = encontrados[clave]
+        else:
+            faltan.append(k)
+    if faltan:
+        _, Sa_nuevos, _, Si_nuevos, _, _, _ = calculate_spectrum_many(*(f[faltan] for f in factores), T=T)
+        Sa[faltan], Si[faltan] = Sa_nuevos, Si_nuevos
+        cache.put_many((claves[k], Sa[k], Si[k]) for k in faltan)
+    T0, Tc, TL = characteristic_periods(factores[1], factores[2], factores[3])
+    return T, Sa, Si, T0, Tc, TL
+
+
+class _TextWriter:
+    def __init__(self, path):
+        self.archivo = sys.stdout if path == '-' else open(path, 'w', newline='', encoding='utf-8')
+
+    def close(self):
+        if self.archivo is not sys.stdout:
+            self.archivo.close()
+
+
+class _JsonlWriter(_TextWriter):
+    def write_block(self, bloque):
+        for k, fila in enumerate(bloque['filas']):
+            registro = {clave: fila.get(clave) for clave in COLUMNAS}
+            for clave, columna in zip(RESULTADOS_ESCALARES, COLUMNAS_ESCALARES):
+                registro[columna] = bloque[clave][k].item()
+            registro['Sa'] = bloque['Sa'][k].tolist()
+            registro['Si'] = bloque['Si'][k].tolist()
+            self.archivo.write(json.dumps(registro, ensure_ascii=False))
+            self.archivo.write('\n')
+
+
+class _CsvWriter(_TextWriter):
+    """Una fila por proyecto: parámetros, períodos característicos y Si en cada período."""
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.writer = csv.writer(self.archivo)
+        self.encabezado_escrito = False
+
+    def write_block(self, bloque):
+        if not bloque['filas']:
+            return
+        if not self.encabezado_escrito:
+            periodos = [f"Si@{t:.4f}" for t in bloque['T']]
+            self.writer.writerow([*COLUMNAS, *COLUMNAS_ESCALARES, *periodos])
+            self.encabezado_escrito = True
+        escalares = np.column_stack([bloque[c] for c in RESULTADOS_ESCALARES])
+        for fila, valores, si in zip(bloque['filas'], escalares.tolist(), bloque['Si'].tolist()):
+            self.writer.writerow([*(fila.get(c) for c in COLUMNAS), *valores, *si])
+
+
+class _XlsxWriter:
+    """Una hoja por proyecto más el índice "Parámetros", escrito en modo streaming."""
+
+    def __init__(self, path):
+        self.path = path
+        self.libro = None
+
+    def write_block(self, bloque):
+        if not bloque['filas']:
+            return
+        if self.libro is None:
+            from .export_utilities import SpectrumWorkbookWriter
+            self.libro = SpectrumWorkbookWriter(self.path, T=bloque['T'])
+        for resultado in block_results(bloque):
+            self.libro.add(resultado)
+
+    def close(self):
+        if self.libro is not None:
+            self.libro.close()
+
+
+def _writer_for(path, precision='float64'):
+    extension = os.path.splitext(path.lower())[1]
+    if extension == '.csv':
+        return _CsvWriter(path)
+    if extension == '.xlsx':
+        return _XlsxWriter(path)
+    if extension == '.nec':
+        from .result_store import ResultStoreWriter
+        return ResultStoreWriter(path, precision)
+    return _JsonlWriter(path)
+
+
+def run_batch(input_path, output_path, workers=None, chunk_size=256, progress=sys.stderr, T=None, cache_path=None,
+              precision='float64'):
+    """
+    Calcula los espectros de todas las filas de input_path y los escribe en output_path
+
+    Los bloques se reparten en un ProcessPoolExecutor y se escriben en el orden
+    de entrada a medida que terminan; como máximo hay dos bloques en vuelo por
+    proceso, de modo que la memoria no crece con el tamaño de la entrada.
+
+    Args:
+        input_path: Archivo CSV o JSONL con las filas de proyectos
+        output_path: Archivo de salida (.jsonl, .csv, .xlsx o el almacén binario .nec);
+            '-' escribe JSONL en stdout
+        workers: Número de procesos (None usa os.cpu_count(); 0 calcula en el proceso actual)
+        chunk_size: Filas por bloque enviado a cada proceso
+        progress: Flujo donde se informa el avance (None para silenciar)
+        T: Malla de períodos común a todas las filas
+        cache_path: Archivo de SpectrumCache compartido por los procesos (None sin caché)
+        precision: 'float64' o 'float32' para Sa y Si en el almacén .nec
+
+    Returns:
+        Diccionario con 'filas', 'errores', 'segundos' y 'filas_por_segundo'
+        (y 'fases', el resumen por tramo, si la instrumentación está activa)
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    bloques = _leer_bloques(input_path, chunk_size)
+    n_filas = n_errores = 0
+    inicio = ultimo_reporte = time.perf_counter()
+
+    writer = _writer_for(output_path, precision)
+    try:
+
+        def escribir(bloque):
+            nonlocal n_filas, n_errores, ultimo_reporte
+            tramos = bloque.pop('tramos', ())
+            if tramos and tramos[0]['pid'] != os.getpid():
+                instrumentation.extend(tramos)
+            with span("batch.escribir", filas=len(bloque['filas'])):
+                writer.write_block(bloque)
+            n_filas += len(bloque['filas'])
+            n_errores += len(bloque['errores'])
+            if progress is not None:
+                for fila_id, mensaje in bloque['errores']:
+                    print(f"Fila {fila_id}: {mensaje}", file=progress)
+                ahora = time.perf_counter()
+                if ahora - ultimo_reporte >= 1.0:
+                    ultimo_reporte = ahora
+                    print(f"{n_filas} filas · {n_filas / (ahora - inicio):.0f} filas/s", file=progress)
+
+        if workers <= 0:
+            for bloque in bloques:
+                escribir(compute_block(bloque, T, cache_path))
+        else:
+            # Los procesos heredan el estado de la instrumentación del proceso principal
+            inicializar = instrumentation.enable if instrumentation.enabled() else None
+            with ProcessPoolExecutor(max_workers=workers, initializer=inicializar,
+                                     initargs=(instrumentation.memory_enabled(),)) as executor:
+                en_vuelo = deque()
+                for bloque in bloques:
+                    en_vuelo.append(executor.submit(compute_block, bloque, T, cache_path))
+                    if len(en_vuelo) >= 2 * workers:
+                        escribir(en_vuelo.popleft().result())
+                while en_vuelo:
+                    escribir(en_vuelo.popleft().result())
+    except BaseException:
+        # Un almacén .nec interrumpido se elimina; los formatos de texto conservan lo escrito
+        getattr(writer, 'discard', writer.close)()
+        raise
+    writer.close()
+
+    segundos = time.perf_counter() - inicio
+    resumen = {
+        'filas': n_filas,
+        'errores': n_errores,
+        'segundos': segundos,
+        'filas_por_segundo': n_filas / segundos if segundos > 0 else float('inf'),
+    }
+    if instrumentation.enabled():
+        resumen['fases'] = instrumentation.summary()
+    if progress is not None:
+        print(f"Listo: {n_filas} espectros, {n_errores} errores en {segundos:.2f} s "
+              f"({resumen['filas_por_segundo']:.0f} filas/s)", file=progress)
+        if instrumentation.enabled():
+            print(instrumentation.format_summary(), file=progress)
+    return resumen
+
+
+def add_arguments(parser):
+    parser.add_argument('input', help="Archivo CSV o JSONL con zona, suelo, región, R, I, φP y φE ('-' para stdin)")
+    parser.add_argument('-o', '--output', default='-', help="Archivo de salida .jsonl, .csv, .xlsx o .nec (por defecto stdout)")
+    parser.add_argument('-j', '--workers', type=int, default=None,
+                        help="Número de procesos (por defecto todos los núcleos; 0 sin procesos)")
+    parser.add_argument('--chunk-size', type=int, default=256, help="Filas por bloque (por defecto 256)")
+    parser.add_argument('--t-max', type=float, default=T_MAX, help="Período máximo en s (por defecto 6)")
+    parser.add_argument('--puntos', type=int, default=N_PERIODOS, help="Puntos de la malla de períodos (por defecto 1000)")
+    parser.add_argument('--cache', nargs='?', const='', default=None, metavar='RUTA',
+                        help="Consulta y alimenta la caché de espectros compartida con la aplicación "
+                             "(opcionalmente en RUTA)")
+    parser.add_argument('--float32', action='store_true',
+                        help="Guarda Sa y Si en precisión simple en el almacén .nec (la mitad del tamaño)")
+    parser.add_argument('-q', '--quiet', action='store_true', help="No informar el avance")
+
+
+def run(args):
+    cache_path = None if args.cache is None else (args.cache or default_cache_path())
+    resumen = run_batch(args.input, args.output, workers=args.workers, chunk_size=args.chunk_size,
+                        progress=None if args.quiet else sys.stderr, T=np.linspace(0, args.t_max, args.puntos),
+                        cache_path=cache_path, precision='float32' if args.float32 else 'float64')
+    return 1 if resumen['errores'] else 0
@@ -0,0 +1,285 @@
+"""Exportación masiva de funciones espectrales (ETABS, SAP2000, OpenSees y CSV) a un directorio o un zip."""
+
+import hashlib
+import io
+import json
+import os
+import re
+import sys
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import numpy as np
+
+from .seismic_calculations import ENGINE_VERSION, GRAVEDAD
+from .instrumentation import span
+
+# Formato -> (extensión, descripción para el manifiesto)
+FORMATOS = {
+    'etabs': ('.txt', "ETABS: Response Spectrum Function From File, período (s) y aceleración (g), 1 línea de encabezado"),
+    'sap2000': ('.txt', "SAP2000: Response Spectrum Function From File, período (s) y aceleración (g), 1 línea de encabezado"),
+    'opensees': ('.tcl', "OpenSees: timeSeries Path con -time (períodos) y -values (Si en g), -factor g a m/s2"),
+    'csv': ('.csv', "CSV: T, Sa y Si con encabezado"),
+}
+
+MANIFIESTO = 'manifest.json'
+CASOS_POR_BLOQUE = 64
+
+_CARACTERES_NOMBRE_INVALIDOS = re.compile(r'[^\w.-]+')
+
+
+def _filas(plantilla, *columnas):
+    """Formatea columnas numéricas con una sola operación de formato para todas las filas."""
+    datos = np.column_stack(columnas).astype(np.float64, copy=False)
+    return ((plantilla * datos.shape[0]) % tuple(datos.ravel().tolist())).encode('ascii')
+
+
+def format_etabs(T, Si, **_):
+    """
+    Archivo de función espectral para ETABS: encabezado y pares período-aceleración
+
+    ETABS necesita el punto T = 0; se agrega (0, Si[0]) solo si la malla no empieza en cero.
+    """
+    T, Si = np.asarray(T), np.asarray(Si)
+    if T[0] > 0:
+        T, Si = np.concatenate(([0.0], T)), np.concatenate((Si[:1], Si))
+    return b"Espectro Sismico\n" + _filas("%.4f    %.4f\n", T, Si)
+
+
+def format_sap2000(T, Si, **_):
+    """Archivo de función espectral para SAP2000 (período y valor separados por tabulador)."""
+    T, Si = np.asarray(T), np.asarray(Si)
+    if T[0] > 0:
+        T, Si = np.concatenate(([0.0], T)), np.concatenate((Si[:1], Si))
+    return b"Period\tAcceleration\n" + _filas("%.6f\t%.6f\n", T, Si)
+
+
+def format_opensees(T, Si, nombre='', etiqueta=1, **_):
+    """Serie temporal Path de OpenSees para responseSpectrumAnalysis (Si en g, escalada a m/s2)."""
+    T, Si = np.asarray(T), np.asarray(Si)
+    return b"".join((
+        f"# Espectro de diseño NEC: {nombre}\n".encode('utf-8'),
+        f"timeSeries Path {etiqueta} -factor {GRAVEDAD} -time {{".encode('ascii'),
+        _filas(" %.6g", T),
+        b" } -values {",
+        _filas(" %.6g", Si),
+        b" }\n",
+    ))
+
+
+def format_csv(T, Si, Sa=None, **_):
+    """CSV con T, Sa y Si."""
+    T, Si = np.asarray(T), np.asarray(Si)
+    Sa = Si if Sa is None else np.asarray(Sa)
+    return b"T,Sa,Si\n" + _filas("%.6f,%.6f,%.6f\n", T, Sa, Si)
+
+
+FORMATEADORES = {
+    'etabs': format_etabs,
+    'sap2000': format_sap2000,
+    'opensees': format_opensees,
+    'csv': format_csv,
+}
+
+
+def _formatear_bloque(casos, formatos):
+    # Trabajo de proceso: devuelve, por caso, el contenido de cada formato
+    with span("exportar.formatear", casos=len(casos)):
+        return [{formato: FORMATEADORES[formato](**caso) for formato in formatos} for caso in casos]
+
+
+def _parametros(resultado):
+    parametros = {}
+    for clave, valor in resultado.items():
+        if clave in ('id', 'T', 'Sa', 'Se', 'Si'):
+            continue
+        if isinstance(valor, np.generic):
+            valor = valor.item()
+        if valor is None or isinstance(valor, (str, int, float, bool)):
+            parametros[clave] = valor
+    return parametros
+
+
+class _Destino:
+    """Escribe los archivos en un zip (ruta .zip o flujo binario) o en un directorio."""
+
+    def __init__(self, destino):
+        self.directorio = None
+        if hasattr(destino, 'write') or str(destino).lower().endswith('.zip'):
+            self.zip = zipfile.ZipFile(destino, 'w', compression=zipfile.ZIP_DEFLATED, compresslevel=6)
+        else:
+            self.zip = None
+            self.directorio = os.fspath(destino)
+            os.makedirs(self.directorio, exist_ok=True)
+
+    def write(self, nombre, contenido):
+        if self.zip is not None:
+            self.zip.writestr(nombre, contenido)
+            return
+        ruta = os.path.join(self.directorio, *nombre.split('/'))
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        with open(ruta, 'wb') as archivo:
+            archivo.write(contenido)
+
+    def close(self):
+        if self.zip is not None:
+            self.zip.close()
+
+
+def export_bundle(destino, resultados, formatos=tuple(FORMATOS), T=None, workers=None, progreso=None, total=None,
+                  casos_por_bloque=CASOS_POR_BLOQUE):
+    """
+    Escribe un archivo de función por caso y por formato, más un manifiesto
+
+    Los casos se formatean por bloques en un ProcessPoolExecutor (con a lo más
+    dos bloques en vuelo por proceso) y se escriben en el orden de entrada en
+    <formato>/<id><extensión>. No usa Tk, por lo que sirve en lotes y servicios.
+
+    Args:
+        destino: Directorio, ruta .zip o flujo binario (se escribe un zip)
+        resultados: Iterable de mapeos con 'Si' y opcionalmente 'id', 'T', 'Sa'
+            y parámetros escalares (los de batch.block_results), que pasan al manifiesto
+        formatos: Claves de FORMATOS a escribir
+        T: Malla de períodos común, para resultados que no traen la suya
+        workers: Número de procesos (None usa os.cpu_count(); 0 formatea en el proceso actual)
+        progreso: Callable opcional progreso(fraccion, mensaje)
+        total: Número esperado de resultados, para informar el avance
+
+    Returns:
+        El manifiesto: diccionario con 'version', 'formatos' y la lista 'casos'
+    """
+    formatos = tuple(formatos)
+    desconocidos = [f for f in formatos if f not in FORMATOS]
+    if desconocidos or not formatos:
+        raise ValueError(f"Formato no soportado: {desconocidos[0] if desconocidos else '(ninguno)'}; "
+                         f"use {', '.join(FORMATOS)}.")
+    if total is None and hasattr(resultados, '__len__'):
+        total = len(resultados)
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    nombres = set()
+    casos_manifiesto = []
+
+    def preparar(bloque):
+        # Asigna nombres únicos en el proceso principal y separa los arreglos para los procesos
+        casos = []
+        for resultado in bloque:
+            k = len(casos_manifiesto) + 1
+            T_caso = resultado.get('T', T)
+            if T_caso is None:
+                raise ValueError("El resultado no incluye 'T' y no se indicó una malla de períodos común.")
+            base = _CARACTERES_NOMBRE_INVALIDOS.sub('_', str(resultado.get('id') or f"espectro_{k}")).strip('._')
+            base = base or f"espectro_{k}"
+            nombre, n = base, 1
+            while nombre.lower() in nombres:
+                n += 1
+                nombre = f"{base}_{n}"
+            nombres.add(nombre.lower())
+            casos_manifiesto.append({'id': resultado.get('id', nombre), 'nombre': nombre,
+                                     'parametros': _parametros(resultado), 'archivos': {}})
+            casos.append({'T': np.asarray(T_caso), 'Si': np.asarray(resultado['Si']), 'Sa': resultado.get('Sa'),
+                          'nombre': str(resultado.get('id') or nombre), 'etiqueta': k})
+        return casos
+
+    salida = _Destino(destino)
+    escritos = 0
+    try:
+        def escribir(inicio, contenidos):
+            nonlocal escritos
+            with span("exportar.escribir", casos=len(contenidos)):
+                for caso, por_formato in zip(casos_manifiesto[inicio:], contenidos):
+                    for formato, contenido in por_formato.items():
+                        ruta = f"{formato}/{caso['nombre']}{FORMATOS[formato][0]}"
+                        salida.write(ruta, contenido)
+                        caso['archivos'][formato] = {'ruta': ruta, 'bytes': len(contenido),
+                                                     'sha256': hashlib.sha256(contenido).hexdigest()}
+            escritos += len(contenidos)
+            if progreso is not None:
+                fraccion = escritos / total if total else 0.0
+                progreso(min(fraccion, 1.0), f"{escritos} espectros exportados")
+
+        iterador = iter(resultados)
+        bloques = iter(lambda: list(islice(iterador, casos_por_bloque)), [])
+        if workers <= 0:
+            for bloque in bloques:
+                inicio = len(casos_manifiesto)
+                escribir(inicio, _formatear_bloque(preparar(bloque), formatos))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                en_vuelo = deque()
+                for bloque in bloques:
+                    inicio = len(casos_manifiesto)
+                    en_vuelo.append((inicio, executor.submit(_formatear_bloque, preparar(bloque), formatos)))
+                    if len(en_vuelo) >= 2 * workers:
+                        inicio, futuro = en_vuelo.popleft()
+                        escribir(inicio, futuro.result())
+                while en_vuelo:
+                    inicio, futuro = en_vuelo.popleft()
+                    escribir(inicio, futuro.result())
+
+        manifiesto = {
+            'version': ENGINE_VERSION,
+            'formatos': {f: {'extension': FORMATOS[f][0], 'descripcion': FORMATOS[f][1]} for f in formatos},
+            'casos': casos_manifiesto,
+        }
+        salida.write(MANIFIESTO, json.dumps(manifiesto, ensure_ascii=False, indent=1).encode('utf-8'))
+    finally:
+        salida.close()
+    return manifiesto
+
+
+def export_bundle_bytes(resultados, formatos=tuple(FORMATOS), T=None, workers=0):
+    """Igual que export_bundle, pero devuelve el zip como bytes."""
+    buffer = io.BytesIO()
+    export_bundle(buffer, resultados, formatos, T=T, workers=workers)
+    return buffer.getvalue()
+
+
+def add_arguments(parser):
+    parser.add_argument('input', help="Archivo CSV o JSONL de proyectos, como en 'espectro-nec batch', "
+                                      "o un almacén .nec ya calculado")
+    parser.add_argument('-o', '--output', required=True, help="Directorio de salida o archivo .zip")
+    parser.add_argument('--formatos', nargs='+', choices=tuple(FORMATOS), default=list(FORMATOS),
+                        help="Formatos a escribir (por defecto todos)")
+    parser.add_argument('-j', '--workers', type=int, default=None,
+                        help="Número de procesos (por defecto todos los núcleos; 0 sin procesos)")
+    parser.add_argument('--t-max', type=float, default=None, help="Período máximo en s (por defecto 6)")
+    parser.add_argument('--puntos', type=int, default=None, help="Puntos de la malla de períodos (por defecto 1000)")
+
+
+def run(args):
+    from .batch import block_results, compute_block, read_rows
+    from .result_store import EXTENSION, ResultStore
+    from .seismic_calculations import N_PERIODOS, T_MAX
+
+    T = np.linspace(0, args.t_max or T_MAX, args.puntos or N_PERIODOS)
+    inicio = time.perf_counter()
+    errores = 0
+
+    if args.input.lower().endswith(EXTENSION):
+        # Los espectros ya están calculados; la malla es la del almacén
+        with ResultStore(args.input) as almacen:
+            manifiesto = export_bundle(args.output, almacen, args.formatos, workers=args.workers)
+        print(f"{len(manifiesto['casos'])} espectros en {time.perf_counter() - inicio:.2f} s -> {args.output}",
+              file=sys.stderr)
+        return 0
+
+    def resultados():
+        nonlocal errores
+        filas = iter(read_rows(args.input))
+        for bloque in iter(lambda: list(islice(filas, 256)), []):
+            bloque = compute_block(bloque, T)
+            for fila_id, mensaje in bloque['errores']:
+                print(f"Fila {fila_id}: {mensaje}", file=sys.stderr)
+            errores += len(bloque['errores'])
+            yield from block_results(bloque)
+
+    manifiesto = export_bundle(args.output, resultados(), args.formatos, workers=args.workers)
+    n_archivos = sum(len(caso['archivos']) for caso in manifiesto['casos'])
+    print(f"{len(manifiesto['casos'])} espectros, {n_archivos} archivos en {time.perf_counter() - inicio:.2f} s "
+          f"-> {args.output}", file=sys.stderr)
+    return 1 if errores else 0
@@ -44,4 +44,35 @@ FACTOR_I_OPTIONS = (
     '1.0 - Estructuras comunes',
     '1.3 - Estructuras de ocupación especial',
     '1.5 - Edificaciones esenciales'
-)
\ No newline at end of file
+)
+# Sistemas estructurales: (nombre, Ct, α) para el período T = Ct·hn^α (NEC-SE-DS 6.3.3)
+SISTEMAS_ESTRUCTURALES = {
+    'rc-frame': ('Hormigón aporticado', 0.055, 0.9),
+    'rc-wall': ('Hormigón con muros', 0.055, 0.75),
+    'steel-frame': ('Acero sin arriostramiento', 0.072, 0.8),
+    'steel-braced': ('Acero arriostrado', 0.073, 0.75),
+    'masonry': ('Mampostería estructural', 0.055, 0.75),
+}
+
+# Categorías de la revisión estructural por número de pisos y carga máxima de columna (kN)
+CATEGORIAS_EDIFICIO = ('Baja', 'Media', 'Alta', 'Especial')
+LIMITES_PISOS_CATEGORIA = (3, 10, 20)
+LIMITES_CARGA_CATEGORIA = (800, 4000, 8000)
+
+# Exploración geotécnica mínima por categoría de edificio: (número de sondeos, profundidad en m)
+EXPLORACION_CATEGORIA = ((3, 6.0), (4, 15.0), (4, 25.0), (5, 30.0))
+
+# Tipos de cimentación del estudio de suelos: (nombre, criterio de la profundidad de exploración)
+CIMENTACIONES = {
+    'footing': ('Zapata superficial', '2.5 x ancho de zapata'),
+    'raft': ('Losa de cimentación', '1.5 x ancho de losa'),
+    'pile': ('Pilote individual', 'longitud + 4 diametros'),
+    'pile-group': ('Grupo de pilotes', 'max(L + 2B grupo, 2.5B cabezal)'),
+    'excavation': ('Excavación / subsuelo', '1.5 x profundidad de excavacion'),
+}
+
+# Factor de seguridad de la capacidad portante por caso de carga
+FACTORES_SEGURIDAD_CARGA = {'normal': 3.0, 'maximum': 2.5, 'seismic': 1.5}
+
+# Clasificación USCS de los suelos cohesivos (finos y orgánicos)
+USCS_COHESIVOS = ('ML', 'CL', 'OL', 'MH', 'CH', 'OH', 'PT')
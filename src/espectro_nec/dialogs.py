@@ -0,0 +1,141 @@
+"""Diálogos de la interfaz gráfica para elegir archivos y exportar con aviso al usuario."""
+
+import os
+from tkinter import filedialog
+from ttkbootstrap.dialogs import Messagebox
+
+from .export_utilities import write_etabs, write_excel, write_image, write_pdf_report
+
+
+FILE_DIALOGS = {
+    "barrido": dict(
+        defaultextension=".npz",
+        filetypes=[("Arreglos NumPy", "*.npz"), ("CSV files", "*.csv"), ("All files", "*.*")],
+        title="Guardar barrido de sensibilidad",
+    ),
+    "etabs": dict(
+        defaultextension=".txt",
+        filetypes=[("Text files", "*.txt"), ("All files", "*.*")],
+        title="Guardar espectro para ETABS",
+    ),
+    "excel": dict(
+        defaultextension=".xlsx",
+        filetypes=[("Excel files", "*.xlsx"), ("All files", "*.*")],
+        title="Guardar espectro como Excel",
+    ),
+    "imagen": dict(
+        defaultextension=".png",
+        filetypes=[("PNG files", "*.png"), ("JPEG files", "*.jpg"), ("PDF files", "*.pdf"), ("All files", "*.*")],
+        title="Guardar gráfica como imagen",
+    ),
+    "pdf": dict(
+        defaultextension=".pdf",
+        filetypes=[("PDF files", "*.pdf"), ("All files", "*.*")],
+        title="Guardar reporte como PDF",
+    ),
+    "registros": dict(
+        filetypes=[("Acelerogramas", "*.AT2 *.at2 *.txt *.csv *.dat"), ("All files", "*.*")],
+        title="Abrir acelerogramas",
+    ),
+    "traza": dict(
+        defaultextension=".json",
+        filetypes=[("Chrome trace", "*.json"), ("All files", "*.*")],
+        title="Guardar traza de rendimiento",
+    ),
+}
+
+
+def ask_save_path(kind):
+    """
+    Pide al usuario la ruta de destino de una exportación
+
+    Args:
+        kind: Tipo de exportación ('barrido', 'etabs', 'excel', 'imagen', 'pdf' o 'traza')
+
+    Returns:
+        Ruta elegida o None si el usuario cancela
+    """
+    return filedialog.asksaveasfilename(**FILE_DIALOGS[kind]) or None
+
+
+def ask_open_paths(kind):
+    """
+    Pide al usuario uno o varios archivos de entrada
+
+    Returns:
+        Lista de rutas elegidas (vacía si el usuario cancela)
+    """
+    return list(filedialog.askopenfilenames(**FILE_DIALOGS[kind]))
+
+
+def export_to_etabs(T, Si):
+    """
+    Exporta el espectro inelástico a un archivo de texto compatible con ETABS.
+    El formato es: Período (s) vs Aceleración (g)
+    """
+    try:
+        file_path = ask_save_path("etabs")
+
+        if not file_path:
+            return
+
+        write_etabs(file_path, T, Si)
+
+        Messagebox.showinfo("Éxito", f"Datos para ETABS exportados correctamente a {os.path.basename(file_path)}")
+
+    except Exception as e:
+        Messagebox.showerror("Error", f"Error al exportar los datos para ETABS: {str(e)}")
+
+
+def export_to_excel(T, Sa, Se, Si, zona_sismica, tipo_suelo, region, r_valor, i_valor, phi_p, phi_e):
+    """
+    Exporta los datos del espectro a un archivo Excel
+    """
+    try:
+        file_path = ask_save_path("excel")
+
+        if not file_path:
+            return
+
+        write_excel(file_path, T, Sa, Se, Si, zona_sismica, tipo_suelo, region, r_valor, i_valor, phi_p, phi_e)
+
+        Messagebox.showinfo("Éxito", f"Datos exportados correctamente a {os.path.basename(file_path)}")
+
+    except Exception as e:
+        Messagebox.showerror("Error", f"Error al exportar los datos: {str(e)}")
+
+
+def save_image(fig):
+    """
+    Guarda la figura del espectro como una imagen
+    """
+    try:
+        file_path = ask_save_path("imagen")
+
+        if not file_path:
+            return
+
+        write_image(file_path, fig)
+
+        Messagebox.showinfo("Éxito", f"Imagen guardada correctamente como {os.path.basename(file_path)}")
+
+    except Exception as e:
+        Messagebox.showerror("Error", f"Error al guardar la imagen: {str(e)}")
+
+
+def generate_pdf_report(T, Sa, Se, Si, zona_sismica, tipo_suelo, region, r_valor, i_valor, phi_p, phi_e, fig=None,
+                        vector=True):
+    """
+    Genera un reporte PDF con un diseño mejorado.
+    """
+    try:
+        file_path = ask_save_path("pdf")
+        if not file_path:
+            return
+
+        write_pdf_report(file_path, T, Sa, Se, Si, zona_sismica, tipo_suelo, region, r_valor, i_valor, phi_p, phi_e, fig,
+                         vector=vector)
+        Messagebox.showinfo("Éxito", f"Reporte PDF mejorado generado correctamente en: {os.path.basename(file_path)}")
+
+    except Exception as e:
+        Messagebox.showerror("Error", f"Error al generar el reporte PDF: {str(e)}")
@@ -1,50 +1,98 @@
+"""
+Capa de exportación sin interfaz: xlsx, ETABS, PNG/SVG y PDF hacia rutas, flujos binarios o bytes
+
+Los diálogos de archivo y los avisos de la aplicación están en dialogs.py.
+"""
+
+import math
 import os
 import io
-import pandas as pd
+import zipfile
+from contextlib import contextmanager
+from xml.sax.saxutils import escape as xml_escape
+
 import numpy as np
-from tkinter import filedialog
-from ttkbootstrap.dialogs import Messagebox
+
+from .bulk_export import format_etabs
+from .instrumentation import span
 
 
 SOURCE_FOOTER = "Fuente: Ing. Vinces Mendoza Maikel Andres - CodeNormative v.0.2"
 
 
-def export_to_etabs(T, Si):
+# Formato -> (tipo MIME, extensión) de las exportaciones de un espectro (ver export_spectrum)
+FORMATOS_EXPORTACION = {
+    "etabs": ("text/plain; charset=us-ascii", ".txt"),
+    "xlsx": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", ".xlsx"),
+    "pdf": ("application/pdf", ".pdf"),
+    "png": ("image/png", ".png"),
+    "svg": ("image/svg+xml", ".svg"),
+}
+
+
+def _avance(progreso, fraccion, mensaje):
+    if progreso is not None:
+        progreso(fraccion, mensaje)
+
+
+@contextmanager
+def _destino_binario(destino):
+    # Un flujo recibido se usa tal cual y no se cierra; una ruta se abre y se cierra aquí
+    if hasattr(destino, "write"):
+        yield destino
+    else:
+        with open(destino, "wb") as archivo:
+            yield archivo
+
+
+def export_bytes(writer, *args, **kwargs):
     """
-    Exporta el espectro inelástico a un archivo de texto compatible con ETABS.
-    El formato es: Período (s) vs Aceleración (g)
+    Ejecuta un escritor de este módulo sobre un búfer en memoria
+
+    Args:
+        writer: write_etabs, write_excel, write_image, write_pdf_report, export_spectrum, ...
+        args, kwargs: Argumentos del escritor después del destino
+
+    Returns:
+        memoryview del contenido escrito, sin copiarlo (bytes(...) si se necesita una copia)
     """
-    try:
-        file_path = filedialog.asksaveasfilename(
-            defaultextension=".txt",
-            filetypes=[("Text files", "*.txt"), ("All files", "*.*")],
-            title="Guardar espectro para ETABS",
-        )
+    buffer = io.BytesIO()
+    writer(buffer, *args, **kwargs)
+    return buffer.getbuffer()
 
-        if not file_path:
-            return
 
-        # ETABS requiere los datos en un formato de dos columnas: Periodo, Aceleracion
-        # Los datos se guardan separados por espacios
-        export_data = np.vstack((T, Si)).T
-        
-        # Agregar el punto (0, Si[0]) que ETABS requiere
-        initial_point = np.array([[0, Si[0]]])
-        export_data = np.vstack((initial_point, export_data))
+def write_etabs(destino, T, Si, progreso=None):
+    """
+    Escribe el espectro inelástico en un archivo de texto compatible con ETABS.
+    El formato es: Período (s) vs Aceleración (g)
 
-        np.savetxt(file_path, export_data, fmt="%.4f", delimiter="    ", header="Espectro Sismico", comments="")
+    Args:
+        destino: Ruta o flujo binario
+    """
+    _avance(progreso, 0.0, "Preparando datos para ETABS")
 
-        Messagebox.showinfo("Éxito", f"Datos para ETABS exportados correctamente a {os.path.basename(file_path)}")
+    # Dos columnas (Periodo, Aceleracion) separadas por espacios, con el punto T = 0 que ETABS requiere
+    with span("etabs.formatear", puntos=len(T)):
+        contenido = format_etabs(T, Si)
 
-    except Exception as e:
-        Messagebox.showerror("Error", f"Error al exportar los datos para ETABS: {str(e)}")
+    _avance(progreso, 0.5, "Escribiendo archivo ETABS")
+    with span("etabs.escribir", bytes=len(contenido)), _destino_binario(destino) as archivo:
+        archivo.write(contenido)
+    _avance(progreso, 1.0, "Archivo ETABS escrito")
 
 
-def export_to_excel(T, Sa, Se, Si, zona_sismica, tipo_suelo, region, r_valor, i_valor, phi_p, phi_e):
+def write_excel(destino, T, Sa, Se, Si, zona_sismica, tipo_suelo, region, r_valor, i_valor, phi_p, phi_e,
+                progreso=None):
     """
-    Exporta los datos del espectro a un archivo Excel
+    Escribe los datos del espectro en un archivo Excel
+
+    Args:
+        destino: Ruta o flujo binario
     """
-    try:
+    import pandas as pd
+
+    _avance(progreso, 0.0, "Preparando tabla del espectro")
+    with span("excel.dataframe"):
         df = pd.DataFrame(
             {
                 "Periodo (s)": T,
@@ -54,212 +102,581 @@ def export_to_excel(T, Sa, Se, Si, zona_sismica, tipo_suelo, region, r_valor, i_
             }
         )
 
-        file_path = filedialog.asksaveasfilename(
-            defaultextension=".xlsx",
-            filetypes=[("Excel files", "*.xlsx"), ("All files", "*.*")],
-            title="Guardar espectro como Excel",
+    _avance(progreso, 0.3, "Escribiendo libro Excel")
+    with span("excel.escribir", filas=len(df)), pd.ExcelWriter(destino, engine="openpyxl") as writer:
+        df.to_excel(writer, sheet_name="Espectro", index=False)
+
+        params_df = pd.DataFrame(
+            {
+                "Parámetro": [
+                    "Zona Sísmica",
+                    "Región",
+                    "Tipo de Suelo",
+                    "Factor R",
+                    "Factor I",
+                    "Factor ØP",
+                    "Factor ØE",
+                    "Fuente",
+                ],
+                "Valor": [
+                    zona_sismica,
+                    region,
+                    tipo_suelo,
+                    r_valor,
+                    i_valor,
+                    phi_p,
+                    phi_e,
+                    SOURCE_FOOTER,
+                ],
+            }
         )
+        params_df.to_excel(writer, sheet_name="Parámetros", index=False)
+    _avance(progreso, 1.0, "Libro Excel escrito")
+
+
+# Columnas de la hoja índice "Parámetros": (encabezado, clave en cada resultado)
+INDICE_COLUMNAS = (
+    ("Id", "id"),
+    ("Zona Sísmica", "zona_sismica"),
+    ("Región", "region"),
+    ("Tipo de Suelo", "tipo_suelo"),
+    ("Factor R", "r"),
+    ("Factor I", "i"),
+    ("Factor ØP", "phi_p"),
+    ("Factor ØE", "phi_e"),
+    ("Z", "Z"),
+    ("η", "eta"),
+    ("Fa", "Fa"),
+    ("Fd", "Fd"),
+    ("Fs", "Fs"),
+    ("r", "r_caida"),
+    ("T0 (s)", "T0"),
+    ("Tc (s)", "Tc"),
+    ("TL (s)", "TL"),
+)
+
+_CARACTERES_HOJA_INVALIDOS = str.maketrans({c: "_" for c in "[]:*?/\\"})
+
+_XLSX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    '{hojas}</Types>'
+)
+_XLSX_CONTENT_TYPE_HOJA = (
+    '<Override PartName="/xl/worksheets/sheet{n}.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+)
+_XLSX_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/></Relationships>'
+)
+_XLSX_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets>{hojas}</sheets></workbook>'
+)
+_XLSX_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '{hojas}<Relationship Id="rIdEstilos" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>'
+    '</Relationships>'
+)
+_XLSX_STYLES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="1"><fill><patternFill patternType="none"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/></cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    '</styleSheet>'
+)
+_XLSX_HOJA_INICIO = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+_XLSX_HOJA_FIN = '</sheetData></worksheet>'
+
+
+def _xlsx_celda(valor):
+    if valor is None:
+        return '<c/>'
+    if isinstance(valor, np.generic):
+        valor = valor.item()
+    if isinstance(valor, (int, float)) and not isinstance(valor, bool):
+        # NaN e infinito no tienen representación en SpreadsheetML: celda vacía
+        return f'<c><v>{valor!r}</v></c>' if math.isfinite(valor) else '<c/>'
+    return f'<c t="inlineStr"><is><t>{xml_escape(str(valor))}</t></is></c>'
+
+
+def _xlsx_fila(valores):
+    return '<row>' + ''.join(_xlsx_celda(v) for v in valores) + '</row>'
+
+
+def _xlsx_filas_numericas(datos):
+    """
+    Formatea una matriz numérica como filas SpreadsheetML con una sola operación
+    de formato; los valores no finitos quedan como celdas vacías
+    """
+    if not np.isfinite(datos).all():
+        return ''.join(_xlsx_fila(fila) for fila in datos.tolist())
+    n_filas, n_columnas = datos.shape
+    plantilla = '<row>' + '<c><v>%r</v></c>' * n_columnas + '</row>'
+    return (plantilla * n_filas) % tuple(datos.ravel().tolist())
+
 
-        if not file_path:
-            return
-
-        with pd.ExcelWriter(file_path, engine="openpyxl") as writer:
-            df.to_excel(writer, sheet_name="Espectro", index=False)
-
-            params_df = pd.DataFrame(
-                {
-                    "Parámetro": [
-                        "Zona Sísmica",
-                        "Región",
-                        "Tipo de Suelo",
-                        "Factor R",
-                        "Factor I",
-                        "Factor ØP",
-                        "Factor ØE",
-                        "Fuente",
-                    ],
-                    "Valor": [
-                        zona_sismica,
-                        region,
-                        tipo_suelo,
-                        r_valor,
-                        i_valor,
-                        phi_p,
-                        phi_e,
-                        SOURCE_FOOTER,
-                    ],
-                }
-            )
-            params_df.to_excel(writer, sheet_name="Parámetros", index=False)
-
-        Messagebox.showinfo("Éxito", f"Datos exportados correctamente a {os.path.basename(file_path)}")
-
-    except Exception as e:
-        Messagebox.showerror("Error", f"Error al exportar los datos: {str(e)}")
-
-
-def save_image(fig):
+class SpectrumWorkbookWriter:
     """
-    Guarda la figura del espectro como una imagen
+    Libro Excel con una hoja por espectro y una hoja índice "Parámetros"
+
+    Cada hoja se escribe directamente como una entrada del archivo .xlsx (zip)
+    en cuanto se agrega, de modo que la memoria no crece con el número de
+    espectros; solo se retiene una fila de índice por espectro. No requiere
+    pandas ni openpyxl.
+
+    Uso:
+        with SpectrumWorkbookWriter("entrega.xlsx") as libro:
+            for resultado in resultados:
+                libro.add(resultado)
     """
-    try:
-        file_path = filedialog.asksaveasfilename(
-            defaultextension=".png",
-            filetypes=[("PNG files", "*.png"), ("JPEG files", "*.jpg"), ("PDF files", "*.pdf"), ("All files", "*.*")],
-            title="Guardar gráfica como imagen",
-        )
 
-        if not file_path:
-            return
+    def __init__(self, file_path, T=None):
+        """
+        Args:
+            file_path: Ruta o flujo binario de destino
+            T: Malla de períodos común, para resultados que no traen la suya
+        """
+        self.file_path = file_path
+        self.T = T
+        self.zip = zipfile.ZipFile(file_path, "w", compression=zipfile.ZIP_DEFLATED)
+        self.hojas = []
+        self.indice = [["Hoja", *(encabezado for encabezado, _ in INDICE_COLUMNAS)]]
+        self.nombres = {"parámetros"}
+        self.n_espectros = 0
+
+    def _nombre_hoja(self, base):
+        base = (str(base).translate(_CARACTERES_HOJA_INVALIDOS) or "Espectro")[:31]
+        nombre, k = base, 1
+        while nombre.lower() in self.nombres:
+            k += 1
+            sufijo = f" ({k})"
+            nombre = base[:31 - len(sufijo)] + sufijo
+        self.nombres.add(nombre.lower())
+        return nombre
+
+    def _escribir_hoja(self, nombre, partes):
+        self.hojas.append(nombre)
+        with self.zip.open(f"xl/worksheets/sheet{len(self.hojas)}.xml", "w") as destino:
+            destino.write(_XLSX_HOJA_INICIO.encode())
+            for parte in partes:
+                destino.write(parte.encode("utf-8"))
+            destino.write(_XLSX_HOJA_FIN.encode())
+
+    def add(self, resultado):
+        """
+        Agrega un espectro como hoja nueva y su fila en el índice
+
+        Args:
+            resultado: Mapeo con 'Sa' y 'Si' (y opcionalmente 'T', 'Se' y las
+                claves de INDICE_COLUMNAS)
+
+        Returns:
+            Nombre de la hoja creada
+        """
+        self.n_espectros += 1
+        T = resultado.get("T", self.T)
+        if T is None:
+            raise ValueError("El resultado no incluye 'T' y el libro no tiene malla de períodos común.")
+        Sa, Si = resultado["Sa"], resultado["Si"]
+        Se = resultado.get("Se", Sa)
+
+        nombre = self._nombre_hoja(resultado.get("id") or f"Espectro {self.n_espectros}")
+        encabezado = _xlsx_fila(["Periodo (s)", "Sa (g)", "Se (g)", "Si (g)"])
+        datos = np.column_stack((T, Sa, Se, Si)).astype(np.float64, copy=False)
+        self._escribir_hoja(nombre, (encabezado, _xlsx_filas_numericas(datos)))
+
+        self.indice.append([nombre, *(resultado.get(clave) for _, clave in INDICE_COLUMNAS)])
+        return nombre
+
+    def close(self):
+        self.indice.append([])
+        self.indice.append(["Fuente", SOURCE_FOOTER])
+        self._escribir_hoja("Parámetros", (_xlsx_fila(fila) for fila in self.indice))
+
+        # "Parámetros" es la última entrada escrita pero la primera hoja del libro
+        orden = [len(self.hojas), *range(1, len(self.hojas))]
+        self.zip.writestr("[Content_Types].xml", _XLSX_CONTENT_TYPES.format(
+            hojas="".join(_XLSX_CONTENT_TYPE_HOJA.format(n=n) for n in orden)))
+        self.zip.writestr("_rels/.rels", _XLSX_RELS)
+        self.zip.writestr("xl/workbook.xml", _XLSX_WORKBOOK.format(hojas="".join(
+            f'<sheet name="{xml_escape(self.hojas[n - 1], {chr(34): "&quot;"})}" sheetId="{k}" r:id="rId{n}"/>'
+            for k, n in enumerate(orden, start=1))))
+        self.zip.writestr("xl/_rels/workbook.xml.rels", _XLSX_WORKBOOK_RELS.format(hojas="".join(
+            f'<Relationship Id="rId{n}" '
+            f'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+            f'Target="worksheets/sheet{n}.xml"/>'
+            for n in orden)))
+        self.zip.writestr("xl/styles.xml", _XLSX_STYLES)
+        self.zip.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.zip.close()
+
+
+def write_spectra_workbook(file_path, resultados, T=None, progreso=None, total=None):
+    """
+    Escribe muchos espectros en un libro Excel sin retenerlos en memoria
 
-        fig.savefig(file_path, dpi=300, bbox_inches="tight")
+    Args:
+        file_path: Ruta o flujo binario de destino
+        resultados: Iterable de mapeos (ver SpectrumWorkbookWriter.add)
+        T: Malla de períodos común, para resultados que no traen la suya
+        progreso: Callable progreso(fraccion, mensaje), opcional
+        total: Número esperado de resultados, para informar el avance
 
-        Messagebox.showinfo("Éxito", f"Imagen guardada correctamente como {os.path.basename(file_path)}")
+    Returns:
+        Número de espectros escritos
+    """
+    with SpectrumWorkbookWriter(file_path, T=T) as libro:
+        for resultado in resultados:
+            nombre = libro.add(resultado)
+            if total:
+                _avance(progreso, libro.n_espectros / total, f"Hoja {nombre}")
+        _avance(progreso, 1.0, "Guardando libro Excel")
+    return libro.n_espectros
 
-    except Exception as e:
-        Messagebox.showerror("Error", f"Error al guardar la imagen: {str(e)}")
 
+def write_image(destino, fig, progreso=None, formato=None):
+    """
+    Guarda la figura del espectro como una imagen
 
-def generate_pdf_report(T, Sa, Se, Si, zona_sismica, tipo_suelo, region, r_valor, i_valor, phi_p, phi_e, fig):
+    Args:
+        destino: Ruta o flujo binario
+        formato: 'png', 'svg', 'pdf', ...; por defecto el de la extensión de la ruta,
+            o PNG si destino es un flujo
     """
-    Genera un reporte PDF con un diseño mejorado.
+    if formato is None and hasattr(destino, "write"):
+        formato = "png"
+    _avance(progreso, 0.0, "Renderizando imagen")
+    with span("imagen.savefig", formato=formato):
+        fig.savefig(destino, format=formato, dpi=300, bbox_inches="tight")
+    _avance(progreso, 1.0, "Imagen guardada")
+
+
+def spectrum_figure(T, Sa, Si, T0, Tc, TL, info_text):
     """
-    try:
-        from reportlab.lib.pagesizes import letter
-        from reportlab.lib import colors
-        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, Table, TableStyle, Frame, PageTemplate
-        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-        from reportlab.lib.units import inch
-        from reportlab.lib.colors import HexColor
-
-        # Colores y Estilos
-        primary_color = HexColor("#1f6feb")
-        secondary_color = HexColor("#0d1117")
-        text_color = HexColor("#e6edf3")
-        bg_color = HexColor("#f6f8fa")
-
-        styles = getSampleStyleSheet()
-        styles.add(ParagraphStyle(name='TitleStyle', fontSize=18, alignment=1, spaceAfter=20, textColor=secondary_color))
-        styles.add(ParagraphStyle(name='HeaderStyle', fontSize=14, spaceAfter=12, textColor=primary_color))
-        styles.add(ParagraphStyle(name='BodyStyle', fontSize=10, leading=14, textColor=secondary_color))
-        styles.add(ParagraphStyle(name='FooterStyle', fontSize=8, alignment=1, textColor=colors.grey))
-
-        # --- Creación del PDF ---
-        file_path = filedialog.asksaveasfilename(
-            defaultextension=".pdf",
-            filetypes=[("PDF files", "*.pdf"), ("All files", "*.*")],
-            title="Guardar reporte como PDF",
-        )
-        if not file_path:
-            return
-
-        doc = SimpleDocTemplate(file_path, pagesize=letter, topMargin=1.5*inch, bottomMargin=1*inch)
-        
-        # --- Cabecera y Pie de Página ---
-        def header(canvas, doc):
-            canvas.saveState()
-            canvas.setFillColor(primary_color)
-            canvas.rect(doc.leftMargin, doc.height + 0.7*inch, doc.width, 0.5*inch, fill=1, stroke=0)
-            
-            # --- Placeholder para el logo ---
-            # Reemplazar 'logo.png' con la ruta a un logo real
-            logo_path = "logo.png" 
-            if os.path.exists(logo_path):
-                canvas.drawImage(logo_path, doc.leftMargin + 0.1*inch, doc.height + 0.8*inch, 
-                                 width=0.6*inch, height=0.6*inch, mask='auto')
-            
-            canvas.setFillColor(colors.white)
-            canvas.setFont('Helvetica-Bold', 16)
-            canvas.drawCentredString(doc.width/2 + doc.leftMargin, doc.height + 0.95*inch, "Reporte de Diseño Sísmico")
-            canvas.restoreState()
-
-        def footer(canvas, doc):
-            canvas.saveState()
-            canvas.setFont('Helvetica', 9)
-            canvas.setFillColor(colors.grey)
-            footer_text = f"Página {doc.page} | {SOURCE_FOOTER}"
-            canvas.drawCentredString(doc.width/2 + doc.leftMargin, 0.5 * inch, footer_text)
-            canvas.restoreState()
-
-        frame = Frame(doc.leftMargin, doc.bottomMargin, doc.width, doc.height, id='normal')
-        template = PageTemplate(id='main_template', frames=[frame], onPage=header, onPageEnd=footer)
-        doc.addPageTemplates([template])
-
-        elements = []
-        
-        # --- Contenido ---
-        from .seismic_calculations import calculate_parameters
-        parametros, eta, Z = calculate_parameters(tipo_suelo, zona_sismica, region)
-        Fa, Fd, Fs, r = parametros["Fa"], parametros["Fd"], parametros["Fs"], parametros["r"]
-        T0, Tc, TL = 0.1 * Fs * Fd / Fa, 0.55 * Fs * Fd / Fa, 2.4 * Fd
-
-        elements.append(Paragraph("1. Parámetros de Entrada", styles['HeaderStyle']))
-        
-        param_data = [
-            ['Zona Sísmica:', f"{zona_sismica} ({Z}g)", 'Región:', region],
-            ['Tipo de Suelo:', tipo_suelo, 'Factor R:', f"{r_valor:.2f}"],
-            ['Factor I:', f"{i_valor:.2f}", 'Factor ØP:', f"{phi_p:.2f}"],
-            ['Factor ØE:', f"{phi_e:.2f}", '', '']
-        ]
-        param_table = Table(param_data, colWidths=[1.5*inch, 1.5*inch, 1.5*inch, 1.5*inch])
-        param_table.setStyle(TableStyle([
-            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('TEXTCOLOR', (0, 0), (-1, -1), secondary_color),
-            ('GRID', (0,0), (-1,-1), 0.5, colors.lightgrey),
-            ('BACKGROUND', (0, 0), (0, -1), bg_color),
-            ('BACKGROUND', (2, 0), (2, -1), bg_color),
-        ]))
-        elements.append(param_table)
-        elements.append(Spacer(1, 0.2*inch))
-
-        elements.append(Paragraph("2. Parámetros Sísmicos Calculados (NEC)", styles['HeaderStyle']))
-        calc_param_data = [
-            ['Fa:', f"{Fa:.3f}", 'Fd:', f"{Fd:.3f}", 'Fs:', f"{Fs:.3f}"],
-            ['η:', f"{eta:.3f}", 'T0 (s):', f"{T0:.3f}"],
-            ['Tc (s):', f"{Tc:.3f}", 'TL (s):', f"{TL:.3f}"]
-        ]
-        calc_param_table = Table(calc_param_data, colWidths=[2*inch, 1*inch, 2*inch, 1*inch])
-        calc_param_table.setStyle(TableStyle([
-            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-             ('GRID', (0,0), (-1,-1), 0.5, colors.lightgrey),
-        ]))
-        elements.append(calc_param_table)
-        elements.append(Spacer(1, 0.2*inch))
-
-        elements.append(Paragraph("3. Gráfico del Espectro de Diseño", styles['HeaderStyle']))
-        
-        buf = io.BytesIO()
-        fig.savefig(buf, format="png", dpi=300, bbox_inches="tight")
-        buf.seek(0)
-        img = Image(buf, width=6*inch, height=4*inch)
-        elements.append(img)
-        elements.append(Spacer(1, 0.2*inch))
-        
-        elements.append(Paragraph("4. Tabla de Datos del Espectro", styles['HeaderStyle']))
-        
-        # Crear tabla de datos del espectro
-        max_rows = 20
-        step = max(1, len(T) // max_rows)
-        spectrum_data = [['Período (s)', 'Sa (g)', 'Se (g)', 'Si (g)']]
-        for i in range(0, len(T), step):
-            spectrum_data.append([f"{T[i]:.3f}", f"{Sa[i]:.4f}", f"{Se[i]:.4f}", f"{Si[i]:.4f}"])
-            
-        spectrum_table = Table(spectrum_data)
-        spectrum_table.setStyle(TableStyle([
-            ('BACKGROUND', (0,0), (-1,0), primary_color),
-            ('TEXTCOLOR', (0,0), (-1,0), colors.white),
-            ('ALIGN', (0,0), (-1,-1), 'CENTER'),
-            ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
-            ('BOTTOMPADDING', (0,0), (-1,0), 12),
-            ('BACKGROUND', (0,1), (-1,-1), bg_color),
-            ('GRID', (0,0), (-1,-1), 1, colors.grey)
-        ]))
-        elements.append(spectrum_table)
-        
+    Figura de matplotlib del espectro, igual a la de la aplicación, sin Tk ni pyplot
+
+    Returns:
+        matplotlib.figure.Figure
+    """
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(8, 6))
+    ax = fig.add_subplot()
+    ax.plot(T, Sa, "b-", label="Sa (Espectro de aceleración)")
+    ax.plot(T, Si, "r-", label="Si (Espectro inelástico)")
+    for valor, nombre, color in ((T0, "T0", "g"), (Tc, "Tc", "m"), (TL, "TL", "c")):
+        ax.axvline(x=valor, color=color, linestyle="--", alpha=0.7, label=f"{nombre} = {valor:.2f}s")
+    ax.set_title("Espectro de Diseño Sísmico NEC")
+    ax.set_xlabel("Período T (s)")
+    ax.set_ylabel("Aceleración Sa (g)")
+    ax.set_xlim(0, max(5, TL + 0.1))
+    ax.set_ylim(0, 1.1 * max(np.max(Sa), np.max(Si)))
+    ax.grid(True)
+    ax.legend(loc="upper right")
+    ax.text(0.02, 0.02, info_text, transform=ax.transAxes, bbox=dict(facecolor="white", alpha=0.8))
+    return fig
+
+
+def _ticks(maximo, objetivo=6):
+    """Marcas 'redondas' (1, 2, 2.5 o 5 x 10^k) entre 0 y maximo."""
+    crudo = maximo / objetivo
+    potencia = 10 ** np.floor(np.log10(crudo))
+    paso = potencia * min((m for m in (1, 2, 2.5, 5, 10) if m * potencia >= crudo))
+    return np.arange(0, maximo + paso * 1e-9, paso), paso
+
+
+def spectrum_drawing(T, Sa, Si, T0, Tc, TL, info_text, width, height):
+    """
+    Dibuja el espectro como gráfico vectorial de reportlab (sin rasterizar)
+
+    Reproduce la gráfica de la aplicación: Sa y Si, líneas de T0, Tc y TL,
+    rejilla, leyenda y recuadro con los parámetros.
+
+    Returns:
+        reportlab.graphics.shapes.Drawing de width x height puntos
+    """
+    from reportlab.graphics.shapes import Drawing, Group, Line, PolyLine, Rect, String
+    from reportlab.lib import colors
+
+    azul, rojo = colors.HexColor("#1f77b4"), colors.HexColor("#d62728")
+    marcas = ((T0, "T0", colors.green), (Tc, "Tc", colors.magenta), (TL, "TL", colors.cyan))
+
+    dibujo = Drawing(width, height)
+    izq, der, abajo, arriba = 48, 10, 34, 22
+    ancho, alto = width - izq - der, height - abajo - arriba
+
+    x_max = max(5, TL + 0.1)
+    x_ticks, _ = _ticks(x_max)
+    y_ticks, y_paso = _ticks(max(Sa.max(), Si.max()) * 1.05)
+    y_max = y_ticks[-1] if y_ticks[-1] >= max(Sa.max(), Si.max()) else y_ticks[-1] + y_paso
+
+    def px(t):
+        return izq + np.asarray(t) / x_max * ancho
+
+    def py(a):
+        return abajo + np.asarray(a) / y_max * alto
+
+    # Rejilla y marcas de ejes
+    for t in x_ticks:
+        dibujo.add(Line(px(t), abajo, px(t), abajo + alto, strokeColor=colors.lightgrey, strokeWidth=0.4))
+        dibujo.add(String(px(t), abajo - 11, f"{t:g}", fontName="Helvetica", fontSize=7, textAnchor="middle"))
+    for a in y_ticks:
+        dibujo.add(Line(izq, py(a), izq + ancho, py(a), strokeColor=colors.lightgrey, strokeWidth=0.4))
+        dibujo.add(String(izq - 4, py(a) - 2.5, f"{a:g}", fontName="Helvetica", fontSize=7, textAnchor="end"))
+    dibujo.add(Rect(izq, abajo, ancho, alto, fillColor=None, strokeColor=colors.black, strokeWidth=0.6))
+
+    # Curvas, recortadas al dominio visible
+    visible = T <= x_max
+    for valores, color in ((Sa, azul), (Si, rojo)):
+        puntos = np.column_stack((px(T[visible]), py(valores[visible]))).ravel().tolist()
+        dibujo.add(PolyLine(puntos, strokeColor=color, strokeWidth=1.1))
+    for valor, _, color in marcas:
+        if valor <= x_max:
+            dibujo.add(Line(px(valor), abajo, px(valor), abajo + alto, strokeColor=color, strokeWidth=0.8,
+                            strokeDashArray=[3, 2]))
+
+    # Títulos
+    dibujo.add(String(izq + ancho / 2, height - 14, "Espectro de Diseño Sísmico NEC", fontName="Helvetica-Bold",
+                      fontSize=10, textAnchor="middle"))
+    dibujo.add(String(izq + ancho / 2, 6, "Período T (s)", fontName="Helvetica", fontSize=8, textAnchor="middle"))
+    etiqueta_y = String(0, 0, "Aceleración Sa (g)", fontName="Helvetica", fontSize=8, textAnchor="middle")
+    eje_y = Group(etiqueta_y)
+    eje_y.rotate(90)
+    eje_y.translate(abajo + alto / 2, -12)
+    dibujo.add(eje_y)
+
+    # Leyenda (esquina superior derecha)
+    entradas = [("Sa (Espectro de aceleración)", azul, None), ("Si (Espectro inelástico)", rojo, None)]
+    entradas += [(f"{nombre} = {valor:.2f}s", color, [3, 2]) for valor, nombre, color in marcas]
+    alto_leyenda = 11 * len(entradas) + 6
+    x0, y0 = izq + ancho - 128, abajo + alto - alto_leyenda - 4
+    dibujo.add(Rect(x0, y0, 124, alto_leyenda, fillColor=colors.white, strokeColor=colors.lightgrey, strokeWidth=0.5))
+    for k, (texto, color, guiones) in enumerate(entradas):
+        y = y0 + alto_leyenda - 10 - 11 * k
+        dibujo.add(Line(x0 + 5, y + 2.5, x0 + 20, y + 2.5, strokeColor=color, strokeWidth=1.1,
+                        strokeDashArray=guiones))
+        dibujo.add(String(x0 + 24, y, texto, fontName="Helvetica", fontSize=7))
+
+    # Recuadro de parámetros (esquina inferior izquierda)
+    lineas = info_text.split("\n")
+    dibujo.add(Rect(izq + 4, abajo + 4, 180, 10 * len(lineas) + 6, fillColor=colors.white,
+                    strokeColor=colors.black, strokeWidth=0.5))
+    for k, linea in enumerate(lineas):
+        dibujo.add(String(izq + 8, abajo + 8 + 10 * (len(lineas) - 1 - k), linea, fontName="Helvetica", fontSize=7))
+
+    return dibujo
+
+
+def write_pdf_report(destino, T, Sa, Se, Si, zona_sismica, tipo_suelo, region, r_valor, i_valor, phi_p, phi_e,
+                     fig=None, progreso=None, vector=True):
+    """
+    Escribe un reporte PDF con un diseño mejorado.
+
+    Con vector=True (por defecto) el gráfico se dibuja como contenido vectorial
+    del PDF; con vector=False se inserta fig rasterizada a 300 dpi. destino
+    puede ser una ruta o un flujo binario.
+    """
+    if not vector and fig is None:
+        raise ValueError("El reporte rasterizado requiere la figura.")
+    _avance(progreso, 0.0, "Preparando reporte PDF")
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib import colors
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, Table, TableStyle, Frame, PageTemplate
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.units import inch
+    from reportlab.lib.colors import HexColor
+
+    # Colores y Estilos
+    primary_color = HexColor("#1f6feb")
+    secondary_color = HexColor("#0d1117")
+    text_color = HexColor("#e6edf3")
+    bg_color = HexColor("#f6f8fa")
+
+    styles = getSampleStyleSheet()
+    styles.add(ParagraphStyle(name='TitleStyle', fontSize=18, alignment=1, spaceAfter=20, textColor=secondary_color))
+    styles.add(ParagraphStyle(name='HeaderStyle', fontSize=14, spaceAfter=12, textColor=primary_color))
+    styles.add(ParagraphStyle(name='BodyStyle', fontSize=10, leading=14, textColor=secondary_color))
+    styles.add(ParagraphStyle(name='FooterStyle', fontSize=8, alignment=1, textColor=colors.grey))
+
+    # --- Creación del PDF ---
+    doc = SimpleDocTemplate(destino, pagesize=letter, topMargin=1.5*inch, bottomMargin=1*inch)
+
+    # --- Cabecera y Pie de Página ---
+    def header(canvas, doc):
+        canvas.saveState()
+        canvas.setFillColor(primary_color)
+        canvas.rect(doc.leftMargin, doc.height + 0.7*inch, doc.width, 0.5*inch, fill=1, stroke=0)
+
+        # --- Placeholder para el logo ---
+        # Reemplazar 'logo.png' con la ruta a un logo real
+        logo_path = "logo.png" 
+        if os.path.exists(logo_path):
+            canvas.drawImage(logo_path, doc.leftMargin + 0.1*inch, doc.height + 0.8*inch, 
+                             width=0.6*inch, height=0.6*inch, mask='auto')
+
+        canvas.setFillColor(colors.white)
+        canvas.setFont('Helvetica-Bold', 16)
+        canvas.drawCentredString(doc.width/2 + doc.leftMargin, doc.height + 0.95*inch, "Reporte de Diseño Sísmico")
+        canvas.restoreState()
+
+    def footer(canvas, doc):
+        canvas.saveState()
+        canvas.setFont('Helvetica', 9)
+        canvas.setFillColor(colors.grey)
+        footer_text = f"Página {doc.page} | {SOURCE_FOOTER}"
+        canvas.drawCentredString(doc.width/2 + doc.leftMargin, 0.5 * inch, footer_text)
+        canvas.restoreState()
+
+    frame = Frame(doc.leftMargin, doc.bottomMargin, doc.width, doc.height, id='normal')
+    template = PageTemplate(id='main_template', frames=[frame], onPage=header, onPageEnd=footer)
+    doc.addPageTemplates([template])
+
+    elements = []
+
+    # --- Contenido ---
+    from .seismic_calculations import calculate_parameters, characteristic_periods
+    parametros, eta, Z = calculate_parameters(tipo_suelo, zona_sismica, region)
+    Fa, Fd, Fs, r = parametros["Fa"], parametros["Fd"], parametros["Fs"], parametros["r"]
+    T0, Tc, TL = characteristic_periods(Fa, Fd, Fs)
+
+    elements.append(Paragraph("1. Parámetros de Entrada", styles['HeaderStyle']))
+
+    param_data = [
+        ['Zona Sísmica:', f"{zona_sismica} ({Z}g)", 'Región:', region],
+        ['Tipo de Suelo:', tipo_suelo, 'Factor R:', f"{r_valor:.2f}"],
+        ['Factor I:', f"{i_valor:.2f}", 'Factor ØP:', f"{phi_p:.2f}"],
+        ['Factor ØE:', f"{phi_e:.2f}", '', '']
+    ]
+    param_table = Table(param_data, colWidths=[1.5*inch, 1.5*inch, 1.5*inch, 1.5*inch])
+    param_table.setStyle(TableStyle([
+        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 0), (-1, -1), 10),
+        ('TEXTCOLOR', (0, 0), (-1, -1), secondary_color),
+        ('GRID', (0,0), (-1,-1), 0.5, colors.lightgrey),
+        ('BACKGROUND', (0, 0), (0, -1), bg_color),
+        ('BACKGROUND', (2, 0), (2, -1), bg_color),
+    ]))
+    elements.append(param_table)
+    elements.append(Spacer(1, 0.2*inch))
+
+    elements.append(Paragraph("2. Parámetros Sísmicos Calculados (NEC)", styles['HeaderStyle']))
+    calc_param_data = [
+        ['Fa:', f"{Fa:.3f}", 'Fd:', f"{Fd:.3f}", 'Fs:', f"{Fs:.3f}"],
+        ['η:', f"{eta:.3f}", 'T0 (s):', f"{T0:.3f}"],
+        ['Tc (s):', f"{Tc:.3f}", 'TL (s):', f"{TL:.3f}"]
+    ]
+    calc_param_table = Table(calc_param_data, colWidths=[2*inch, 1*inch, 2*inch, 1*inch])
+    calc_param_table.setStyle(TableStyle([
+        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+         ('GRID', (0,0), (-1,-1), 0.5, colors.lightgrey),
+    ]))
+    elements.append(calc_param_table)
+    elements.append(Spacer(1, 0.2*inch))
+
+    elements.append(Paragraph("3. Gráfico del Espectro de Diseño", styles['HeaderStyle']))
+
+    _avance(progreso, 0.2, "Renderizando gráfico")
+    with span("pdf.grafico", vectorial=vector):
+        if vector:
+            # Helvetica no incluye glifos griegos; se usan los rótulos de las tablas
+            info_text = (f"Z = {Z:.2f}g, R = {r_valor}, I = {i_valor}\n"
+                         f"Fa = {Fa:.2f}, Fd = {Fd:.2f}, Fs = {Fs:.2f}, eta = {eta:.2f}\n"
+                         f"ØP = {phi_p:.2f}, ØE = {phi_e:.2f}")
+            elements.append(spectrum_drawing(np.asarray(T), np.asarray(Sa), np.asarray(Si), T0, Tc, TL, info_text,
+                                             6*inch, 4*inch))
+        else:
+            buf = io.BytesIO()
+            fig.savefig(buf, format="png", dpi=300, bbox_inches="tight")
+            buf.seek(0)
+            img = Image(buf, width=6*inch, height=4*inch)
+            elements.append(img)
+    elements.append(Spacer(1, 0.2*inch))
+
+    _avance(progreso, 0.6, "Preparando tabla de datos")
+    elements.append(Paragraph("4. Tabla de Datos del Espectro", styles['HeaderStyle']))
+
+    # Crear tabla de datos del espectro
+    max_rows = 20
+    step = max(1, len(T) // max_rows)
+    spectrum_data = [['Período (s)', 'Sa (g)', 'Se (g)', 'Si (g)']]
+    for i in range(0, len(T), step):
+        spectrum_data.append([f"{T[i]:.3f}", f"{Sa[i]:.4f}", f"{Se[i]:.4f}", f"{Si[i]:.4f}"])
+
+    spectrum_table = Table(spectrum_data)
+    spectrum_table.setStyle(TableStyle([
+        ('BACKGROUND', (0,0), (-1,0), primary_color),
+        ('TEXTCOLOR', (0,0), (-1,0), colors.white),
+        ('ALIGN', (0,0), (-1,-1), 'CENTER'),
+        ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
+        ('BOTTOMPADDING', (0,0), (-1,0), 12),
+        ('BACKGROUND', (0,1), (-1,-1), bg_color),
+        ('GRID', (0,0), (-1,-1), 1, colors.grey)
+    ]))
+    elements.append(spectrum_table)
+
+    _avance(progreso, 0.7, "Componiendo documento PDF")
+    with span("pdf.build"):
         doc.build(elements)
-        Messagebox.showinfo("Éxito", f"Reporte PDF mejorado generado correctamente en: {os.path.basename(file_path)}")
+    _avance(progreso, 1.0, "Reporte PDF escrito")
+
+
+def export_spectrum(destino, formato, T, Sa, Se, Si, zona_sismica, tipo_suelo, region, r_valor, i_valor, phi_p,
+                    phi_e, progreso=None):
+    """
+    Exporta un espectro en cualquiera de FORMATOS_EXPORTACION sin interfaz gráfica
 
-    except Exception as e:
-        Messagebox.showerror("Error", f"Error al generar el reporte PDF: {str(e)}")
+    Args:
+        destino: Ruta o flujo binario
+        formato: 'etabs', 'xlsx', 'pdf', 'png' o 'svg'
+        progreso: Callable opcional progreso(fraccion, mensaje)
+    """
+    if formato not in FORMATOS_EXPORTACION:
+        raise ValueError(f"Formato no soportado: {formato!r}; use {', '.join(FORMATOS_EXPORTACION)}.")
+    entradas = (zona_sismica, tipo_suelo, region, r_valor, i_valor, phi_p, phi_e)
+    if formato == "etabs":
+        write_etabs(destino, T, Si, progreso)
+    elif formato == "xlsx":
+        write_excel(destino, T, Sa, Se, Si, *entradas, progreso=progreso)
+    elif formato == "pdf":
+        write_pdf_report(destino, T, Sa, Se, Si, *entradas, progreso=progreso)
+    else:
+        from .seismic_calculations import calculate_parameters, characteristic_periods
+        parametros, eta, Z = calculate_parameters(tipo_suelo, zona_sismica, region)
+        Fa, Fd, Fs = parametros["Fa"], parametros["Fd"], parametros["Fs"]
+        T0, Tc, TL = characteristic_periods(Fa, Fd, Fs)
+        info_text = (f"Z = {Z:.2f}g, R = {r_valor}, I = {i_valor}\n"
+                     f"Fa = {Fa:.2f}, Fd = {Fd:.2f}, Fs = {Fs:.2f}, η = {eta:.2f}\n"
+                     f"φP = {phi_p:.2f}, φE = {phi_e:.2f}")
+        fig = spectrum_figure(np.asarray(T), np.asarray(Sa), np.asarray(Si), T0, Tc, TL, info_text)
+        write_image(destino, fig, progreso, formato=formato)
@@ -0,0 +1,144 @@
+"""Cola de exportaciones atendida por un hilo de trabajo, fuera del mainloop de Tk."""
+
+import itertools
+import queue
+import threading
+
+
+class ExportCancelled(Exception):
+    """La exportación fue cancelada por el usuario."""
+
+
+class ExportJob:
+    """
+    Trabajo de exportación en la cola
+
+    Atributos de estado (solo se leen desde el hilo de Tk, vía on_update):
+        estado: 'en cola', 'en curso', 'completado', 'cancelado' o 'error'
+        progreso: Fracción completada entre 0 y 1
+        mensaje: Descripción de la fase actual
+        error: Excepción si el trabajo falló
+        resultado: Valor devuelto por la función al completarse
+    """
+
+    _ids = itertools.count(1)
+
+    def __init__(self, descripcion, func, args, kwargs):
+        self.id = next(self._ids)
+        self.descripcion = descripcion
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.cancel_event = threading.Event()
+        self.estado = 'en cola'
+        self.progreso = 0.0
+        self.mensaje = descripcion
+        self.error = None
+        self.resultado = None
+
+    @property
+    def terminado(self):
+        return self.estado in ('completado', 'cancelado', 'error')
+
+
+class ExportWorker:
+    """
+    Ejecuta exportaciones de una en una en un hilo de trabajo
+
+    Las funciones encoladas reciben como argumento 'progreso' un callable
+    progreso(fraccion, mensaje); llamarlo informa el avance y lanza
+    ExportCancelled si el trabajo fue cancelado, de modo que la cancelación
+    ocurre entre fases. progreso(1.0, ...) indica que la salida ya está
+    escrita: desde ahí la cancelación se ignora y el trabajo termina como
+    completado. Los cambios de estado se devuelven al hilo de Tk
+    mediante root.after y se entregan a on_update(job).
+    """
+
+    def __init__(self, root, on_update, poll_ms=50):
+        self.root = root
+        self.on_update = on_update
+        self.poll_ms = poll_ms
+        self._trabajos = queue.Queue()
+        self._eventos = queue.Queue()
+        self._pendientes = []
+        self._actual = None
+        self._hilo = threading.Thread(target=self._run, name="export-worker", daemon=True)
+        self._hilo.start()
+        self._after_id = self.root.after(self.poll_ms, self._poll)
+
+    @property
+    def pendientes(self):
+        """Trabajos en cola o en curso, en orden de llegada."""
+        return [job for job in self._pendientes if not job.terminado]
+
+    def submit(self, descripcion, func, *args, **kwargs):
+        """
+        Encola func(*args, progreso=..., **kwargs) y devuelve su ExportJob
+        """
+        job = ExportJob(descripcion, func, args, kwargs)
+        self._pendientes.append(job)
+        self._trabajos.put(job)
+        self.on_update(job)
+        return job
+
+    def cancel(self, job=None):
+        """Cancela job, o el trabajo en curso si no se indica ninguno."""
+        job = job or self._actual or next(iter(self.pendientes), None)
+        if job is not None and not job.terminado:
+            job.cancel_event.set()
+
+    def cancel_all(self):
+        for job in self.pendientes:
+            job.cancel_event.set()
+
+    def shutdown(self, timeout=None):
+        """
+        Cancela los trabajos pendientes y detiene el hilo de trabajo
+
+        Args:
+            timeout: Segundos máximos de espera a que termine el trabajo en
+                curso (None espera indefinidamente)
+        """
+        self.cancel_all()
+        self._trabajos.put(None)
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+        self._hilo.join(timeout)
+
+    def _run(self):
+        while (job := self._trabajos.get()) is not None:
+            if job.cancel_event.is_set():
+                self._eventos.put((job, 'cancelado', job.progreso, "Cancelado", None))
+                continue
+
+            escrito = False
+
+            def progreso(fraccion, mensaje, job=job):
+                nonlocal escrito
+                escrito = escrito or fraccion >= 1.0
+                if job.cancel_event.is_set() and not escrito:
+                    raise ExportCancelled()
+                self._eventos.put((job, 'en curso', fraccion, mensaje, None))
+
+            self._eventos.put((job, 'en curso', 0.0, job.descripcion, None))
+            try:
+                job.resultado = job.func(*job.args, progreso=progreso, **job.kwargs)
+            except ExportCancelled:
+                self._eventos.put((job, 'cancelado', job.progreso, "Cancelado", None))
+            except Exception as e:
+                self._eventos.put((job, 'error', job.progreso, str(e), e))
+            else:
+                self._eventos.put((job, 'completado', 1.0, job.descripcion, None))
+
+    def _poll(self):
+        try:
+            while True:
+                job, estado, fraccion, mensaje, error = self._eventos.get_nowait()
+                job.estado, job.progreso, job.mensaje, job.error = estado, fraccion, mensaje, error
+                self._actual = None if job.terminado else job
+                self.on_update(job)
+        except queue.Empty:
+            pass
+        self._pendientes = self.pendientes
+        self._after_id = self.root.after(self.poll_ms, self._poll)
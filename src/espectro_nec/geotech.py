@@ -0,0 +1,446 @@
+"""Motor geotécnico: sondeos como tablas de estratos, consultas por profundidad y correlaciones (subcomando ``espectro-nec sondeos``)."""
+
+import csv
+import json
+import sys
+import time
+
+import numpy as np
+
+from .constants import (
+    CATEGORIAS_EDIFICIO,
+    CIMENTACIONES,
+    EXPLORACION_CATEGORIA,
+    FACTORES_SEGURIDAD_CARGA,
+    USCS_COHESIVOS,
+)
+from .lateral_force import building_category
+from .seismic_calculations import SUELOS
+from .uncertainty import soil_from_vs30
+from .instrumentation import span
+
+
+# Nombres del motor web (geotech-engine.ts) aceptados en sondeos, estratos y entradas
+ALIAS_SONDEO = {
+    'elevation': 'elevacion',
+    'finalDepth': 'profundidad_final',
+    'waterDepth': 'nivel_freatico',
+    'layers': 'estratos',
+}
+ALIAS_ESTRATO = {
+    'from': 'desde',
+    'to': 'hasta',
+    'description': 'descripcion',
+    'sample': 'muestra',
+    'moisture': 'humedad',
+    'friction': 'friccion',
+    'permeability': 'permeabilidad',
+    'modulus': 'modulo',
+}
+ALIAS_GEOTECNIA = {
+    'floors': 'pisos',
+    'columnLoad': 'carga_columna',
+    'foundation': 'cimentacion',
+    'width': 'ancho',
+    'length': 'longitud',
+    'diameter': 'diametro',
+    'groupWidth': 'ancho_grupo',
+    'specialSoil': 'suelo_especial',
+    'serviceLoad': 'carga_servicio',
+    'loadCase': 'caso_carga',
+    'settlement': 'asentamiento',
+    'settlementLimit': 'asentamiento_limite',
+}
+
+# Columnas de la tabla de estratos: numéricas (float64, NaN si faltan) y de texto
+COLUMNAS_ESTRATO = ('desde', 'hasta', 'n1', 'n2', 'n3', 'humedad', 'gamma', 'cohesion', 'friccion',
+                    'permeabilidad', 'modulo')
+COLUMNAS_TEXTO = ('uscs', 'descripcion', 'muestra')
+
+# Propiedades que correlate_layers completa y sus unidades
+PROPIEDADES = ('gamma', 'cohesion', 'friccion', 'permeabilidad', 'modulo')
+UNIDADES = {'gamma': 'kN/m3', 'cohesion': 'kPa', 'friccion': '°', 'permeabilidad': 'm/s', 'modulo': 'MPa'}
+FUENTE_CORRELACION = "Correlacion referencial a partir de N-SPT y USCS"
+
+# Tolerancia (m) de continuidad entre estratos y con la profundidad final
+TOLERANCIA_PROFUNDIDAD = 0.001
+
+TIPOS_CIMENTACION = tuple(CIMENTACIONES)
+DETALLES_PERFIL = ('Vs30 >= 1500 m/s', '760 <= Vs30 < 1500 m/s', '360 <= Vs30 < 760 m/s',
+                   '180 <= Vs30 < 360 m/s', 'Vs30 < 180 m/s', 'Evaluacion especifica del sitio')
+
+
+def _numero(valor):
+    if valor is None or valor == '':
+        return float('nan')
+    return float(valor)
+
+
+class BoreholeSet:
+    """
+    Conjunto de sondeos con sus estratos en una sola tabla plana por columnas
+
+    Los estratos de todos los sondeos se guardan uno tras otro: los del sondeo
+    b ocupan las posiciones inicio[b]:inicio[b + 1] de cada columna, en el orden
+    del registro (de arriba hacia abajo).
+
+    Atributos:
+        ids: Identificadores de los sondeos
+        x, y, elevacion, profundidad_final, nivel_freatico: Arreglos por sondeo (NaN si faltan)
+        inicio: Arreglo de n_sondeos + 1 posiciones del primer estrato de cada sondeo
+        estratos: Diccionario columna -> arreglo plano (COLUMNAS_ESTRATO en float64,
+            COLUMNAS_TEXTO como arreglos de cadenas)
+    """
+
+    def __init__(self, ids, x, y, elevacion, profundidad_final, nivel_freatico, inicio, estratos):
+        self.ids = tuple(ids)
+        self.x, self.y, self.elevacion, self.profundidad_final, self.nivel_freatico = (
+            np.asarray(v, dtype=np.float64) for v in (x, y, elevacion, profundidad_final, nivel_freatico))
+        self.inicio = np.asarray(inicio, dtype=np.intp)
+        self.estratos = estratos
+        self._correlacion = None
+
+    @classmethod
+    def from_records(cls, sondeos):
+        """
+        Crea el conjunto a partir de diccionarios de sondeo
+
+        Args:
+            sondeos: Iterable de diccionarios con 'id', 'x', 'y', 'elevacion',
+                'profundidad_final', 'nivel_freatico' y la lista 'estratos'
+                (se aceptan los nombres del tipo Borehole del motor web)
+        """
+        ids, por_sondeo, estratos = [], [], []
+        for numero, sondeo in enumerate(sondeos, start=1):
+            sondeo = {ALIAS_SONDEO.get(clave, clave): valor for clave, valor in sondeo.items()}
+            ids.append(str(sondeo.get('id') if sondeo.get('id') is not None else f"S-{numero:02d}"))
+            por_sondeo.append([_numero(sondeo.get(clave)) for clave in
+                               ('x', 'y', 'elevacion', 'profundidad_final', 'nivel_freatico')])
+            capas = [{ALIAS_ESTRATO.get(clave, clave): valor for clave, valor in capa.items()}
+                     for capa in sondeo.get('estratos') or ()]
+            estratos.append(capas)
+
+        inicio = np.zeros(len(estratos) + 1, dtype=np.intp)
+        np.cumsum([len(capas) for capas in estratos], out=inicio[1:])
+        planos = [capa for capas in estratos for capa in capas]
+        columnas = {clave: np.array([_numero(capa.get(clave)) for capa in planos], dtype=np.float64)
+                    for clave in COLUMNAS_ESTRATO}
+        columnas.update({clave: np.array([str(capa.get(clave) or '').strip() for capa in planos], dtype=str)
+                         for clave in COLUMNAS_TEXTO})
+        x, y, elevacion, profundidad_final, nivel_freatico = np.array(por_sondeo, dtype=np.float64).reshape(-1, 5).T
+        return cls(ids, x, y, elevacion, profundidad_final, nivel_freatico, inicio, columnas)
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def n_estratos(self):
+        return int(self.inicio[-1])
+
+    @property
+    def sondeo(self):
+        """Índice del sondeo de cada estrato de la tabla plana."""
+        return np.repeat(np.arange(len(self)), np.diff(self.inicio))
+
+    def index(self, sondeo_id):
+        """Posición del sondeo con identificador sondeo_id."""
+        try:
+            return self.ids.index(str(sondeo_id))
+        except ValueError:
+            raise ValueError(f"Sondeo no encontrado: {sondeo_id!r}") from None
+
+    def correlated(self):
+        """Propiedades de todos los estratos completadas con correlate_layers (se calculan una vez)."""
+        if self._correlacion is None:
+            e = self.estratos
+            self._correlacion = correlate_layers(e['uscs'], e['n2'], e['n3'], e['gamma'], e['cohesion'],
+                                                 e['friccion'], e['permeabilidad'], e['modulo'])
+        return self._correlacion
+
+
+def read_boreholes(path):
+    """
+    Lee sondeos de un archivo JSON o JSONL
+
+    Acepta el respaldo del estudio de suelos web (esquema codenormative.geotech.v1,
+    con la lista 'boreholes'), una lista JSON de sondeos o un sondeo por línea.
+
+    Returns:
+        BoreholeSet
+    """
+    with open(path, encoding='utf-8-sig') as archivo:
+        if path.lower().endswith('.jsonl'):
+            return BoreholeSet.from_records(json.loads(linea) for linea in archivo if linea.strip())
+        datos = json.load(archivo)
+    if isinstance(datos, dict):
+        datos = datos.get('boreholes', datos.get('sondeos', [datos]))
+    return BoreholeSet.from_records(datos)
+
+
+def validate_boreholes(sondeos):
+    """
+    Revisa la consistencia de los sondeos, como validateBorehole del motor web
+
+    Las reglas se evalúan sobre todas las columnas a la vez; solo los
+    hallazgos se convierten en mensajes.
+
+    Returns:
+        Lista de mensajes, en el orden de los sondeos y de sus estratos
+    """
+    ids = sondeos.ids
+    hallazgos = []
+
+    def agregar(mascara, orden, mensaje):
+        for b in np.flatnonzero(mascara).tolist():
+            hallazgos.append((b, orden, mensaje(b)))
+
+    agregar([not valor.strip() for valor in ids], 0, lambda b: "La perforacion requiere identificador.")
+    agregar(~np.isfinite(sondeos.x), 1, lambda b: f"{ids[b] or 'Sondeo'}: falta coordenada Este.")
+    agregar(~np.isfinite(sondeos.y), 2, lambda b: f"{ids[b] or 'Sondeo'}: falta coordenada Norte.")
+    agregar(sondeos.profundidad_final <= 0, 3, lambda b: f"{ids[b]}: profundidad final invalida.")
+
+    desde, hasta = sondeos.estratos['desde'], sondeos.estratos['hasta']
+    sondeo = sondeos.sondeo
+    local = np.arange(desde.size) - sondeos.inicio[sondeo]
+    for k in np.flatnonzero((desde < 0) | (hasta <= desde)).tolist():
+        b = sondeo[k]
+        hallazgos.append((b, 4 + 2 * local[k], f"{ids[b]}, estrato {local[k] + 1}: intervalo invalido."))
+    if desde.size > 1:
+        salto = np.abs(desde[1:] - hasta[:-1]) > TOLERANCIA_PROFUNDIDAD
+        for k in (np.flatnonzero(salto & (sondeo[1:] == sondeo[:-1])) + 1).tolist():
+            b = sondeo[k]
+            hallazgos.append((b, 5 + 2 * local[k],
+                              f"{ids[b]}: existe vacio o traslape entre estratos {local[k]} y {local[k] + 1}."))
+
+    con_estratos = np.diff(sondeos.inicio) > 0
+    excede = np.zeros(len(sondeos), dtype=bool)
+    excede[con_estratos] = (hasta[sondeos.inicio[1:][con_estratos] - 1]
+                            > sondeos.profundidad_final[con_estratos] + TOLERANCIA_PROFUNDIDAD)
+    agregar(excede, float('inf'), lambda b: f"{ids[b]}: los estratos exceden la profundidad final.")
+
+    hallazgos.sort(key=lambda h: (h[0], h[1]))
+    return [mensaje for _, _, mensaje in hallazgos]
+
+
+def material_at_depth(sondeos, sondeo, profundidad):
+    """
+    Estrato de cada sondeo en cada profundidad, por bisección sobre la tabla plana
+
+    Devuelve el primer estrato con desde <= profundidad <= hasta, como
+    materialAtDepth del motor web, para sondeos con estratos ordenados y
+    continuos (sin observaciones de validate_boreholes). La bisección avanza
+    a la vez en todas las consultas, en log2(estratos por sondeo) pasos.
+
+    Args:
+        sondeo: Índice o arreglo de índices de sondeo
+        profundidad: Profundidad o arreglo de profundidades (m); se difunde con
+            sondeo, p. ej. sondeo[:, None] y profundidad[None, :] para una grilla
+
+    Returns:
+        Arreglo de índices en la tabla plana de estratos (-1 donde no hay estrato)
+    """
+    sondeo, profundidad = np.broadcast_arrays(np.asarray(sondeo, dtype=np.intp),
+                                              np.asarray(profundidad, dtype=np.float64))
+    if sondeo.size and (sondeo.min() < 0 or sondeo.max() >= len(sondeos)):
+        raise ValueError(f"Índice de sondeo fuera de rango (0 a {len(sondeos) - 1}).")
+    desde, hasta = sondeos.estratos['desde'], sondeos.estratos['hasta']
+    if desde.size == 0:
+        return np.full(sondeo.shape, -1, dtype=np.intp)
+
+    # Primer estrato del sondeo con hasta >= profundidad
+    bajo, alto = sondeos.inicio[sondeo], sondeos.inicio[sondeo + 1]
+    fin = alto
+    while True:
+        activo = bajo < alto
+        if not activo.any():
+            break
+        medio = (bajo + alto) // 2
+        arriba = hasta[np.where(activo, medio, 0)] < profundidad
+        bajo = np.where(activo & arriba, medio + 1, bajo)
+        alto = np.where(activo & ~arriba, medio, alto)
+
+    encontrado = bajo < fin
+    encontrado[encontrado] = desde[bajo[encontrado]] <= profundidad[encontrado]
+    return np.where(encontrado, bajo, -1)
+
+
+def properties_at_depth(sondeos, sondeo, profundidad, correlacionar=True):
+    """
+    Propiedades del material en cada sondeo y profundidad (ver material_at_depth)
+
+    Args:
+        correlacionar: Si es True, las propiedades sin dato se completan con
+            correlate_layers; si no, se devuelven tal como se registraron
+
+    Returns:
+        Diccionario con 'estrato' (índice en la tabla plana, -1 sin estrato),
+        'uscs' y las PROPIEDADES, con la forma difundida de las entradas
+        (NaN y '' donde no hay estrato)
+    """
+    estrato = material_at_depth(sondeos, sondeo, profundidad)
+    fuente = sondeos.correlated() if correlacionar else sondeos.estratos
+    # El índice -1 toma el valor de relleno agregado al final de cada columna
+    resultado = {'estrato': estrato, 'uscs': np.append(sondeos.estratos['uscs'], '')[estrato]}
+    for clave in PROPIEDADES:
+        resultado[clave] = np.append(fuente[clave], np.nan)[estrato]
+    return resultado
+
+
+def correlate_layers(uscs, n2, n3, gamma=0.0, cohesion=0.0, friccion=0.0, permeabilidad=0.0, modulo=0.0):
+    """
+    Completa las propiedades sin dato (≤ 0 o NaN) con correlaciones de N-SPT y USCS
+
+    Mismas reglas que correlateLayer del motor web, evaluadas sobre todos los
+    estratos en una sola pasada. Los argumentos se difunden entre sí.
+
+    Returns:
+        Diccionario con 'gamma' (kN/m3), 'cohesion' (kPa), 'friccion' (°),
+        'permeabilidad' (m/s) y 'modulo' (MPa)
+    """
+    # Un N-SPT sin dato (NaN) cuenta como 0, como en el formulario web
+    n2 = np.nan_to_num(np.asarray(n2, dtype=np.float64), nan=0.0)
+    n3 = np.nan_to_num(np.asarray(n3, dtype=np.float64), nan=0.0)
+    n = np.maximum(0.0, n2 + n3)
+    cohesivo = np.isin(np.asarray(uscs, dtype=str), USCS_COHESIVOS)
+
+    def completar(valor, referencia):
+        valor = np.asarray(valor, dtype=np.float64)
+        return np.where(valor > 0, valor, referencia)
+
+    return {
+        'gamma': completar(gamma, 16 + np.minimum(n, 30) * 0.12),
+        'cohesion': completar(cohesion, np.where(cohesivo, np.maximum(5, n * 2.5), 0.0)),
+        'friccion': completar(friccion, np.where(cohesivo, 22.0, np.minimum(38, 27 + n * 0.3))),
+        'permeabilidad': completar(permeabilidad, np.where(cohesivo, 1e-8, 1e-5)),
+        'modulo': completar(modulo, np.maximum(2, n * 2.5)),
+    }
+
+
+def evaluate_geotech(entrada):
+    """
+    Requisitos de exploración y verificación de capacidad portante, como evaluateGeotech del motor web
+
+    Args:
+        entrada: Mapeo con 'pisos', 'carga_columna', 'cimentacion', 'ancho', 'longitud',
+            'diametro', 'ancho_grupo', 'vs30', 'suelo_especial', 'carga_servicio', 'area',
+            'qunet', 'qob', 'caso_carga', 'asentamiento' y 'asentamiento_limite' (o los
+            nombres de GeotechInput); cada valor puede ser escalar o arreglo, y los
+            arreglos se evalúan proyecto por proyecto
+
+    Returns:
+        Diccionario de arreglos: 'categoria' (código de CATEGORIAS_EDIFICIO),
+        'categoria_nombre', 'sondeos_minimos', 'profundidad_categoria',
+        'profundidad_cimentacion', 'criterio_profundidad', 'profundidad_requerida',
+        'perfil', 'perfil_detalle', 'factor_seguridad', 'presion_aplicada',
+        'capacidad_admisible', 'utilizacion' y 'asentamiento_ok'
+    """
+    entrada = {ALIAS_GEOTECNIA.get(clave, clave): valor for clave, valor in entrada.items()}
+
+    def numero(clave, defecto=None):
+        valor = entrada.get(clave, defecto)
+        if valor is None:
+            raise ValueError(f"Falta el dato {clave!r}.")
+        return np.asarray(valor, dtype=np.float64)
+
+    categoria = building_category(numero('pisos'), numero('carga_columna'))
+    sondeos_minimos, profundidad_categoria = (np.asarray(columna)[categoria]
+                                              for columna in zip(*EXPLORACION_CATEGORIA))
+
+    cimentacion = np.asarray(entrada.get('cimentacion', 'footing'), dtype=str)
+    ancho, longitud, diametro, ancho_grupo = (numero(clave, 0.0) for clave in
+                                              ('ancho', 'longitud', 'diametro', 'ancho_grupo'))
+    # Cualquier otro tipo se trata como excavación, igual que en el motor web
+    tipo = np.select([cimentacion == nombre for nombre in TIPOS_CIMENTACION[:-1]],
+                     list(range(len(TIPOS_CIMENTACION) - 1)), len(TIPOS_CIMENTACION) - 1)
+    profundidad_cimentacion = np.choose(tipo, (
+        2.5 * ancho,
+        1.5 * ancho,
+        longitud + 4 * diametro,
+        np.maximum(longitud + 2 * ancho_grupo, 2.5 * ancho_grupo),
+        1.5 * longitud,
+    ))
+    criterios = np.array([criterio for _, criterio in CIMENTACIONES.values()])
+
+    especial = np.asarray(entrada.get('suelo_especial', False), dtype=bool)
+    perfil = np.where(especial, len(SUELOS), soil_from_vs30(numero('vs30')))
+
+    caso = np.asarray(entrada.get('caso_carga', 'normal'), dtype=str)
+    factor_seguridad = np.select([caso == nombre for nombre in FACTORES_SEGURIDAD_CARGA],
+                                 list(FACTORES_SEGURIDAD_CARGA.values()), FACTORES_SEGURIDAD_CARGA['seismic'])
+    area = numero('area')
+    with np.errstate(divide='ignore', invalid='ignore'):
+        presion = np.where(area > 0, numero('carga_servicio') / area, np.inf)
+        capacidad = numero('qunet') / factor_seguridad + numero('qob', 0.0)
+        utilizacion = np.where(capacidad > 0, presion / capacidad, np.inf)
+
+    return {
+        'categoria': categoria,
+        'categoria_nombre': np.asarray(CATEGORIAS_EDIFICIO)[categoria],
+        'sondeos_minimos': sondeos_minimos,
+        'profundidad_categoria': profundidad_categoria,
+        'profundidad_cimentacion': profundidad_cimentacion,
+        'criterio_profundidad': criterios[tipo],
+        'profundidad_requerida': np.maximum(profundidad_categoria, profundidad_cimentacion),
+        'perfil': np.asarray((*SUELOS, 'F'))[perfil],
+        'perfil_detalle': np.asarray(DETALLES_PERFIL)[perfil],
+        'factor_seguridad': factor_seguridad,
+        'presion_aplicada': presion,
+        'capacidad_admisible': capacidad,
+        'utilizacion': utilizacion,
+        'asentamiento_ok': numero('asentamiento', 0.0) <= numero('asentamiento_limite', np.inf),
+    }
+
+
+def _escribir_csv(path, encabezado, filas):
+    archivo = sys.stdout if path == '-' else open(path, 'w', newline='', encoding='utf-8')
+    try:
+        writer = csv.writer(archivo)
+        writer.writerow(encabezado)
+        writer.writerows(filas)
+    finally:
+        if archivo is not sys.stdout:
+            archivo.close()
+
+
+def add_arguments(parser):
+    parser.add_argument('input', help="Sondeos en JSON (respaldo del estudio de suelos web o lista) o JSONL")
+    parser.add_argument('-o', '--output', default='-', help="Archivo CSV de salida (por defecto stdout)")
+    parser.add_argument('--profundidades', default=None, metavar='VALORES',
+                        help="Profundidades de consulta, '0:30:61' o '1.5,3,6': escribe el material de cada "
+                             "sondeo en cada profundidad en lugar de la tabla de estratos")
+    parser.add_argument('--estricto', action='store_true',
+                        help="Termina con código 1 si la validación encuentra observaciones "
+                             "(por defecto solo se informan en stderr)")
+
+
+def run(args):
+    from .sensitivity import parse_axis
+
+    inicio = time.perf_counter()
+    sondeos = read_boreholes(args.input)
+    with span("sondeos.validar"):
+        errores = validate_boreholes(sondeos)
+    for mensaje in errores:
+        print(mensaje, file=sys.stderr)
+
+    propiedades = sondeos.correlated()
+    if args.profundidades is None:
+        sondeo = sondeos.sondeo
+        columnas = [np.asarray(sondeos.ids)[sondeo], sondeos.estratos['desde'], sondeos.estratos['hasta'],
+                    sondeos.estratos['uscs'], *(propiedades[clave] for clave in PROPIEDADES)]
+        encabezado = ['sondeo', 'desde', 'hasta', 'uscs', *PROPIEDADES]
+    else:
+        profundidades = np.asarray(parse_axis(args.profundidades), dtype=np.float64)
+        with span("sondeos.consultar", consultas=len(sondeos) * profundidades.size):
+            malla = properties_at_depth(sondeos, np.arange(len(sondeos))[:, None], profundidades[None, :])
+        local = malla['estrato'] - sondeos.inicio[:-1, None] + 1
+        columnas = [np.repeat(sondeos.ids, profundidades.size), np.tile(profundidades, len(sondeos)),
+                    np.where(malla['estrato'] >= 0, local, 0).ravel(), malla['uscs'].ravel(),
+                    *(malla[clave].ravel() for clave in PROPIEDADES)]
+        encabezado = ['sondeo', 'profundidad', 'estrato', 'uscs', *PROPIEDADES]
+
+    filas = zip(*(columna.tolist() for columna in columnas))
+    _escribir_csv(args.output, encabezado, filas)
+    print(f"{len(sondeos)} sondeos, {sondeos.n_estratos} estratos, {len(errores)} observaciones "
+          f"en {(time.perf_counter() - inicio) * 1000:.1f} ms", file=sys.stderr)
+    return 1 if errores and args.estricto else 0
@@ -0,0 +1,262 @@
+"""Espectros de respuesta de acelerogramas registrados (subcomando ``espectro-nec registros``)."""
+
+import csv
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from .seismic_calculations import GRAVEDAD, T_MAX
+from .instrumentation import span
+
+# Malla de períodos por defecto: logarítmica, densa en los períodos cortos
+PERIODOS_REGISTRO = np.geomspace(0.02, T_MAX, 200)
+AMORTIGUAMIENTOS = (0.05,)
+
+# Pasos de tiempo por bloque: acota la memoria de la excitación precalculada
+PASOS_BLOQUE = 1024
+
+_NUMERO = r'[-+]?(?:\d+\.?\d*|\.\d+)(?:[eEdD][-+]?\d+)?'
+
+
+def read_accelerogram(path, dt=None):
+    """
+    Lee un acelerograma en g
+
+    Formatos aceptados:
+        - PEER .AT2: cuatro líneas de encabezado, la cuarta con 'NPTS=..., DT=...'
+          y los valores en formato libre
+        - Texto de dos columnas (tiempo, aceleración); las líneas que no son
+          numéricas se ignoran y el paso se toma de la columna de tiempo
+        - Texto de una columna de aceleraciones, indicando dt
+
+    Returns:
+        Tupla con (aceleraciones, dt)
+    """
+    with open(path, encoding='utf-8', errors='replace') as archivo:
+        lineas = archivo.read().splitlines()
+
+    cabecera = ' '.join(lineas[:4])
+    encabezado = (re.search(rf'NPTS\s*=\s*(\d+)\s*,?\s*DT\s*=\s*({_NUMERO})', cabecera, re.IGNORECASE)
+                  or re.search(rf'(\d+)\s+({_NUMERO})\s+NPTS\s*,\s*DT', cabecera, re.IGNORECASE))
+    if encabezado:
+        npts, dt = int(encabezado.group(1)), float(encabezado.group(2).replace('D', 'E').replace('d', 'e'))
+        texto = ' '.join(lineas[4:]).replace('D', 'E').replace('d', 'e')
+        acc = np.array(re.findall(_NUMERO, texto), dtype=np.float64)[:npts]
+        if acc.size != npts:
+            raise ValueError(f"El registro declara {npts} puntos y contiene {acc.size}.")
+        return acc, dt
+
+    filas = []
+    for linea in lineas:
+        valores = re.split(r'[\s,;]+', linea.strip())
+        try:
+            filas.append([float(v) for v in valores])
+        except ValueError:
+            continue  # encabezado o comentario
+    columnas = {len(fila) for fila in filas}
+    if columnas == {2}:
+        t, acc = np.array(filas).T
+        pasos = np.diff(t)
+        if pasos.size == 0 or np.ptp(pasos) > 1e-3 * pasos.mean():
+            raise ValueError("La columna de tiempo debe tener paso uniforme.")
+        return acc, float(pasos.mean())
+    if columnas == {1}:
+        if dt is None:
+            raise ValueError("Un registro de una columna requiere indicar dt.")
+        return np.array(filas).reshape(-1), float(dt)
+    raise ValueError(f"Formato de acelerograma no reconocido: {os.path.basename(path)}")
+
+
+def _coeficientes(omega, zeta, dt):
+    """
+    Coeficientes de la recurrencia exacta de Nigam y Jennings (1969) para excitación lineal por tramos
+
+    Returns:
+        Tupla con (A, B): A con forma (2, 2, n) relaciona [u, v] en t_i con t_i+1,
+        B con forma (2, 2, n) aplica [ag_i, ag_i+1]
+    """
+    raiz = np.sqrt(1 - zeta ** 2)
+    wd = omega * raiz
+    E = np.exp(-zeta * omega * dt)
+    S, C = np.sin(wd * dt), np.cos(wd * dt)
+    w2, w3 = omega ** 2, omega ** 3
+
+    A = np.empty((2, 2, omega.size))
+    A[0, 0] = E * (zeta / raiz * S + C)
+    A[0, 1] = E * S / wd
+    A[1, 0] = -omega / raiz * E * S
+    A[1, 1] = E * (C - zeta / raiz * S)
+
+    c1 = (2 * zeta ** 2 - 1) / (w2 * dt)
+    c2 = 2 * zeta / (w3 * dt)
+    derivada = wd * S + zeta * omega * C
+    amortiguado = C - zeta / raiz * S
+    B = np.empty((2, 2, omega.size))
+    B[0, 0] = E * ((c1 + zeta / omega) * S / wd + (c2 + 1 / w2) * C) - c2
+    B[0, 1] = -E * (c1 * S / wd + c2 * C) - 1 / w2 + c2
+    B[1, 0] = E * ((c1 + zeta / omega) * amortiguado - (c2 + 1 / w2) * derivada) + 1 / (w2 * dt)
+    B[1, 1] = -E * (c1 * amortiguado - c2 * derivada) - 1 / (w2 * dt)
+    return A, B
+
+
+def response_spectrum(acc, dt, periodos=PERIODOS_REGISTRO, amortiguamientos=AMORTIGUAMIENTOS):
+    """
+    Espectros de respuesta elásticos de un acelerograma
+
+    Todos los osciladores (períodos × amortiguamientos) avanzan juntos paso a
+    paso con la recurrencia exacta para aceleración lineal entre muestras, de
+    modo que cada paso es una operación vectorizada sobre todos ellos.
+
+    Args:
+        acc: Aceleraciones del terreno (g)
+        dt: Paso de tiempo (s)
+        periodos: Períodos (s); T = 0 devuelve la aceleración máxima del terreno
+        amortiguamientos: Razones de amortiguamiento (< 1)
+
+    Returns:
+        Diccionario con 'T', 'amortiguamientos', 'Sd' (m), 'PSV' (m/s) y
+        'PSA' (g), estos con forma (n_amortiguamientos, n_periodos)
+    """
+    acc = np.asarray(acc, dtype=np.float64)
+    periodos = np.asarray(periodos, dtype=np.float64)
+    amortiguamientos = np.atleast_1d(np.asarray(amortiguamientos, dtype=np.float64))
+    if np.any(periodos < 0) or np.any((amortiguamientos < 0) | (amortiguamientos >= 1)):
+        raise ValueError("Los períodos deben ser no negativos y los amortiguamientos estar entre 0 y 1.")
+
+    positivos = periodos > 0
+    omega = np.tile(2 * np.pi / periodos[positivos], amortiguamientos.size)
+    zeta = np.repeat(amortiguamientos, positivos.sum())
+    A, B = _coeficientes(omega, zeta, dt)
+
+    estado = np.zeros((2, omega.size))
+    siguiente = np.empty_like(estado)
+    auxiliar = np.empty_like(estado)
+    maximo = np.zeros(omega.size)
+    historia = np.empty((PASOS_BLOQUE, omega.size))
+    for inicio in range(0, acc.size - 1, PASOS_BLOQUE):
+        tramo = acc[inicio:inicio + PASOS_BLOQUE + 1]
+        pasos = tramo.size - 1
+        # Excitación de todos los pasos del bloque: (pasos, 2, n)
+        excitacion = tramo[:-1, None, None] * B[:, 0] + tramo[1:, None, None] * B[:, 1]
+        for k in range(pasos):
+            np.multiply(A[:, 0], estado[0], out=siguiente)
+            np.multiply(A[:, 1], estado[1], out=auxiliar)
+            siguiente += auxiliar
+            siguiente += excitacion[k]
+            estado, siguiente = siguiente, estado
+            historia[k] = estado[0]
+        np.maximum(maximo, np.abs(historia[:pasos]).max(axis=0), out=maximo)
+
+    Sd = np.zeros((amortiguamientos.size, periodos.size))
+    Sd[:, positivos] = maximo.reshape(amortiguamientos.size, -1)
+    omega_T = np.zeros(periodos.size)
+    omega_T[positivos] = 2 * np.pi / periodos[positivos]
+    PSA = Sd * omega_T ** 2
+    PSA[:, ~positivos] = np.abs(acc).max() if acc.size else 0.0
+    return {
+        'T': periodos,
+        'amortiguamientos': amortiguamientos,
+        'Sd': Sd * GRAVEDAD,
+        'PSV': Sd * omega_T * GRAVEDAD,
+        'PSA': PSA,
+    }
+
+
+def record_spectrum(path, periodos=PERIODOS_REGISTRO, amortiguamientos=AMORTIGUAMIENTOS, dt=None, escala=1.0):
+    """
+    Lee un acelerograma y calcula sus espectros (ver response_spectrum)
+
+    Args:
+        escala: Factor que multiplica el registro (registros escalados)
+
+    Returns:
+        Diccionario de response_spectrum más 'nombre', 'dt', 'pasos' y 'PGA' (g)
+    """
+    with span("registros.leer"):
+        acc, dt = read_accelerogram(path, dt)
+    acc = acc * escala
+    with span("registros.espectro", pasos=acc.size):
+        resultado = response_spectrum(acc, dt, periodos, amortiguamientos)
+    resultado.update(nombre=os.path.splitext(os.path.basename(path))[0], dt=dt, pasos=acc.size,
+                     PGA=float(np.abs(acc).max()))
+    return resultado
+
+
+def record_spectra(paths, periodos=PERIODOS_REGISTRO, amortiguamientos=AMORTIGUAMIENTOS, workers=None,
+                   progreso=None, escala=1.0):
+    """
+    Calcula los espectros de varios registros en paralelo en un ProcessPoolExecutor
+
+    Args:
+        paths: Rutas de los acelerogramas
+        workers: Número de procesos (None usa os.cpu_count(); 0 calcula en el proceso actual)
+        progreso: Callable opcional progreso(fraccion, mensaje), como en las exportaciones
+
+    Returns:
+        Lista de resultados de record_spectrum en el orden de paths
+    """
+    paths = list(paths)
+    if workers is None:
+        workers = min(os.cpu_count() or 1, len(paths))
+    resultados = [None] * len(paths)
+    if workers <= 1 or len(paths) <= 1:
+        for k, path in enumerate(paths):
+            if progreso is not None:
+                progreso(k / len(paths), f"Registro {os.path.basename(path)}")
+            resultados[k] = record_spectrum(path, periodos, amortiguamientos, escala=escala)
+        return resultados
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futuros = {executor.submit(record_spectrum, path, periodos, amortiguamientos, None, escala): k
+                   for k, path in enumerate(paths)}
+        try:
+            for hechos, futuro in enumerate(as_completed(futuros), start=1):
+                resultados[futuros[futuro]] = futuro.result()
+                if progreso is not None:
+                    progreso(hechos / len(paths), f"{hechos} de {len(paths)} registros")
+        except BaseException:
+            for futuro in futuros:
+                futuro.cancel()
+            raise
+    return resultados
+
+
+def write_spectra_csv(file_path, resultados):
+    """Escribe los espectros en formato largo: registro, amortiguamiento, T, Sd, PSV, PSA ('-' en stdout)."""
+    archivo = sys.stdout if file_path == '-' else open(file_path, 'w', newline='', encoding='utf-8')
+    try:
+        writer = csv.writer(archivo)
+        writer.writerow(['registro', 'amortiguamiento', 'T', 'Sd', 'PSV', 'PSA'])
+        for resultado in resultados:
+            for j, zeta in enumerate(resultado['amortiguamientos'].tolist()):
+                for fila in zip(resultado['T'].tolist(), resultado['Sd'][j].tolist(), resultado['PSV'][j].tolist(),
+                                resultado['PSA'][j].tolist()):
+                    writer.writerow([resultado['nombre'], zeta, *fila])
+    finally:
+        if archivo is not sys.stdout:
+            archivo.close()
+
+
+def add_arguments(parser):
+    parser.add_argument('registros', nargs='+', help="Acelerogramas (.AT2 de PEER o texto de dos columnas) en g")
+    parser.add_argument('-o', '--output', default='-', help="Archivo CSV de salida (por defecto stdout)")
+    parser.add_argument('--amortiguamiento', type=float, nargs='+', default=list(AMORTIGUAMIENTOS),
+                        help="Razones de amortiguamiento (por defecto 0.05)")
+    parser.add_argument('--periodos', type=int, default=PERIODOS_REGISTRO.size,
+                        help="Número de períodos, en escala logarítmica entre 0.02 y 6 s")
+    parser.add_argument('--escala', type=float, default=1.0, help="Factor de escala de los registros")
+    parser.add_argument('-j', '--workers', type=int, default=None,
+                        help="Número de procesos (por defecto todos los núcleos; 0 sin procesos)")
+
+
+def run(args):
+    periodos = np.geomspace(PERIODOS_REGISTRO[0], PERIODOS_REGISTRO[-1], args.periodos)
+    resultados = record_spectra(args.registros, periodos, args.amortiguamiento, args.workers, escala=args.escala)
+    write_spectra_csv(args.output, resultados)
+    for resultado in resultados:
+        print(f"{resultado['nombre']}: {resultado['pasos']} pasos de {resultado['dt']} s, "
+              f"PGA {resultado['PGA']:.3f} g", file=sys.stderr)
+    return 0
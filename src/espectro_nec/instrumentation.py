@@ -0,0 +1,221 @@
+"""Tramos de instrumentación opcionales: tiempo de pared y pico de memoria por fase."""
+
+import contextlib
+import json
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+
+_NULO = contextlib.nullcontext()
+_activo = False
+_memoria = False
+_local = threading.local()
+_lock = threading.Lock()
+
+# Tramos terminados, del más antiguo al más reciente
+registro = deque(maxlen=20_000)
+_contador = 0
+
+
+def enable(memoria=True):
+    """
+    Activa el registro de tramos
+
+    Args:
+        memoria: Si es True se inicia tracemalloc y cada tramo registra su pico
+            de memoria (hace más lento el programa mientras está activo)
+    """
+    global _activo, _memoria
+    _activo = True
+    _memoria = memoria
+    if memoria and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def disable():
+    global _activo, _memoria
+    _activo = False
+    if _memoria and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    _memoria = False
+
+
+def enabled():
+    return _activo
+
+
+def memory_enabled():
+    return _memoria
+
+
+def enable_from_env():
+    """
+    Activa los tramos según la variable de entorno ESPECTRO_NEC_TRACE
+
+    '1' (o cualquier valor no vacío distinto de '0') mide tiempo y memoria;
+    'tiempo' mide solo tiempo, sin el costo de tracemalloc.
+    """
+    valor = os.environ.get('ESPECTRO_NEC_TRACE', '').strip().lower()
+    if valor not in ('', '0'):
+        enable(memoria=valor != 'tiempo')
+
+
+class _Tramo:
+    __slots__ = ('nombre', 'args', 'inicio', 'base', 'pico')
+
+    def __init__(self, nombre, args):
+        self.nombre = nombre
+        self.args = args
+
+    def __enter__(self):
+        pila = getattr(_local, 'pila', None)
+        if pila is None:
+            pila = _local.pila = []
+        if _memoria:
+            actual, pico = tracemalloc.get_traced_memory()
+            if pila:
+                pila[-1].pico = max(pila[-1].pico, pico)
+            tracemalloc.reset_peak()
+            self.base, self.pico = actual, actual
+        pila.append(self)
+        self.inicio = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        fin = time.perf_counter_ns()
+        pila = _local.pila
+        pila.pop()
+        pico = 0
+        if _memoria:
+            self.pico = max(self.pico, tracemalloc.get_traced_memory()[1])
+            pico = self.pico - self.base
+            if pila:
+                pila[-1].pico = max(pila[-1].pico, self.pico)
+            tracemalloc.reset_peak()
+        _registrar({
+            'nombre': self.nombre,
+            'inicio_ns': self.inicio,
+            'segundos': (fin - self.inicio) / 1e9,
+            'pico_bytes': pico,
+            'pid': os.getpid(),
+            'hilo': threading.get_ident(),
+            'profundidad': len(pila),
+            'args': self.args,
+        })
+        return False
+
+
+def _registrar(tramo):
+    global _contador
+    with _lock:
+        registro.append(tramo)
+        _contador += 1
+
+
+def span(nombre, **args):
+    """
+    Context manager que mide un tramo con el nombre dado
+
+    Si la instrumentación está desactivada devuelve un contexto nulo, de modo
+    que los tramos pueden dejarse en los caminos críticos. El pico de memoria es
+    el máximo asignado por encima del nivel al entrar; tracemalloc es global al
+    proceso, así que con tramos simultáneos en varios hilos es aproximado.
+    """
+    if not _activo:
+        return _NULO
+    return _Tramo(nombre, args)
+
+
+def mark():
+    """Marca la posición actual del registro para leer después los tramos nuevos con since()."""
+    return _contador
+
+
+def since(marca):
+    """Tramos registrados después de marca (los más antiguos pueden haberse descartado)."""
+    with _lock:
+        nuevos = _contador - marca
+        return list(registro)[-nuevos:] if nuevos > 0 else []
+
+
+def extend(tramos):
+    """Añade tramos registrados en otro proceso (por ejemplo, en los procesos de batch)."""
+    for tramo in tramos:
+        _registrar(tramo)
+
+
+def summary(tramos=None):
+    """
+    Agrupa tramos por nombre
+
+    Returns:
+        Diccionario nombre -> {'n', 'segundos', 'media', 'max', 'pico_bytes'},
+        en el orden de primera aparición
+    """
+    resumen = {}
+    for tramo in (list(registro) if tramos is None else tramos):
+        fila = resumen.setdefault(tramo['nombre'], {'n': 0, 'segundos': 0.0, 'max': 0.0, 'pico_bytes': 0})
+        fila['n'] += 1
+        fila['segundos'] += tramo['segundos']
+        fila['max'] = max(fila['max'], tramo['segundos'])
+        fila['pico_bytes'] = max(fila['pico_bytes'], tramo['pico_bytes'])
+    for fila in resumen.values():
+        fila['media'] = fila['segundos'] / fila['n']
+    return resumen
+
+
+def format_bytes(valor):
+    for unidad in ('B', 'KB', 'MB'):
+        if valor < 1024:
+            return f"{valor:.0f} {unidad}"
+        valor /= 1024
+    return f"{valor:.1f} GB"
+
+
+def format_spans(tramos):
+    """Texto corto 'nombre 1.2 ms (340 KB) · ...' para la barra de estado."""
+    partes = []
+    for nombre, fila in summary(tramos).items():
+        texto = f"{nombre} {fila['segundos'] * 1000:.1f} ms"
+        if fila['pico_bytes']:
+            texto += f" ({format_bytes(fila['pico_bytes'])})"
+        partes.append(texto)
+    return " · ".join(partes)
+
+
+def format_summary(tramos=None):
+    """Tabla de texto del resumen por fase, para la salida de los comandos."""
+    lineas = [f"{'fase':<28}{'n':>8}{'total':>12}{'media':>12}{'máx':>12}{'pico mem':>12}"]
+    for nombre, fila in summary(tramos).items():
+        lineas.append(f"{nombre:<28}{fila['n']:>8}{fila['segundos'] * 1000:>10.1f}ms"
+                      f"{fila['media'] * 1000:>10.3f}ms{fila['max'] * 1000:>10.3f}ms"
+                      f"{format_bytes(fila['pico_bytes']):>12}")
+    return "\n".join(lineas)
+
+
+def write_chrome_trace(path, tramos=None):
+    """
+    Escribe los tramos en formato Chrome Trace Event (chrome://tracing, Perfetto)
+
+    Returns:
+        Número de eventos escritos
+    """
+    tramos = list(registro) if tramos is None else tramos
+    origen = min((t['inicio_ns'] for t in tramos), default=0)
+    eventos = [
+        {
+            'name': t['nombre'],
+            'ph': 'X',
+            'ts': (t['inicio_ns'] - origen) / 1000,
+            'dur': t['segundos'] * 1e6,
+            'pid': t['pid'],
+            'tid': t['hilo'],
+            'args': {**t['args'], 'pico_kb': round(t['pico_bytes'] / 1024, 1)},
+        }
+        for t in tramos
+    ]
+    with open(path, 'w', encoding='utf-8') as archivo:
+        json.dump({'traceEvents': eventos, 'displayTimeUnit': 'ms'}, archivo, default=str)
+    return len(eventos)
@@ -0,0 +1,342 @@
+"""Fuerza lateral equivalente para inventarios de edificios (subcomando ``espectro-nec elf``)."""
+
+import csv
+import json
+import sys
+import time
+from itertools import islice
+
+import numpy as np
+
+from .batch import read_rows
+from .constants import (
+    CATEGORIAS_EDIFICIO,
+    LIMITES_CARGA_CATEGORIA,
+    LIMITES_PISOS_CATEGORIA,
+    SISTEMAS_ESTRUCTURALES,
+)
+from .seismic_calculations import (
+    REGION_CODIGOS,
+    SUELO_CODIGOS,
+    ZONA_CODIGOS,
+    calculate_parameters_many,
+    encode_labels,
+    parse_inputs,
+    spectral_acceleration_many,
+)
+from . import instrumentation
+from .instrumentation import span
+
+
+# Columnas del inventario; también se aceptan los nombres del formulario web de revisión
+COLUMNAS = ('id', 'sistema', 'altura', 'pisos', 'peso', 'zona_sismica', 'tipo_suelo', 'region',
+            'r', 'i', 'phi_p', 'phi_e', 'carga_columna')
+ALIAS_INVENTARIO = {
+    'system': 'sistema',
+    'height': 'altura',
+    'floors': 'pisos',
+    'weight': 'peso',
+    'columnLoad': 'carga_columna',
+}
+
+# Resultados escalares por edificio, en el orden de la salida
+COLUMNAS_RESULTADO = ('Ct', 'alpha', 'T', 'k', 'Sa', 'Cs', 'V', 'categoria')
+
+SISTEMAS = tuple(SISTEMAS_ESTRUCTURALES)
+SISTEMA_CODIGOS = {valor: codigo for codigo, valor in enumerate(SISTEMAS)}
+CT_TABLA = np.array([ct for _, ct, _ in SISTEMAS_ESTRUCTURALES.values()])
+ALPHA_TABLA = np.array([alpha for _, _, alpha in SISTEMAS_ESTRUCTURALES.values()])
+CT_TABLA.setflags(write=False)
+ALPHA_TABLA.setflags(write=False)
+
+# El perfil F se acepta y se evalúa como E (ver compute_inventory)
+SUELOS_INVENTARIO = (*SUELO_CODIGOS, 'F')
+
+
+def fundamental_period(Ct, alpha, altura):
+    """
+    Período fundamental aproximado T = Ct·hn^α (NEC-SE-DS 6.3.3, método 1)
+
+    Args:
+        Ct, alpha: Coeficientes del sistema estructural
+        altura: Altura total hn del edificio (m)
+    """
+    return Ct * np.power(altura, alpha)
+
+
+def distribution_exponent(T):
+    """
+    Exponente k de la distribución vertical de fuerzas (NEC-SE-DS 6.3.5)
+
+    k = 1 si T ≤ 0.5 s, k = 0.75 + 0.5·T entre 0.5 y 2.5 s y k = 2 si T > 2.5 s.
+    """
+    return np.clip(0.75 + 0.5 * np.asarray(T, dtype=np.float64), 1.0, 2.0)
+
+
+def vertical_distribution(pisos, k, V):
+    """
+    Distribuye el cortante basal en altura, Fx = Cvx·V con Cvx = wx·hx^k / Σ wi·hi^k
+
+    Se supone peso y altura de entrepiso uniformes, de modo que Cvx solo depende
+    del nivel i: Cvx = i^k / Σ j^k. Los pisos de todos los edificios se evalúan
+    en un único arreglo plano, sin rellenar hasta el edificio más alto.
+
+    Args:
+        pisos: Número de pisos de cada edificio (enteros ≥ 1)
+        k: Exponente k de cada edificio
+        V: Cortante basal de cada edificio
+
+    Returns:
+        Tupla con (inicio, Cvx, Fx): inicio[b] es la posición del primer piso del
+        edificio b en los arreglos planos Cvx y Fx (ordenados de abajo hacia arriba),
+        con un elemento final igual al total de pisos
+    """
+    pisos = np.asarray(pisos, dtype=np.intp)
+    inicio = np.zeros(pisos.size + 1, dtype=np.intp)
+    np.cumsum(pisos, out=inicio[1:])
+    if inicio[-1] == 0:
+        return inicio, np.empty(0), np.empty(0)
+
+    edificio = np.repeat(np.arange(pisos.size), pisos)
+    nivel = np.arange(inicio[-1]) - inicio[edificio] + 1
+    Cvx = np.power(nivel, np.asarray(k, dtype=np.float64)[edificio])
+    Cvx /= np.add.reduceat(Cvx, inicio[:-1])[edificio]
+    return inicio, Cvx, Cvx * np.asarray(V, dtype=np.float64)[edificio]
+
+
+def building_category(pisos, carga_columna=None):
+    """
+    Categoría de la revisión estructural: la mayor entre la de pisos y la de carga de columna
+
+    Args:
+        pisos: Número de pisos
+        carga_columna: Carga máxima de columna (kN); NaN o None no interviene
+
+    Returns:
+        Arreglo de códigos enteros de CATEGORIAS_EDIFICIO
+    """
+    categoria = np.searchsorted(LIMITES_PISOS_CATEGORIA, pisos, side='left')
+    if carga_columna is not None:
+        carga = np.asarray(carga_columna, dtype=np.float64)
+        por_carga = np.searchsorted(LIMITES_CARGA_CATEGORIA, carga, side='left')
+        categoria = np.maximum(categoria, np.where(np.isnan(carga), 0, por_carga))
+    return categoria
+
+
+def compute_inventory(sistema, altura, pisos, peso, zona, suelo, region, R, I, phi_P=1.0, phi_E=1.0,
+                      carga_columna=None):
+    """
+    Calcula la fuerza lateral equivalente de un inventario en una sola pasada vectorizada
+
+    Todas las columnas son secuencias o arreglos de la misma longitud (los
+    factores también pueden ser escalares). Las etiquetas deben ser los valores
+    cortos ('rc-frame', 'V', 'D', la región completa); el perfil F se evalúa
+    como E, igual que en la revisión web, y se marca en 'requiere_estudio_sitio'.
+
+    Returns:
+        Diccionario de arreglos por edificio ('Ct', 'alpha', 'T', 'k', 'Sa', 'Cs',
+        'V', 'categoria', 'requiere_estudio_sitio') más la distribución vertical
+        plana ('inicio', 'Cvx', 'Fx', ver vertical_distribution)
+    """
+    suelo = np.asarray(suelo)
+    perfil_f = suelo == 'F'
+    suelo = np.where(perfil_f, 'E', suelo)
+
+    with span("elf.parametros"):
+        codigo_sistema = encode_labels(sistema, SISTEMA_CODIGOS)
+        parametros, eta, Z = calculate_parameters_many(
+            encode_labels(suelo, SUELO_CODIGOS),
+            encode_labels(zona, ZONA_CODIGOS),
+            encode_labels(region, REGION_CODIGOS),
+        )
+
+    with span("elf.cortante", edificios=codigo_sistema.size):
+        Ct, alpha = CT_TABLA[codigo_sistema], ALPHA_TABLA[codigo_sistema]
+        T = fundamental_period(Ct, alpha, np.asarray(altura, dtype=np.float64))
+        Sa = spectral_acceleration_many(Z, parametros['Fa'], parametros['Fd'], parametros['Fs'], eta,
+                                        parametros['r'], T)
+        Cs = np.asarray(I, dtype=np.float64) * Sa / (np.asarray(R, dtype=np.float64) * phi_P * phi_E)
+        V = Cs * np.asarray(peso, dtype=np.float64)
+        k = distribution_exponent(T)
+
+    with span("elf.distribucion"):
+        inicio, Cvx, Fx = vertical_distribution(pisos, k, V)
+
+    return {
+        'Ct': Ct, 'alpha': alpha, 'T': T, 'k': k, 'Sa': Sa, 'Cs': Cs, 'V': V,
+        'categoria': building_category(pisos, carga_columna),
+        'requiere_estudio_sitio': perfil_f,
+        'inicio': inicio, 'Cvx': Cvx, 'Fx': Fx,
+    }
+
+
+def _parse_rows(filas):
+    validas, columnas, errores = [], [], []
+    for fila in filas:
+        try:
+            zona, suelo, region, r_valor, i_valor = parse_inputs(
+                fila['zona_sismica'], fila['tipo_suelo'], fila['region'], fila['r'], fila['i']
+            )
+            sistema = str(fila['sistema']).strip()
+            altura, peso = float(fila['altura']), float(fila['peso'])
+            pisos = float(fila['pisos'])
+            phi_p, phi_e = float(fila['phi_p']), float(fila['phi_e'])
+            carga = fila.get('carga_columna')
+            carga = float(carga) if carga not in (None, '') else float('nan')
+            if sistema not in SISTEMA_CODIGOS:
+                raise ValueError(f"Sistema estructural no reconocido: {sistema!r}")
+            if pisos < 1 or pisos != int(pisos):
+                raise ValueError("El número de pisos debe ser un entero mayor o igual que 1.")
+            if min(altura, peso, r_valor, i_valor, phi_p, phi_e) <= 0:
+                raise ValueError("La altura, el peso y los factores deben ser mayores que cero.")
+            for valor, codigos, nombre in ((suelo, SUELOS_INVENTARIO, 'tipo de suelo'),
+                                           (zona, ZONA_CODIGOS, 'zona sísmica'),
+                                           (region, REGION_CODIGOS, 'región')):
+                if valor not in codigos:
+                    raise ValueError(f"Valor de {nombre} no reconocido: {valor!r}")
+        except (KeyError, ValueError, TypeError, OverflowError) as e:
+            errores.append((fila.get('id'), f"{type(e).__name__}: {e}"))
+            continue
+        validas.append(fila)
+        columnas.append((sistema, altura, int(pisos), peso, zona, suelo, region, r_valor, i_valor, phi_p, phi_e,
+                         carga))
+    return validas, columnas, errores
+
+
+def compute_chunk(filas):
+    """
+    Calcula un bloque de filas del inventario
+
+    Args:
+        filas: Lista de diccionarios con las columnas de COLUMNAS
+
+    Returns:
+        Diccionario de compute_inventory más 'filas' válidas y la lista
+        'errores' de tuplas (id, mensaje)
+    """
+    with span("elf.parsear", filas=len(filas)):
+        validas, columnas, errores = _parse_rows(filas)
+    resultado = {'filas': validas, 'errores': errores}
+    if columnas:
+        sistema, altura, pisos, peso, zona, suelo, region, R, I, phi_p, phi_e, carga = zip(*columnas)
+        resultado.update(compute_inventory(sistema, altura, np.array(pisos), peso, zona, suelo, region, R, I,
+                                           np.array(phi_p), np.array(phi_e), np.array(carga)))
+    return resultado
+
+
+def read_inventory(path):
+    """
+    Lee las filas de un inventario CSV o JSONL sin cargarlo completo
+
+    Yields:
+        Diccionarios con las columnas normalizadas de COLUMNAS
+    """
+    for fila in read_rows(path):
+        yield {ALIAS_INVENTARIO.get(clave, clave): valor for clave, valor in fila.items()}
+
+
+class _JsonlWriter:
+    def __init__(self, archivo):
+        self.archivo = archivo
+
+    def write_chunk(self, bloque):
+        if not bloque['filas']:
+            return
+        escalares = np.column_stack([bloque[c] for c in COLUMNAS_RESULTADO[:-1]]).tolist()
+        fuerzas = np.split(bloque['Fx'], bloque['inicio'][1:-1])
+        for k, fila in enumerate(bloque['filas']):
+            registro = {clave: fila.get(clave) for clave in COLUMNAS}
+            registro.update(zip(COLUMNAS_RESULTADO, escalares[k]))
+            registro['categoria'] = CATEGORIAS_EDIFICIO[bloque['categoria'][k]]
+            registro['requiere_estudio_sitio'] = bool(bloque['requiere_estudio_sitio'][k])
+            registro['Fx'] = fuerzas[k].tolist()
+            self.archivo.write(json.dumps(registro, ensure_ascii=False))
+            self.archivo.write('\n')
+
+
+class _CsvWriter:
+    """Una fila por edificio; las fuerzas por piso, de abajo hacia arriba, separadas por ';'."""
+
+    def __init__(self, archivo):
+        self.writer = csv.writer(archivo)
+        self.writer.writerow([*COLUMNAS, *COLUMNAS_RESULTADO, 'requiere_estudio_sitio', 'Fx'])
+
+    def write_chunk(self, bloque):
+        if not bloque['filas']:
+            return
+        escalares = np.column_stack([bloque[c] for c in COLUMNAS_RESULTADO[:-1]]).tolist()
+        fuerzas = np.split(bloque['Fx'], bloque['inicio'][1:-1])
+        for k, fila in enumerate(bloque['filas']):
+            self.writer.writerow([
+                *(fila.get(c) for c in COLUMNAS), *escalares[k],
+                CATEGORIAS_EDIFICIO[bloque['categoria'][k]], bool(bloque['requiere_estudio_sitio'][k]),
+                ';'.join(f"{f:.6g}" for f in fuerzas[k].tolist()),
+            ])
+
+
+def run_inventory(input_path, output_path, chunk_size=4096, progress=sys.stderr):
+    """
+    Calcula la fuerza lateral equivalente de todo un inventario y la escribe por bloques
+
+    Se leen, calculan y escriben bloques de chunk_size edificios, de modo que la
+    memoria depende del tamaño del bloque y no del inventario.
+
+    Args:
+        input_path: Archivo CSV o JSONL del inventario ('-' lee JSONL desde stdin)
+        output_path: Archivo de salida .jsonl o .csv ('-' escribe JSONL en stdout)
+        chunk_size: Edificios por bloque
+        progress: Flujo donde se informa el avance (None para silenciar)
+
+    Returns:
+        Diccionario con 'edificios', 'errores', 'segundos' y 'edificios_por_segundo'
+        (y 'fases', el resumen por tramo, si la instrumentación está activa)
+    """
+    filas = read_inventory(input_path)
+    n_edificios = n_errores = 0
+    inicio = time.perf_counter()
+
+    archivo = sys.stdout if output_path == '-' else open(output_path, 'w', newline='', encoding='utf-8')
+    try:
+        writer = _CsvWriter(archivo) if output_path.lower().endswith('.csv') else _JsonlWriter(archivo)
+        while bloque := list(islice(filas, chunk_size)):
+            resultado = compute_chunk(bloque)
+            with span("elf.escribir", filas=len(resultado['filas'])):
+                writer.write_chunk(resultado)
+            n_edificios += len(resultado['filas'])
+            n_errores += len(resultado['errores'])
+            if progress is not None:
+                for fila_id, mensaje in resultado['errores']:
+                    print(f"Fila {fila_id}: {mensaje}", file=progress)
+    finally:
+        if archivo is not sys.stdout:
+            archivo.close()
+
+    segundos = time.perf_counter() - inicio
+    resumen = {
+        'edificios': n_edificios,
+        'errores': n_errores,
+        'segundos': segundos,
+        'edificios_por_segundo': n_edificios / segundos if segundos > 0 else float('inf'),
+    }
+    if instrumentation.enabled():
+        resumen['fases'] = instrumentation.summary()
+    if progress is not None:
+        print(f"Listo: {n_edificios} edificios, {n_errores} errores en {segundos:.2f} s "
+              f"({resumen['edificios_por_segundo']:.0f} edificios/s)", file=progress)
+        if instrumentation.enabled():
+            print(instrumentation.format_summary(), file=progress)
+    return resumen
+
+
+def add_arguments(parser):
+    parser.add_argument('input', help="Inventario CSV o JSONL con sistema, altura, pisos, peso, zona, suelo, "
+                                      "región, R, I, φP y φE ('-' para stdin)")
+    parser.add_argument('-o', '--output', default='-', help="Archivo de salida .jsonl o .csv (por defecto stdout)")
+    parser.add_argument('--chunk-size', type=int, default=4096, help="Edificios por bloque (por defecto 4096)")
+    parser.add_argument('-q', '--quiet', action='store_true', help="No informar el avance")
+
+
+def run(args):
+    resumen = run_inventory(args.input, args.output, chunk_size=args.chunk_size,
+                            progress=None if args.quiet else sys.stderr)
+    return 1 if resumen['errores'] else 0
@@ -1,10 +1,169 @@
-import ttkbootstrap as ttk
-from .app import EspectroSismicoApp
+import argparse
+import importlib
+import multiprocessing
+import os
+import subprocess
+import sys
+import time
+
+# Paquetes que solo deben cargarse al usar una exportación
+IMPORTACIONES_DIFERIDAS = ("pandas", "openpyxl", "reportlab")
+
+# Subcomandos: (nombre, módulo, ayuda); el módulo se importa solo al usarlo
+SUBCOMANDOS = (
+    ("batch", "batch", "Calcula espectros por lotes desde CSV o JSONL, sin interfaz gráfica"),
+    ("exportar", "bulk_export", "Archivos de función espectral (ETABS, SAP2000, OpenSees, CSV) por proyecto, a un directorio o zip"),
+    ("elf", "lateral_force", "Fuerza lateral equivalente para inventarios de edificios (CSV o JSONL)"),
+    ("modal", "modal_analysis", "Análisis modal espectral (SRSS y CQC) desde tablas exportadas de ETABS"),
+    ("registros", "ground_motion", "Espectros de respuesta de acelerogramas (.AT2 o texto)"),
+    ("montecarlo", "uncertainty", "Espectros percentiles por Monte Carlo bajo incertidumbre de sitio y factores"),
+    ("barrido", "sensitivity", "Barrido de sensibilidad de Si sobre R, I, ØP, ØE, suelo, zona y región"),
+    ("sondeos", "geotech", "Valida sondeos y tabula estratos o materiales por profundidad (estudio de suelos)"),
+    ("serve", "service", "Expone el motor de cálculo como servicio HTTP/JSON local"),
+)
+# Opciones globales que consumen el argumento siguiente
+OPCIONES_CON_VALOR = ("--trace-json",)
+
+
+def _subcomando(argv):
+    """Primer argumento de argv que nombra un subcomando, o None."""
+    nombres = {nombre for nombre, _, _ in SUBCOMANDOS}
+    omitir = False
+    for argumento in argv:
+        if omitir:
+            omitir = False
+        elif argumento in OPCIONES_CON_VALOR:
+            omitir = True
+        elif argumento in nombres:
+            return argumento
+        elif not argumento.startswith("-"):
+            return None
+    return None
+
+
+def build_parser(comando=None):
+    """
+    Construye el analizador de la línea de comandos
+
+    Args:
+        comando: Subcomando cuyo módulo se importa para registrar sus argumentos;
+            los demás solo aparecen en la ayuda y sus módulos no se cargan
+    """
+    parser = argparse.ArgumentParser(
+        prog="espectro-nec",
+        description="Generador de espectro de diseño sísmico según la NEC. Sin subcomando abre la interfaz gráfica.",
+    )
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="Muestra el desglose de tiempos de importación y de creación de la ventana, y termina")
+    parser.add_argument("--trace", action="store_true",
+                        help="Mide tiempo y pico de memoria por fase (también con ESPECTRO_NEC_TRACE=1)")
+    parser.add_argument("--trace-json", metavar="ARCHIVO",
+                        help="Como --trace, y al salir guarda una traza compatible con chrome://tracing")
+    subparsers = parser.add_subparsers(dest="comando")
+
+    for nombre, modulo, ayuda in SUBCOMANDOS:
+        subparser = subparsers.add_parser(nombre, help=ayuda)
+        if nombre == comando:
+            modulo = importlib.import_module(f".{modulo}", __package__)
+            modulo.add_arguments(subparser)
+            subparser.set_defaults(ejecutar=modulo.run)
+
+    return parser
+
+
+def run_gui():
+    import ttkbootstrap as ttk
+    from .app import EspectroSismicoApp
 
-def main():
     root = ttk.Window(themename="litera")
     app = EspectroSismicoApp(root)
     root.mainloop()
 
+
+def _import_times(module):
+    """
+    Importa module en un intérprete nuevo con -X importtime
+
+    Returns:
+        Lista de (paquete, segundos) con el tiempo propio agrupado por paquete
+        de primer nivel, ordenada de mayor a menor, y el conjunto de módulos cargados
+    """
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(p for p in sys.path if p))
+    proceso = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                             env=env, capture_output=True, text=True, check=True)
+    por_paquete, cargados = {}, set()
+    for linea in proceso.stderr.splitlines():
+        if not linea.startswith("import time:") or "|" not in linea:
+            continue
+        propio, _, nombre = linea[len("import time:"):].split("|")
+        if not propio.strip().isdigit():
+            continue  # encabezado
+        nombre = nombre.strip()
+        cargados.add(nombre)
+        paquete = nombre.split(".")[0]
+        por_paquete[paquete] = por_paquete.get(paquete, 0.0) + int(propio) / 1e6
+    return sorted(por_paquete.items(), key=lambda item: item[1], reverse=True), cargados
+
+
+def profile_startup(top=15):
+    """
+    Imprime el desglose del arranque: importaciones en frío de espectro_nec.app
+    y tiempo hasta dibujar la primera ventana
+    """
+    tiempos, cargados = _import_times("espectro_nec.app")
+    total = sum(segundos for _, segundos in tiempos)
+    print(f"Importación en frío de espectro_nec.app: {total * 1000:.0f} ms")
+    for paquete, segundos in tiempos[:top]:
+        print(f"  {paquete:<28}{segundos * 1000:8.1f} ms")
+
+    diferidas = [nombre for nombre in IMPORTACIONES_DIFERIDAS if nombre in cargados]
+    if diferidas:
+        print(f"ADVERTENCIA: se cargan al inicio paquetes que deberían ser diferidos: {', '.join(diferidas)}")
+
+    import tkinter as tk
+    inicio = time.perf_counter()
+    import ttkbootstrap as ttk
+    from .app import EspectroSismicoApp
+    importado = time.perf_counter()
+    print(f"Importación en este proceso: {(importado - inicio) * 1000:.0f} ms")
+    try:
+        root = ttk.Window(themename="litera")
+    except tk.TclError as e:
+        print(f"Sin pantalla disponible, se omite la medición de la ventana: {e}")
+        return 1 if diferidas else 0
+    EspectroSismicoApp(root)
+    root.update()
+    listo = time.perf_counter()
+    root.destroy()
+    print(f"Creación y primer dibujo de la ventana: {(listo - importado) * 1000:.0f} ms")
+    return 1 if diferidas else 0
+
+
+def main(argv=None):
+    # En el ejecutable de PyInstaller cada proceso de trabajo (registros, batch,
+    # exportar, montecarlo) vuelve a arrancar por aquí: freeze_support lo atiende
+    # y termina antes de abrir otra ventana
+    multiprocessing.freeze_support()
+    if argv is None:
+        argv = sys.argv[1:]
+    args = build_parser(_subcomando(argv)).parse_args(argv)
+    if args.profile_startup:
+        return profile_startup()
+
+    from . import instrumentation
+    if args.trace or args.trace_json:
+        instrumentation.enable()
+    else:
+        instrumentation.enable_from_env()
+    try:
+        if args.comando is None:
+            run_gui()
+            return 0
+        return args.ejecutar(args)
+    finally:
+        if args.trace_json:
+            n = instrumentation.write_chrome_trace(args.trace_json)
+            print(f"Traza con {n} tramos guardada en {args.trace_json}", file=sys.stderr)
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    raise SystemExit(main())
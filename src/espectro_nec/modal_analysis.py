@@ -0,0 +1,292 @@
+"""Análisis modal espectral con combinación SRSS y CQC (subcomando ``espectro-nec modal``)."""
+
+import csv
+import re
+
+import numpy as np
+
+from .seismic_calculations import GRAVEDAD, DesignSpectrum
+
+AMORTIGUAMIENTO = 0.05
+
+
+def cqc_correlation(periodos, amortiguamiento=AMORTIGUAMIENTO):
+    """
+    Matriz de correlación modal de la CQC (Der Kiureghian, amortiguamiento igual en todos los modos)
+
+    ρij = 8ζ²(1 + β)β^1.5 / ((1 - β²)² + 4ζ²β(1 + β)²), con β = ωj/ωi = Ti/Tj.
+
+    Args:
+        periodos: Períodos modales (s), arreglo 1-D
+        amortiguamiento: Razón de amortiguamiento ζ
+
+    Returns:
+        Matriz simétrica (n_modos, n_modos) con unos en la diagonal
+    """
+    periodos = np.asarray(periodos, dtype=np.float64)
+    beta = periodos[:, None] / periodos[None, :]
+    z2 = amortiguamiento * amortiguamiento
+    return (8 * z2 * (1 + beta) * beta ** 1.5
+            / ((1 - beta * beta) ** 2 + 4 * z2 * beta * (1 + beta) ** 2))
+
+
+def spectral_ordinates(periodos, espectro):
+    """
+    Ordenadas espectrales (g) en los períodos modales
+
+    Args:
+        periodos: Períodos modales (s), arreglo 1-D
+        espectro: Uno de
+            - DesignSpectrum (o cualquier función de T): se evalúa en forma cerrada
+            - Tupla (T, S) con la malla y las ordenadas de calculate_spectrum
+              (S 1-D) o de calculate_spectrum_many (S con forma (n_espectros, n_periodos)),
+              que se interpolan linealmente
+
+    Returns:
+        Arreglo (n_modos,) o (n_espectros, n_modos)
+    """
+    periodos = np.asarray(periodos, dtype=np.float64)
+    if callable(espectro):
+        return np.asarray(espectro(periodos), dtype=np.float64)
+
+    T, S = (np.asarray(v, dtype=np.float64) for v in espectro)
+    if S.ndim == 1:
+        return np.interp(periodos, T, S)
+    if S.shape[-1] != T.size:
+        raise ValueError("Las ordenadas deben tener un valor por período de la malla.")
+    # Índices y pesos de interpolación comunes a todos los espectros de la malla
+    periodos = np.clip(periodos, T[0], T[-1])
+    derecha = np.clip(np.searchsorted(T, periodos, side='right'), 1, T.size - 1)
+    izquierda = derecha - 1
+    peso = (periodos - T[izquierda]) / (T[derecha] - T[izquierda])
+    return S[:, izquierda] * (1 - peso) + S[:, derecha] * peso
+
+
+def combine_srss(respuestas):
+    """
+    Combinación SRSS de respuestas modales
+
+    Args:
+        respuestas: Arreglo (..., n_modos, n_respuestas)
+
+    Returns:
+        Arreglo (..., n_respuestas)
+    """
+    respuestas = np.asarray(respuestas, dtype=np.float64)
+    return np.sqrt(np.einsum('...md,...md->...d', respuestas, respuestas))
+
+
+def combine_cqc(respuestas, rho):
+    """
+    Combinación CQC de respuestas modales, r = √(Σi Σj ρij ri rj)
+
+    Args:
+        respuestas: Arreglo (..., n_modos, n_respuestas)
+        rho: Matriz de correlación de cqc_correlation
+
+    Returns:
+        Arreglo (..., n_respuestas)
+    """
+    respuestas = np.asarray(respuestas, dtype=np.float64)
+    suma = np.einsum('...md,...md->...d', respuestas, np.matmul(rho, respuestas))
+    # Con ρ definida positiva la suma no es negativa; se recorta el redondeo
+    return np.sqrt(np.maximum(suma, 0.0))
+
+
+def modal_analysis(periodos, factores, espectro, formas=None, masas_efectivas=None, peso=None,
+                   amortiguamiento=AMORTIGUAMIENTO):
+    """
+    Respuesta modal espectral de una estructura para uno o varios espectros
+
+    Desplazamiento modal un = Γn·φn·Sd(Tn), con Sd = Sa·g·(Tn/2π)²; cortante
+    basal modal Vn = (masa efectiva)n·W·Sa(Tn).
+
+    Args:
+        periodos: Períodos modales (s), arreglo (n_modos,)
+        factores: Factores de participación Γn en la dirección de análisis
+        espectro: Espectro de diseño (ver spectral_ordinates), normalmente Si
+        formas: Formas modales (n_modos, n_grados), opcional
+        masas_efectivas: Razones de masa modal efectiva en la dirección, opcional
+        peso: Peso sísmico W (para el cortante basal), opcional
+        amortiguamiento: Razón de amortiguamiento de la CQC
+
+    Returns:
+        Diccionario con 'Sa' (n_modos o n_espectros × n_modos), 'Sd' (m),
+        'rho', y si hay formas 'desplazamientos_modales', 'desplazamientos_srss',
+        'desplazamientos_cqc'; si hay masas efectivas y peso, 'cortantes_modales',
+        'cortante_srss' y 'cortante_cqc'
+    """
+    periodos = np.asarray(periodos, dtype=np.float64)
+    factores = np.asarray(factores, dtype=np.float64)
+    if periodos.ndim != 1 or factores.shape != periodos.shape:
+        raise ValueError("Los períodos y los factores de participación deben ser arreglos 1-D de igual longitud.")
+    if np.any(periodos <= 0):
+        raise ValueError("Los períodos modales deben ser mayores que cero.")
+
+    Sa = spectral_ordinates(periodos, espectro)
+    Sd = Sa * GRAVEDAD * (periodos / (2 * np.pi)) ** 2
+    rho = cqc_correlation(periodos, amortiguamiento)
+    resultado = {'Sa': Sa, 'Sd': Sd, 'rho': rho}
+
+    if formas is not None:
+        formas = np.asarray(formas, dtype=np.float64)
+        if formas.ndim != 2 or formas.shape[0] != periodos.size:
+            raise ValueError("Las formas modales deben tener forma (n_modos, n_grados).")
+        modales = (factores * Sd)[..., :, None] * formas
+        resultado.update(desplazamientos_modales=modales,
+                         desplazamientos_srss=combine_srss(modales),
+                         desplazamientos_cqc=combine_cqc(modales, rho))
+
+    if masas_efectivas is not None and peso is not None:
+        cortantes = (np.asarray(masas_efectivas, dtype=np.float64) * peso * Sa)[..., :, None]
+        resultado.update(cortantes_modales=cortantes[..., 0],
+                         cortante_srss=combine_srss(cortantes)[..., 0],
+                         cortante_cqc=combine_cqc(cortantes, rho)[..., 0])
+    return resultado
+
+
+def _normalizar_nombre(texto):
+    return re.sub(r'[^a-z0-9]', '', texto.lower())
+
+
+def _numero(texto):
+    try:
+        return float(texto)
+    except (TypeError, ValueError):
+        return None
+
+
+def read_etabs_tables(path):
+    """
+    Lee las tablas de una exportación tabular de ETABS
+
+    Acepta archivos CSV o de texto separados por comas o tabulaciones con bloques
+    'TABLE: nombre' seguidos de la fila de encabezados (y opcionalmente la de
+    unidades), y el formato de texto de bloques con pares Campo=Valor.
+
+    Returns:
+        Diccionario nombre normalizado de la tabla -> lista de filas (diccionarios
+        con los encabezados normalizados: 'mode', 'period', 'ux', ...)
+    """
+    tablas, filas, encabezados = {}, None, None
+    with open(path, newline='', encoding='utf-8-sig') as archivo:
+        contenido = archivo.read()
+    delimitador = '\t' if contenido.count('\t') > contenido.count(',') else ','
+    for linea in contenido.splitlines():
+        if not linea.strip():
+            continue
+        titulo = re.match(r'\s*TABLE:\s*"?([^"]+?)"?\s*[,\t]*$', linea, re.IGNORECASE)
+        if titulo:
+            filas = tablas.setdefault(_normalizar_nombre(titulo.group(1)), [])
+            encabezados = None
+            continue
+        if filas is None:
+            continue
+        pares = re.findall(r'(\w+)=("[^"]*"|\S+)', linea)
+        if pares:
+            filas.append({_normalizar_nombre(k): v.strip('"') for k, v in pares})
+            continue
+        celdas = [c.strip() for c in next(csv.reader([linea], delimiter=delimitador))]
+        if encabezados is None:
+            encabezados = [_normalizar_nombre(c) for c in celdas]
+        elif any(_numero(c) is not None for c in celdas):
+            filas.append(dict(zip(encabezados, celdas)))
+        # Una fila sin números tras los encabezados es la de unidades
+    return tablas
+
+
+def _tabla(tablas, *nombres):
+    for nombre in nombres:
+        if tablas.get(nombre):
+            return tablas[nombre]
+    return None
+
+
+def read_etabs_modal(path, direccion='UX'):
+    """
+    Extrae los datos modales de una exportación tabular de ETABS
+
+    Usa las tablas 'Modal Participation Factors' (Γ), 'Modal Participating Mass
+    Ratios' (masas efectivas) y, si están, 'Joint Displacements' del caso modal
+    (formas modales en la misma dirección).
+
+    Args:
+        path: Archivo exportado por ETABS (CSV o texto)
+        direccion: 'UX' o 'UY'
+
+    Returns:
+        Diccionario con 'modos', 'periodos', 'factores', 'masas_efectivas'
+        (o None), 'formas' (n_modos, n_nudos o None) y 'nudos'
+    """
+    direccion = direccion.lower()
+    if direccion not in ('ux', 'uy'):
+        raise ValueError("La dirección debe ser 'UX' o 'UY'.")
+    tablas = read_etabs_tables(path)
+
+    factores = _tabla(tablas, 'modalparticipationfactors')
+    if factores is None:
+        raise ValueError("El archivo no contiene la tabla 'Modal Participation Factors' con los factores Γ.")
+
+    modos = [int(float(fila['mode'])) for fila in factores]
+    resultado = {
+        'modos': modos,
+        'periodos': np.array([float(fila['period']) for fila in factores]),
+        'factores': np.array([float(fila[direccion]) for fila in factores]),
+        'masas_efectivas': None, 'formas': None, 'nudos': [],
+    }
+    masas = _tabla(tablas, 'modalparticipatingmassratios')
+    if masas is not None:
+        por_modo = {int(float(fila['mode'])): float(fila[direccion]) for fila in masas}
+        resultado['masas_efectivas'] = np.array([por_modo.get(m, 0.0) for m in modos])
+
+    desplazamientos = _tabla(tablas, 'jointdisplacements', 'modaldisplacements')
+    if desplazamientos:
+        indice = {m: k for k, m in enumerate(modos)}
+        nudos = {}
+        valores = {}
+        for fila in desplazamientos:
+            modo = _numero(fila.get('stepnumber') or fila.get('stepnum') or fila.get('mode'))
+            if modo is None or int(modo) not in indice:
+                continue
+            nudo = fila.get('uniquename') or fila.get('label') or fila.get('joint')
+            nudos.setdefault(nudo, len(nudos))
+            valores[indice[int(modo)], nudos[nudo]] = float(fila[direccion])
+        formas = np.zeros((len(modos), len(nudos)))
+        for (k, j), valor in valores.items():
+            formas[k, j] = valor
+        resultado['formas'], resultado['nudos'] = formas, list(nudos)
+    return resultado
+
+
+def add_arguments(parser):
+    from .constants import REGION_OPTIONS
+    parser.add_argument('modal', help="Exportación tabular de ETABS (CSV o texto) con las tablas modales")
+    parser.add_argument('--direccion', default='UX', choices=('UX', 'UY'), help="Dirección de análisis")
+    parser.add_argument('--zona', default='V', help="Zona sísmica (I a VI)")
+    parser.add_argument('--suelo', default='D', help="Tipo de suelo (A a E)")
+    parser.add_argument('--region', default=REGION_OPTIONS[0], help="Región")
+    parser.add_argument('--r', type=float, default=8.0, help="Factor de reducción R")
+    parser.add_argument('--i', type=float, default=1.0, help="Factor de importancia I")
+    parser.add_argument('--phi-p', type=float, default=1.0, help="Factor ØP")
+    parser.add_argument('--phi-e', type=float, default=1.0, help="Factor ØE")
+    parser.add_argument('--peso', type=float, default=None, help="Peso sísmico W para el cortante basal")
+    parser.add_argument('--amortiguamiento', type=float, default=AMORTIGUAMIENTO, help="Razón ζ de la CQC")
+
+
+def run(args):
+    datos = read_etabs_modal(args.modal, args.direccion)
+    espectro = DesignSpectrum.from_labels(args.suelo, args.zona, args.region, args.r, args.i, args.phi_p, args.phi_e)
+    resultado = modal_analysis(datos['periodos'], datos['factores'], espectro.si, datos['formas'],
+                               datos['masas_efectivas'], args.peso, args.amortiguamiento)
+
+    print(f"{'modo':>5}{'T (s)':>10}{'Γ':>10}{'Si (g)':>10}{'Sd (m)':>12}")
+    for modo, T, gamma, si, sd in zip(datos['modos'], datos['periodos'], datos['factores'], resultado['Sa'],
+                                      resultado['Sd']):
+        print(f"{modo:>5}{T:>10.4f}{gamma:>10.4f}{si:>10.4f}{sd:>12.5f}")
+    if 'cortante_cqc' in resultado:
+        print(f"Cortante basal: SRSS {resultado['cortante_srss']:.2f} · CQC {resultado['cortante_cqc']:.2f}")
+    if 'desplazamientos_cqc' in resultado:
+        k = int(np.argmax(resultado['desplazamientos_cqc']))
+        print(f"Desplazamiento máximo ({datos['nudos'][k]}): SRSS {resultado['desplazamientos_srss'][k]:.5f} · "
+              f"CQC {resultado['desplazamientos_cqc'][k]:.5f}")
+    return 0
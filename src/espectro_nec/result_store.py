@@ -0,0 +1,298 @@
+"""
+Almacén binario columnar de resultados por lotes (archivos .nec), leído con np.memmap
+
+Estructura del archivo (little endian, secciones alineadas a 64 bytes):
+
+    encabezado   MAGIA (8 bytes), versión (uint32), reservado (uint32),
+                 posición y longitud del índice (2 x uint64)
+    T            malla de períodos común, float64 (n_periodos,)
+    Sa           matriz (n_casos, n_periodos) en float64 o float32; Se = Sa
+    Si           matriz (n_casos, n_periodos) con el mismo tipo que Sa
+    columnas     una sección por parámetro de entrada o resultado escalar;
+                 zona, suelo y región como códigos uint8
+    id           desplazamientos int64 (n_casos + 1) y texto UTF-8
+    índice       JSON con la forma, el tipo y la posición de cada sección
+
+Sa se escribe en el archivo a medida que llegan los bloques y Si en un archivo
+temporal que se copia al cerrar, de modo que la memoria no crece con el lote.
+"""
+
+import json
+import os
+import shutil
+import struct
+import tempfile
+
+import numpy as np
+
+from .batch import COLUMNAS, COLUMNAS_ESCALARES, RESULTADOS_ESCALARES
+from .seismic_calculations import ENGINE_VERSION, REGIONES, SUELOS, ZONAS
+
+EXTENSION = '.nec'
+MAGIA = b'ESPNEC\x00\x01'
+VERSION_FORMATO = 1
+ALINEACION = 64
+
+_ENCABEZADO = struct.Struct('<8sIIQQ')
+
+# Columnas categóricas: nombre -> (clave del bloque con los códigos, etiquetas)
+CATEGORIAS = {
+    'zona_sismica': ('codigo_zona', ZONAS),
+    'tipo_suelo': ('codigo_suelo', SUELOS),
+    'region': ('codigo_region', REGIONES),
+}
+# Factores de entrada: nombre de la columna -> clave del bloque
+FACTORES = {'r': 'R', 'i': 'I', 'phi_p': 'phi_P', 'phi_e': 'phi_E'}
+
+PRECISIONES = {'float64': np.dtype('<f8'), 'float32': np.dtype('<f4')}
+
+
+def _alinear(archivo):
+    relleno = -archivo.tell() % ALINEACION
+    if relleno:
+        archivo.write(b'\x00' * relleno)
+    return archivo.tell()
+
+
+class ResultStoreWriter:
+    """
+    Escribe un almacén .nec bloque a bloque
+
+    Args:
+        path: Ruta del archivo de salida
+        precision: 'float64' o 'float32' para Sa y Si (T y las columnas siempre en float64)
+    """
+
+    def __init__(self, path, precision='float64'):
+        if precision not in PRECISIONES:
+            raise ValueError(f"Precisión no soportada: {precision!r}; use {', '.join(PRECISIONES)}.")
+        self.path = path
+        self.dtype = PRECISIONES[precision]
+        self.T = None
+        self.n_casos = 0
+        self.secciones = {}
+        self._columnas = {nombre: [] for nombre in (*CATEGORIAS, *FACTORES, *COLUMNAS_ESCALARES)}
+        self._ids = []
+        self._archivo = open(path, 'wb')
+        self._si = tempfile.TemporaryFile(dir=os.path.dirname(os.path.abspath(path)))
+        self._archivo.write(b'\x00' * _ENCABEZADO.size)
+
+    def _seccion(self, nombre, arreglo):
+        self.secciones[nombre] = {'offset': _alinear(self._archivo), 'dtype': arreglo.dtype.str,
+                                  'shape': list(arreglo.shape)}
+        self._archivo.write(np.ascontiguousarray(arreglo).data)
+
+    def append(self, T, Sa, Si, columnas, ids):
+        """
+        Agrega un grupo de espectros calculados sobre la malla T
+
+        Args:
+            T: Malla de períodos; debe ser la misma en todas las llamadas
+            Sa, Si: Matrices (n, len(T))
+            columnas: Diccionario con los códigos de CATEGORIAS, los factores de
+                FACTORES y los escalares de COLUMNAS_ESCALARES, arreglos de largo n
+            ids: Secuencia de n identificadores
+        """
+        T = np.asarray(T, dtype='<f8')
+        if self.T is None:
+            self.T = T
+            self._seccion('T', T)
+            self.secciones['Sa'] = {'offset': _alinear(self._archivo), 'dtype': self.dtype.str}
+        elif T.shape != self.T.shape or not np.array_equal(T, self.T):
+            raise ValueError("Todos los espectros de un almacén deben compartir la malla de períodos.")
+        Sa = np.asarray(Sa).reshape(-1, T.size)
+        Si = np.asarray(Si).reshape(-1, T.size)
+        self._archivo.write(np.ascontiguousarray(Sa, dtype=self.dtype).data)
+        self._si.write(np.ascontiguousarray(Si, dtype=self.dtype).data)
+        for nombre, valores in self._columnas.items():
+            valores.append(np.asarray(columnas[nombre]))
+        self._ids.extend('' if valor is None else str(valor) for valor in ids)
+        self.n_casos += len(Sa)
+
+    def write_block(self, bloque):
+        """Agrega un bloque de batch.compute_block."""
+        if not bloque['filas']:
+            return
+        columnas = {nombre: bloque[clave] for nombre, (clave, _) in CATEGORIAS.items()}
+        columnas.update({nombre: bloque[clave] for nombre, clave in FACTORES.items()})
+        columnas.update({columna: bloque[clave] for clave, columna in zip(RESULTADOS_ESCALARES, COLUMNAS_ESCALARES)})
+        self.append(bloque['T'], bloque['Sa'], bloque['Si'], columnas, (fila.get('id') for fila in bloque['filas']))
+
+    def close(self):
+        if self._archivo.closed:
+            return
+        try:
+            if self.T is None:
+                self.T = np.empty(0, dtype='<f8')
+                self._seccion('T', self.T)
+                self.secciones['Sa'] = {'offset': _alinear(self._archivo), 'dtype': self.dtype.str}
+            forma = [self.n_casos, self.T.size]
+            self.secciones['Sa']['shape'] = forma
+            self.secciones['Si'] = {'offset': _alinear(self._archivo), 'dtype': self.dtype.str, 'shape': forma}
+            self._si.seek(0)
+            shutil.copyfileobj(self._si, self._archivo, 16 * 1024 * 1024)
+
+            for nombre, valores in self._columnas.items():
+                tipo = 'u1' if nombre in CATEGORIAS else '<f8'
+                columna = np.concatenate(valores) if valores else np.empty(0)
+                self._seccion(nombre, columna.astype(tipo, copy=False))
+            textos = [valor.encode('utf-8') for valor in self._ids]
+            self._seccion('id_offsets', np.cumsum([0, *map(len, textos)], dtype='<i8'))
+            self._seccion('id', np.frombuffer(b''.join(textos), dtype='u1'))
+
+            indice = json.dumps({
+                'formato': VERSION_FORMATO,
+                'motor': ENGINE_VERSION,
+                'n_casos': self.n_casos,
+                'n_periodos': int(self.T.size),
+                'categorias': {nombre: list(etiquetas) for nombre, (_, etiquetas) in CATEGORIAS.items()},
+                'secciones': self.secciones,
+            }, ensure_ascii=False).encode('utf-8')
+            posicion = _alinear(self._archivo)
+            self._archivo.write(indice)
+            self._archivo.seek(0)
+            self._archivo.write(_ENCABEZADO.pack(MAGIA, VERSION_FORMATO, 0, posicion, len(indice)))
+        finally:
+            self._si.close()
+            self._archivo.close()
+
+    def discard(self):
+        """Cierra el almacén sin completarlo y elimina el archivo parcial."""
+        if self._archivo.closed:
+            return
+        self._si.close()
+        self._archivo.close()
+        os.remove(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # Si el lote falló no se escribe el encabezado: no queda un almacén incompleto que parezca válido
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+
+class ResultStore:
+    """
+    Lectura de un almacén .nec con np.memmap
+
+    Las matrices se proyectan en memoria sin leerlas: store.Si[k] lee un
+    edificio y store.Si[:, j] un período en todos los edificios. Se es una
+    referencia a Sa, que el archivo guarda una sola vez.
+
+    Atributos:
+        T, Sa, Se, Si: Malla de períodos y matrices (n_casos, n_periodos) de solo lectura
+        n_casos, n_periodos: Dimensiones
+        indice: Índice JSON del archivo
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as archivo:
+            encabezado = archivo.read(_ENCABEZADO.size)
+            if len(encabezado) < _ENCABEZADO.size or encabezado[:8] != MAGIA:
+                raise ValueError(f"{path} no es un almacén de espectros {EXTENSION}.")
+            _, version, _, posicion, longitud = _ENCABEZADO.unpack(encabezado)
+            if version > VERSION_FORMATO:
+                raise ValueError(f"Versión de almacén no soportada: {version}")
+            archivo.seek(posicion)
+            self.indice = json.loads(archivo.read(longitud).decode('utf-8'))
+        self.n_casos = self.indice['n_casos']
+        self.n_periodos = self.indice['n_periodos']
+        self._mapas = {}
+        self._ids = None
+
+    def _seccion(self, nombre):
+        if nombre not in self._mapas:
+            seccion = self.indice['secciones'][nombre]
+            forma = tuple(seccion['shape'])
+            if 0 in forma:
+                self._mapas[nombre] = np.empty(forma, dtype=seccion['dtype'])
+            else:
+                self._mapas[nombre] = np.memmap(self.path, dtype=seccion['dtype'], mode='r',
+                                                offset=seccion['offset'], shape=forma)
+        return self._mapas[nombre]
+
+    @property
+    def T(self):
+        return self._seccion('T')
+
+    @property
+    def Sa(self):
+        return self._seccion('Sa')
+
+    Se = Sa
+
+    @property
+    def Si(self):
+        return self._seccion('Si')
+
+    @property
+    def columnas(self):
+        """Nombres de las columnas de parámetros, en el orden de COLUMNAS y COLUMNAS_ESCALARES."""
+        return tuple(c for c in (*COLUMNAS, *COLUMNAS_ESCALARES) if c == 'id' or c in self.indice['secciones'])
+
+    def column(self, nombre):
+        """
+        Columna de parámetros completa
+
+        Returns:
+            Arreglo float64 (memmap), o arreglo de etiquetas para zona, suelo y
+            región, o lista de identificadores para 'id'
+        """
+        if nombre == 'id':
+            return list(self.ids)
+        if nombre not in self.indice['secciones'] or nombre in ('T', 'Sa', 'Si', 'id_offsets'):
+            raise KeyError(nombre)
+        valores = self._seccion(nombre)
+        if nombre in self.indice['categorias']:
+            return np.asarray(self.indice['categorias'][nombre], dtype=object)[valores]
+        return valores
+
+    @property
+    def ids(self):
+        if self._ids is None:
+            datos = self._seccion('id').tobytes()
+            limites = self._seccion('id_offsets').tolist()
+            self._ids = [datos[a:b].decode('utf-8') for a, b in zip(limites[:-1], limites[1:])]
+        return self._ids
+
+    def period_index(self, periodo):
+        """Índice del período de la malla más cercano a periodo (s)."""
+        return int(np.abs(self.T - periodo).argmin())
+
+    def __len__(self):
+        return self.n_casos
+
+    def __getitem__(self, k):
+        """Resultado k como en batch.block_results: parámetros, 'T' y las filas 'Sa' y 'Si'."""
+        if not -self.n_casos <= k < self.n_casos:
+            raise IndexError(k)
+        k %= self.n_casos
+        resultado = {'id': self.ids[k]}
+        for nombre in self.columnas[1:]:
+            valor = self._seccion(nombre)[k]
+            if nombre in self.indice['categorias']:
+                resultado[nombre] = self.indice['categorias'][nombre][valor]
+            else:
+                resultado[nombre] = float(valor)
+        resultado['T'] = self.T
+        resultado['Sa'] = self.Sa[k]
+        resultado['Si'] = self.Si[k]
+        return resultado
+
+    def __iter__(self):
+        return (self[k] for k in range(self.n_casos))
+
+    def close(self):
+        """Libera las proyecciones en memoria (los arreglos ya entregados siguen válidos)."""
+        self._mapas.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
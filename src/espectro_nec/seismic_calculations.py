@@ -1,110 +1,383 @@
+import functools
+import math
+
 import numpy as np
 
-def parse_values(variables):
+try:
+    from .constants import REGION_OPTIONS
+except ImportError:
+    # Espectro_NEC.py se puede ejecutar suelto desde esta carpeta, sin el paquete
+    from constants import REGION_OPTIONS
+
+def parse_inputs(zona_text, tipo_suelo_text, region, r_text, i_text):
     """
-    Parsea los valores de las variables de la interfaz
+    Parsea los textos de entrada tal como aparecen en los menús desplegables
+    
+    Acepta tanto las etiquetas completas ('VI (0.50g)', 'C - Suelos ...',
+    '8.0 - Pórticos ...') como los valores cortos ('VI', 'C', '8').
     
-    Args:
-        variables: Diccionario con las variables tkinter
-        
     Returns:
         Tupla con zona_sismica, tipo_suelo, region, r_valor, i_valor
     """
     # Parsear zona sísmica
-    zona_text = variables['zona_sismica_var'].get()
-    zona_romana = zona_text.split(' ')[0]
+    zona_romana = str(zona_text).split(' ')[0]
     
     # Parsear tipo de suelo
-    tipo_suelo_text = variables['tipo_suelo_var'].get()
-    tipo_suelo = tipo_suelo_text.split(' ')[0]
+    tipo_suelo = str(tipo_suelo_text).split(' ')[0]
     
     # Parsear factor R
-    r_text = variables['r_var'].get()
-    r_valor = float(r_text.split(' ')[0])
+    r_valor = float(str(r_text).split(' ')[0])
     
     # Parsear factor I
-    i_text = variables['i_var'].get()
-    i_valor = float(i_text.split(' ')[0])
+    i_valor = float(str(i_text).split(' ')[0])
+    
+    return zona_romana, tipo_suelo, region, r_valor, i_valor
+
+def parse_values(variables):
+    """
+    Parsea los valores de las variables de la interfaz
+    
+    Args:
+        variables: Diccionario con las variables tkinter
+        
+    Returns:
+        Tupla con zona_sismica, tipo_suelo, region, r_valor, i_valor
+    """
+    return parse_inputs(
+        variables['zona_sismica_var'].get(),
+        variables['tipo_suelo_var'].get(),
+        variables['region_var'].get(),
+        variables['r_var'].get(),
+        variables['i_var'].get(),
+    )
+
+# Malla de períodos por defecto: 1000 puntos entre 0 y 6 s
+T_MAX = 6.0
+N_PERIODOS = 1000
+
+# Códigos enteros de las tablas NEC: la posición en cada tupla es el código
+SUELOS = ('A', 'B', 'C', 'D', 'E')
+ZONAS = ('I', 'II', 'III', 'IV', 'V', 'VI')
+REGIONES = REGION_OPTIONS
+
+SUELO_CODIGOS = {valor: codigo for codigo, valor in enumerate(SUELOS)}
+ZONA_CODIGOS = {valor: codigo for codigo, valor in enumerate(ZONAS)}
+REGION_CODIGOS = {valor: codigo for codigo, valor in enumerate(REGIONES)}
+
+# Factores de amplificación del suelo según las tablas (filas: suelo, columnas: zona)
+# Tabla 3: Fa - Coeficiente de amplificación de suelo en la zona de período corto
+FA_TABLA = np.array([
+    [0.9, 0.9, 0.9, 0.9, 0.9, 0.9],
+    [1.0, 1.0, 1.0, 1.0, 1.0, 1.0],
+    [1.4, 1.3, 1.25, 1.23, 1.2, 1.18],
+    [1.6, 1.4, 1.3, 1.25, 1.2, 1.12],
+    [1.8, 1.4, 1.25, 1.1, 1.0, 0.85],
+])
+
+# Tabla 4: Fd - Amplificación de las ordenadas del espectro elástico de respuesta de desplazamientos
+FD_TABLA = np.array([
+    [0.9, 0.9, 0.9, 0.9, 0.9, 0.9],
+    [1.0, 1.0, 1.0, 1.0, 1.0, 1.0],
+    [1.36, 1.28, 1.19, 1.15, 1.11, 1.06],
+    [1.62, 1.45, 1.36, 1.28, 1.19, 1.11],
+    [2.1, 1.75, 1.7, 1.65, 1.6, 1.5],
+])
+
+# Tabla 5: Fs - Comportamiento no lineal de los suelos
+FS_TABLA = np.array([
+    [0.75, 0.75, 0.75, 0.75, 0.75, 0.75],
+    [0.75, 0.75, 0.75, 0.75, 0.75, 0.75],
+    [0.85, 0.94, 1.02, 1.06, 1.11, 1.23],
+    [1.02, 1.06, 1.11, 1.19, 1.28, 1.40],
+    [1.5, 1.6, 1.7, 1.8, 1.9, 2.0],
+])
+
+# Valores de r (factor de control de caída del espectro) por tipo de suelo
+R_CAIDA_TABLA = np.array([1, 1, 1, 1, 1.5])
+
+# Factor eta por región y factor Z por zona sísmica
+ETA_TABLA = np.array([1.8, 2.48, 2.60])
+Z_TABLA = np.array([0.15, 0.25, 0.30, 0.35, 0.40, 0.50])
+
+# Aceleración de la gravedad (m/s2): las ordenadas espectrales están en g
+GRAVEDAD = 9.80665
+
+# Versión de las fórmulas del motor: incrementarla invalida los espectros guardados en caché
+ENGINE_VERSION = 1
+
+for _tabla in (FA_TABLA, FD_TABLA, FS_TABLA, R_CAIDA_TABLA, ETA_TABLA, Z_TABLA):
+    _tabla.setflags(write=False)
+
+
+def encode_labels(valores, codigos):
+    """
+    Convierte etiquetas (tipo de suelo, zona o región) a sus códigos enteros
+    
+    Args:
+        valores: Etiqueta o secuencia de etiquetas
+        codigos: Diccionario etiqueta -> código (SUELO_CODIGOS, ZONA_CODIGOS o REGION_CODIGOS)
+        
+    Returns:
+        Arreglo de códigos enteros con la forma de valores
+    """
+    valores = np.asarray(valores)
+    unicos, inversa = np.unique(valores, return_inverse=True)
+    return np.array([codigos[valor] for valor in unicos.tolist()], dtype=np.intp)[inversa].reshape(valores.shape)
+
+
+def _validar_codigos(codigos, n, nombre):
+    codigos = np.asarray(codigos, dtype=np.intp)
+    if codigos.size and (codigos.min() < 0 or codigos.max() >= n):
+        raise ValueError(f"Código de {nombre} fuera de rango (0 a {n - 1}).")
+    return codigos
+
+
+def calculate_parameters_many(soil_codes, zone_codes, region_codes):
+    """
+    Calcula los parámetros sísmicos de muchos sitios con una sola consulta a las tablas
     
-    return zona_romana, tipo_suelo, variables['region_var'].get(), r_valor, i_valor
+    Args:
+        soil_codes: Códigos de tipo de suelo (índices en SUELOS)
+        zone_codes: Códigos de zona sísmica (índices en ZONAS)
+        region_codes: Códigos de región (índices en REGIONES)
+        
+    Returns:
+        Tupla con (parametros, eta, Z), donde parametros es un diccionario de
+        arreglos 'Fa', 'Fd', 'Fs' y 'r' con la forma difundida de los códigos
+    """
+    suelo = _validar_codigos(soil_codes, len(SUELOS), "suelo")
+    zona = _validar_codigos(zone_codes, len(ZONAS), "zona")
+    region = _validar_codigos(region_codes, len(REGIONES), "región")
+    suelo, zona, region = np.broadcast_arrays(suelo, zona, region)
+
+    parametros = {
+        'Fa': FA_TABLA[suelo, zona],
+        'Fd': FD_TABLA[suelo, zona],
+        'Fs': FS_TABLA[suelo, zona],
+        'r': R_CAIDA_TABLA[suelo],
+    }
+
+    return parametros, ETA_TABLA[region], Z_TABLA[zona]
+
 
 def calculate_parameters(tipo_suelo, zona_sismica, region):
     """
     Calcula los parámetros sísmicos según el tipo de suelo, zona sísmica y región
     
     Args:
-        tipo_suelo: Tipo de suelo (A, B, C, D, E o F)
+        tipo_suelo: Tipo de suelo (A, B, C, D o E)
         zona_sismica: Zona sísmica (I, II, III, IV, V o VI)
         region: Región (Costa, Sierra, Oriente)
         
     Returns:
         Tupla con (parametros, eta, Z)
     """
-    # Factores de amplificación del suelo según las tablas
-    # Tabla 3: Fa - Coeficiente de amplificación de suelo en la zona de período corto
-    Fa_valores = {
-        'A': {'I': 0.9, 'II': 0.9, 'III': 0.9, 'IV': 0.9, 'V': 0.9, 'VI': 0.9},
-        'B': {'I': 1.0, 'II': 1.0, 'III': 1.0, 'IV': 1.0, 'V': 1.0, 'VI': 1.0},
-        'C': {'I': 1.4, 'II': 1.3, 'III': 1.25, 'IV': 1.23, 'V': 1.2, 'VI': 1.18},
-        'D': {'I': 1.6, 'II': 1.4, 'III': 1.3, 'IV': 1.25, 'V': 1.2, 'VI': 1.12},
-        'E': {'I': 1.8, 'II': 1.4, 'III': 1.25, 'IV': 1.1, 'V': 1.0, 'VI': 0.85}
-    }
+    parametros, eta, Z = calculate_parameters_many(
+        SUELO_CODIGOS[tipo_suelo], ZONA_CODIGOS[zona_sismica], REGION_CODIGOS[region]
+    )
+    return {clave: valor.item() for clave, valor in parametros.items()}, eta.item(), Z.item()
+
+
+def _potencia_caida(Tc, r, T, dtype):
+    """
+    Evalúa (Tc / T)**r para cada caso sobre la malla de períodos
     
-    # Tabla 4: Fd - Amplificación de las ordenadas del espectro elástico de respuesta de desplazamientos
-    Fd_valores = {
-        'A': {'I': 0.9, 'II': 0.9, 'III': 0.9, 'IV': 0.9, 'V': 0.9, 'VI': 0.9},
-        'B': {'I': 1.0, 'II': 1.0, 'III': 1.0, 'IV': 1.0, 'V': 1.0, 'VI': 1.0},
-        'C': {'I': 1.36, 'II': 1.28, 'III': 1.19, 'IV': 1.15, 'V': 1.11, 'VI': 1.06},
-        'D': {'I': 1.62, 'II': 1.45, 'III': 1.36, 'IV': 1.28, 'V': 1.19, 'VI': 1.11},
-        'E': {'I': 2.1, 'II': 1.75, 'III': 1.7, 'IV': 1.65, 'V': 1.6, 'VI': 1.5}
-    }
+    La potencia vectorizada de NumPy puede usar rutinas SIMD que difieren en el
+    último bit de la potencia escalar, por lo que para float64 se evalúa una fila
+    por cada par (Tc, r) distinto con la misma potencia escalar del cálculo
+    original. Las tablas NEC solo producen unas pocas decenas de pares.
     
-    # Tabla 5: Fs - Comportamiento no lineal de los suelos
-    Fs_valores = {
-        'A': {'I': 0.75, 'II': 0.75, 'III': 0.75, 'IV': 0.75, 'V': 0.75, 'VI': 0.75},
-        'B': {'I': 0.75, 'II': 0.75, 'III': 0.75, 'IV': 0.75, 'V': 0.75, 'VI': 0.75},
-        'C': {'I': 0.85, 'II': 0.94, 'III': 1.02, 'IV': 1.06, 'V': 1.11, 'VI': 1.23},
-        'D': {'I': 1.02, 'II': 1.06, 'III': 1.11, 'IV': 1.19, 'V': 1.28, 'VI': 1.40},
-        'E': {'I': 1.5, 'II': 1.6, 'III': 1.7, 'IV': 1.8, 'V': 1.9, 'VI': 2.0}
-    }
+    Returns:
+        Arreglo con forma (n_casos, n_periodos)
+    """
+    with np.errstate(divide='ignore'):
+        if dtype != np.float64:
+            return np.power(Tc[:, None] / T, r[:, None])
+
+        pares, inversa = np.unique(np.stack((Tc, r), axis=1), axis=0, return_inverse=True)
+        filas = np.empty((len(pares), T.size), dtype=dtype)
+        for k, (tc, rk) in enumerate(pares):
+            base = tc / T
+            if rk == 1:
+                filas[k] = base
+            else:
+                filas[k] = [b ** rk for b in base.tolist()]
+    return filas[inversa.reshape(-1)]
+
+
+def calculate_spectrum_many(Z, Fa, Fd, Fs, eta, R, I, phi_P, phi_E, r=1, T=None, out=None, dtype=np.float64):
+    """
+    Calcula el espectro sísmico de diseño para varios juegos de parámetros a la vez
     
-    # Valores de r (factor de control de caída del espectro)
-    r_valores = {
-        'A': 1,
-        'B': 1,
-        'C': 1,
-        'D': 1,
-        'E': 1.5
-    }
+    Todos los factores aceptan escalares o arreglos 1-D que se difunden a una
+    longitud común n_casos. El cálculo no tiene ramas por muestra: cada tramo del
+    espectro se evalúa sobre toda la malla y se combina con máscaras.
     
-    # Obtener valores específicos para el tipo de suelo y zona sísmica
-    Fa = Fa_valores[tipo_suelo][zona_sismica]
-    Fd = Fd_valores[tipo_suelo][zona_sismica]
-    Fs = Fs_valores[tipo_suelo][zona_sismica]
-    r = r_valores[tipo_suelo]
+    Args:
+        Z, Fa, Fd, Fs, eta, R, I, phi_P, phi_E, r: Igual que en calculate_spectrum
+        T: Malla de períodos (por defecto 1000 puntos entre 0 y 6 s)
+        out: Tupla opcional (Sa, Se, Si) de arreglos (n_casos, n_periodos) a reutilizar
+        dtype: np.float64 (idéntico bit a bit a calculate_spectrum) o np.float32
+        
+    Returns:
+        Tupla con (T, Sa, Se, Si, T0, Tc, TL); Sa, Se y Si con forma
+        (n_casos, n_periodos) y T0, Tc, TL con forma (n_casos,)
+    """
+    dtype = np.dtype(dtype)
+    Z, Fa, Fd, Fs, eta, R, I, phi_P, phi_E, r = np.broadcast_arrays(
+        *(np.atleast_1d(np.asarray(v, dtype=dtype)) for v in (Z, Fa, Fd, Fs, eta, R, I, phi_P, phi_E, r))
+    )
+    if Z.ndim != 1:
+        raise ValueError("Los parámetros deben ser escalares o arreglos 1-D.")
+
+    if T is None:
+        T = uniform_grid()  # Rango de periodos de 0 a 6 segundos
+    T = np.asarray(T, dtype=dtype)
+    forma = (Z.size, T.size)
+
+    if out is None:
+        Sa, Se, Si = (np.empty(forma, dtype=dtype) for _ in range(3))
+    else:
+        Sa, Se, Si = out
+        for buffer in (Sa, Se, Si):
+            if buffer.shape != forma or buffer.dtype != dtype:
+                raise ValueError(f"Los buffers de salida deben tener forma {forma} y tipo {dtype}.")
+
+    # Calcular períodos característicos
+    T0, Tc, TL = characteristic_periods(Fa, Fd, Fs)
+
+    _aceleracion_elastica(Z, Fa, eta, T0, Tc, r, T, dtype, Sa)
+    np.copyto(Se, Sa)
+    np.multiply(I[:, None], Sa, out=Si)
+    np.divide(Si, (R * phi_P * phi_E)[:, None], out=Si)
+
+    return T, Sa, Se, Si, T0, Tc, TL
+
+
+def _aceleracion_elastica(Z, Fa, eta, T0, Tc, r, T, dtype, Sa):
+    # Columnas (n_casos, 1) para difundir contra la malla de períodos
+    Zc, Fac, etac, T0c, Tcc = Z[:, None], Fa[:, None], eta[:, None], T0[:, None], Tc[:, None]
+
+    # Tramo descendente en todo el dominio; luego se sobrescriben meseta y rampa
+    np.multiply((eta * Z * Fa)[:, None], _potencia_caida(Tc, r, T, dtype), out=Sa)
+    np.copyto(Sa, etac * Zc * Fac, where=T <= Tcc)
+    np.copyto(Sa, Zc * Fac * (1 + (etac - 1) * T / T0c), where=T <= T0c)
+    return Sa
+
+
+def spectral_acceleration_many(Z, Fa, Fd, Fs, eta, r, T):
+    """
+    Evalúa Sa caso por caso, cada uno en su propio período (sin malla común)
+
+    Args:
+        Z, Fa, Fd, Fs, eta, r: Factores de cada caso (escalares o arreglos 1-D)
+        T: Período de cada caso (s)
+
+    Returns:
+        Arreglo Sa (g) con la forma difundida de los argumentos
+    """
+    Z, Fa, Fd, Fs, eta, r, T = np.broadcast_arrays(
+        *(np.asarray(v, dtype=np.float64) for v in (Z, Fa, Fd, Fs, eta, r, T))
+    )
+    T0, Tc, _ = characteristic_periods(Fa, Fd, Fs)
+    with np.errstate(divide='ignore'):
+        Sa = eta * Z * Fa * np.power(Tc / T, r)
+    np.copyto(Sa, eta * Z * Fa, where=T <= Tc)
+    np.copyto(Sa, Z * Fa * (1 + (eta - 1) * T / T0), where=T <= T0)
+    return Sa
+
+
+def characteristic_periods(Fa, Fd, Fs):
+    """
+    Calcula los períodos característicos del espectro
     
-    # Crear el diccionario de parámetros
-    parametros = {
-        'Fa': Fa,
-        'Fd': Fd,
-        'Fs': Fs,
-        'r': r
-    }
+    Returns:
+        Tupla con (T0, Tc, TL)
+    """
+    return 0.1 * Fs * Fd / Fa, 0.55 * Fs * Fd / Fa, 2.4 * Fd
 
-    eta_zona = {
-        'Costa (Excepto Esmeralda)': 1.8,
-        'Sierra, Esmeralda y Galapagos': 2.48,
-        'Oriente': 2.60
-    }
 
-    Z_valores = {
-        'I': 0.15, 'II': 0.25, 'III': 0.30,
-        'IV': 0.35, 'V': 0.40, 'VI': 0.50
-    }
+@functools.lru_cache(maxsize=8)
+def uniform_grid(t_max=T_MAX, n=N_PERIODOS):
+    """
+    Malla uniforme de n períodos entre 0 y t_max, compartida y de solo lectura
+
+    Todos los espectros con la misma malla reciben el mismo arreglo, sin copiarlo.
+    """
+    T = np.linspace(0, t_max, n)
+    T.setflags(write=False)
+    return T
 
-    return parametros, eta_zona[region], Z_valores[zona_sismica]
 
-def calculate_spectrum(Z, Fa, Fd, Fs, eta, R, I, phi_P, phi_E, r=1):
+def period_grid(T0, Tc, TL, t_max=T_MAX, n=N_PERIODOS):
+    """
+    Malla uniforme de n períodos entre 0 y t_max que además contiene T0, Tc y TL exactos
+    
+    Returns:
+        Arreglo ordenado de períodos (hasta n + 3 puntos)
+    """
+    puntos = [T for T in (T0, Tc, TL) if 0 < T < t_max]
+    return np.union1d(np.linspace(0, t_max, n), puntos)
+
+
+def adaptive_period_grid(T0, Tc, TL, pico, r=1, tol=1e-3, t_max=T_MAX):
+    """
+    Malla mínima de períodos cuya interpolación lineal reproduce el espectro con error <= tol
+    
+    La rampa [0, T0] y la meseta [T0, Tc] son lineales, así que bastan sus
+    extremos. En la caída pico·(Tc/T)^r el error de interpolación en [a, b] está
+    acotado por (b - a)²/8 · |f''(a)|, porque |f''| decrece con T; el paso se
+    elige para que esa cota no supere tol.
+    
+    Args:
+        T0, Tc, TL: Períodos característicos (se incluyen exactamente)
+        pico: Ordenada de la meseta de la curva a muestrear (g)
+        r: Exponente de caída del espectro
+        tol: Error de interpolación máximo admitido (g)
+        t_max: Período máximo de la malla
+        
+    Returns:
+        Arreglo ordenado de períodos
+    """
+    if tol <= 0:
+        raise ValueError("La tolerancia debe ser mayor que cero.")
+
+    puntos = [0.0, *(T for T in (T0, Tc) if 0 < T < t_max)]
+    limites = sorted({T for T in (TL, t_max) if Tc < T <= t_max})
+    a = max(Tc, 0.0)
+    for limite in limites:
+        while a < limite:
+            segunda_derivada = pico * r * (r + 1) * Tc ** r * a ** -(r + 2)
+            a = min(a + math.sqrt(8 * tol / segunda_derivada), limite)
+            puntos.append(a)
+    puntos.append(t_max)
+    return np.unique(np.asarray(puntos, dtype=np.float64))
+
+
+def spectrum_grid(Z, Fa, Fd, Fs, eta, R, I, phi_P, phi_E, r=1, muestreo='uniforme', t_max=T_MAX, n=N_PERIODOS,
+                  tol=1e-3):
+    """
+    Malla de períodos que usa calculate_spectrum con las mismas opciones de muestreo
+    
+    Returns:
+        Arreglo ordenado de períodos
+    """
+    if muestreo == 'uniforme':
+        T = uniform_grid(t_max, n)
+    else:
+        T0, Tc, TL = characteristic_periods(Fa, Fd, Fs)
+        if muestreo == 'caracteristico':
+            T = period_grid(T0, Tc, TL, t_max, n)
+        elif muestreo == 'adaptativo':
+            pico = eta * Z * Fa * max(1.0, I / (R * phi_P * phi_E))
+            T = adaptive_period_grid(T0, Tc, TL, pico, r, tol, t_max)
+        else:
+            raise ValueError(f"Muestreo no reconocido: {muestreo!r}")
+    return T
+
+
+def calculate_spectrum(Z, Fa, Fd, Fs, eta, R, I, phi_P, phi_E, r=1, muestreo='uniforme', t_max=T_MAX,
+                       n=N_PERIODOS, tol=1e-3):
     """
     Calcula el espectro sísmico de diseño
     
@@ -117,32 +390,211 @@ def calculate_spectrum(Z, Fa, Fd, Fs, eta, R, I, phi_P, phi_E, r=1):
         phi_P: Factor de configuración en planta
         phi_E: Factor de configuración en elevación
         r: Exponente que controla la caída del espectro (por defecto 1)
+        muestreo: Malla de períodos: 'uniforme' (n puntos entre 0 y t_max),
+            'caracteristico' (la uniforme más T0, Tc y TL exactos) o
+            'adaptativo' (mínima que cumple el error de interpolación tol en Sa y Si)
+        t_max: Período máximo (s)
+        n: Número de puntos de las mallas uniforme y característica
+        tol: Error de interpolación máximo (g) del muestreo adaptativo
         
     Returns:
-        Tupla con (T, Sa, Se, Si, T0, Tc, TL)
+        SpectrumResult, que se desempaqueta como la tupla (T, Sa, Se, Si, T0, Tc, TL)
     """
-    # Calcular períodos característicos
-    T0 = 0.1 * Fs * Fd / Fa
-    Tc = 0.55 * Fs * Fd / Fa
-    TL = 2.4 * Fd
-    
-    # Generar el espectro
-    T = np.linspace(0, 6, 1000)  # Rango de periodos de 0 a 6 segundos
-    Sa = np.zeros_like(T)
-    Se = np.zeros_like(T)
-    Si = np.zeros_like(T)
-
-    for i, t in enumerate(T):
-        if t == 0:
-            Sa[i] = Z*Fa
-        elif t <= T0:
-            Sa[i] = Z * Fa * (1 + (eta - 1) * t / T0)
-        elif T0 < t <= Tc:
-            Sa[i] = eta * Z * Fa
-        else:
-            Sa[i] = eta * Z * Fa * (Tc / t)**r 
+    T = spectrum_grid(Z, Fa, Fd, Fs, eta, R, I, phi_P, phi_E, r, muestreo, t_max, n, tol)
+    return SpectrumResult.compute(T, Z, Fa, Fd, Fs, eta, R, I, phi_P, phi_E, r)
+
+
+def _solo_lectura(arreglo):
+    # Vista de solo lectura, sin cambiar las banderas del arreglo de quien llama
+    if arreglo is None or not arreglo.flags.writeable:
+        return arreglo
+    vista = arreglo.view()
+    vista.setflags(write=False)
+    return vista
+
+
+class SpectrumResult:
+    """
+    Espectro calculado sobre una malla de períodos, junto con sus factores
+
+    Guarda solo T (la malla compartida de uniform_grid cuando es la uniforme) y
+    Sa; Se es el mismo arreglo que Sa y Si, Sd y Sv se calculan al pedirlos por
+    primera vez. Los arreglos son de solo lectura. Se desempaqueta e indexa
+    como la tupla (T, Sa, Se, Si, T0, Tc, TL) que devolvía calculate_spectrum.
+
+    Atributos:
+        T, Sa, Se, Si: Malla de períodos (s) y ordenadas espectrales (g)
+        Sd, Sv: Desplazamiento (m) y pseudovelocidad (m/s) espectrales elásticos
+        T0, Tc, TL: Períodos característicos
+        Z, Fa, Fd, Fs, eta, R, I, phi_P, phi_E, r: Factores del espectro
+    """
+
+    __slots__ = ('T', 'Sa', 'T0', 'Tc', 'TL', 'Z', 'Fa', 'Fd', 'Fs', 'eta', 'R', 'I', 'phi_P', 'phi_E', 'r',
+                 '_Si', '_Sd', '_Sv')
+
+    def __init__(self, T, Sa, Z, Fa, Fd, Fs, eta, R, I, phi_P, phi_E, r=1, Si=None):
+        self.T, self.Sa, self._Si = _solo_lectura(T), _solo_lectura(Sa), _solo_lectura(Si)
+        self._Sd = self._Sv = None
+        self.Z, self.Fa, self.Fd, self.Fs, self.eta = float(Z), float(Fa), float(Fd), float(Fs), float(eta)
+        self.R, self.I, self.phi_P, self.phi_E, self.r = float(R), float(I), float(phi_P), float(phi_E), float(r)
+        self.T0, self.Tc, self.TL = (float(t) for t in characteristic_periods(self.Fa, self.Fd, self.Fs))
+
+    @classmethod
+    def compute(cls, T, Z, Fa, Fd, Fs, eta, R, I, phi_P, phi_E, r=1):
+        """Calcula Sa sobre la malla T con las mismas operaciones que calculate_spectrum_many."""
+        T = np.asarray(T, dtype=np.float64)
+        Z, Fa, Fd, Fs, eta, r = (np.array([v], dtype=np.float64) for v in (Z, Fa, Fd, Fs, eta, r))
+        T0, Tc, _ = characteristic_periods(Fa, Fd, Fs)
+        Sa = _aceleracion_elastica(Z, Fa, eta, T0, Tc, r, T, np.float64, np.empty((1, T.size)))[0]
+        return cls(T, Sa, Z[0], Fa[0], Fd[0], Fs[0], eta[0], R, I, phi_P, phi_E, r[0])
+
+    @property
+    def Se(self):
+        return self.Sa
+
+    @property
+    def Si(self):
+        if self._Si is None:
+            Si = np.multiply(self.I, self.Sa)
+            np.divide(Si, self.R * self.phi_P * self.phi_E, out=Si)
+            self._Si = _solo_lectura(Si)
+        return self._Si
+
+    @property
+    def Sd(self):
+        if self._Sd is None:
+            self._Sd = _solo_lectura(self.Sa * GRAVEDAD * (self.T / (2 * np.pi)) ** 2)
+        return self._Sd
+
+    @property
+    def Sv(self):
+        if self._Sv is None:
+            self._Sv = _solo_lectura(self.Sa * GRAVEDAD * self.T / (2 * np.pi))
+        return self._Sv
+
+    def __iter__(self):
+        return iter((self.T, self.Sa, self.Sa, self.Si, self.T0, self.Tc, self.TL))
+
+    def __len__(self):
+        return 7
+
+    def __getitem__(self, k):
+        return tuple(self)[k]
+
+    @property
+    def nbytes(self):
+        """Bytes propios del resultado: Sa y las columnas ya calculadas (sin la malla compartida)."""
+        return sum(a.nbytes for a in (self.Sa, self._Si, self._Sd, self._Sv) if a is not None)
 
-        Se[i] = Sa[i]
-        Si[i] = (I * Sa[i]) / (R * phi_P * phi_E)
+    def __repr__(self):
+        return (f"SpectrumResult(n_periodos={self.T.size}, Z={self.Z}, Fa={self.Fa}, Fd={self.Fd}, Fs={self.Fs}, "
+                f"eta={self.eta}, R={self.R}, I={self.I}, phi_P={self.phi_P}, phi_E={self.phi_E}, r={self.r})")
+
+
+class DesignSpectrum:
+    """
+    Espectro de diseño evaluado en forma cerrada, sin malla de períodos
     
-    return T, Sa, Se, Si, T0, Tc, TL
\ No newline at end of file
+    Evalúa Sa, Se y Si en cualquier período o arreglo de períodos con las mismas
+    fórmulas y el mismo orden de operaciones que calculate_spectrum_many. Los
+    escalares, y los arreglos cuando r = 1, dan el mismo resultado bit a bit que
+    la malla; con r ≠ 1 los arreglos usan la potencia vectorizada de NumPy (error
+    de hasta 1 ulp en la caída) salvo que se pida exacto=True.
+    
+    Atributos:
+        Z, Fa, Fd, Fs, eta, R, I, phi_P, phi_E, r: Factores del espectro
+        T0, Tc, TL: Períodos característicos
+    """
+
+    __slots__ = ('Z', 'Fa', 'Fd', 'Fs', 'eta', 'R', 'I', 'phi_P', 'phi_E', 'r', 'T0', 'Tc', 'TL',
+                 '_pico', '_base', '_reduccion')
+
+    def __init__(self, Z, Fa, Fd, Fs, eta, R=1, I=1, phi_P=1, phi_E=1, r=1):
+        if min(R, I, phi_P, phi_E) <= 0:
+            raise ValueError("Los factores R, I, ØP y ØE deben ser mayores que cero.")
+        self.Z, self.Fa, self.Fd, self.Fs, self.eta = float(Z), float(Fa), float(Fd), float(Fs), float(eta)
+        self.R, self.I, self.phi_P, self.phi_E, self.r = float(R), float(I), float(phi_P), float(phi_E), float(r)
+        self.T0, self.Tc, self.TL = characteristic_periods(self.Fa, self.Fd, self.Fs)
+        self._pico = self.eta * self.Z * self.Fa
+        self._base = self.Z * self.Fa
+        self._reduccion = self.R * self.phi_P * self.phi_E
+
+    @classmethod
+    def from_parameters(cls, parametros, eta, Z, R=1, I=1, phi_P=1, phi_E=1):
+        """
+        Crea el espectro a partir del resultado de calculate_parameters
+        
+        Args:
+            parametros, eta, Z: Tupla devuelta por calculate_parameters
+            R, I, phi_P, phi_E: Factores de la estructura
+        """
+        return cls(Z, parametros['Fa'], parametros['Fd'], parametros['Fs'], eta, R, I, phi_P, phi_E,
+                   parametros['r'])
+
+    @classmethod
+    def from_labels(cls, tipo_suelo, zona_sismica, region, R=1, I=1, phi_P=1, phi_E=1):
+        """Crea el espectro a partir de las etiquetas de suelo, zona y región de la interfaz."""
+        return cls.from_parameters(*calculate_parameters(tipo_suelo, zona_sismica, region), R, I, phi_P, phi_E)
+
+    def _sa_escalar(self, T):
+        if T <= self.T0:
+            return self._base * (1 + (self.eta - 1) * T / self.T0)
+        if T <= self.Tc:
+            return self._pico
+        return self._pico * (self.Tc / T if self.r == 1 else (self.Tc / T) ** self.r)
+
+    def sa(self, T, exacto=False):
+        """
+        Aceleración espectral elástica Sa (g)
+        
+        Args:
+            T: Período (s) escalar o arreglo de cualquier forma
+            exacto: Si es True, la caída con r ≠ 1 se evalúa con la potencia
+                escalar, idéntica bit a bit a calculate_spectrum (más lento)
+            
+        Returns:
+            float si T es escalar; si no, arreglo con la forma de T
+        """
+        if np.ndim(T) == 0:
+            return self._sa_escalar(float(T))
+
+        T = np.asarray(T, dtype=np.float64)
+        plano = T.reshape(-1)
+        Sa = np.full(plano.shape, self._pico)
+        caida = plano > self.Tc
+        if caida.any():
+            if self.r == 1:
+                potencia = self.Tc / plano[caida]
+            elif exacto:
+                potencia = _potencia_caida(np.array([self.Tc]), np.array([self.r]), plano[caida], np.float64)[0]
+            else:
+                potencia = np.power(self.Tc / plano[caida], self.r)
+            Sa[caida] = self._pico * potencia
+        rampa = plano <= self.T0
+        if rampa.any():
+            Sa[rampa] = self._base * (1 + (self.eta - 1) * plano[rampa] / self.T0)
+        return Sa.reshape(T.shape)
+
+    def se(self, T, exacto=False):
+        """Aceleración espectral elástica Se (g); en la NEC coincide con Sa."""
+        return self.sa(T, exacto)
+
+    def si(self, T, exacto=False):
+        """Aceleración espectral inelástica Si = I·Sa / (R·ØP·ØE) (g)."""
+        return self.I * self.sa(T, exacto) / self._reduccion
+
+    __call__ = sa
+
+    def evaluate(self, T, exacto=False):
+        """
+        Evalúa las tres ordenadas a la vez
+        
+        Returns:
+            Tupla con (Sa, Se, Si), con la forma de T
+        """
+        Sa = self.sa(T, exacto)
+        return Sa, Sa, self.I * Sa / self._reduccion
+
+    def __repr__(self):
+        return (f"DesignSpectrum(Z={self.Z}, Fa={self.Fa}, Fd={self.Fd}, Fs={self.Fs}, eta={self.eta}, "
+                f"R={self.R}, I={self.I}, phi_P={self.phi_P}, phi_E={self.phi_E}, r={self.r})")
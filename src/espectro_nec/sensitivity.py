@@ -0,0 +1,264 @@
+"""Barridos de sensibilidad de Si sobre R, I, ØP, ØE y las etiquetas del sitio (subcomando ``espectro-nec barrido``)."""
+
+import csv
+import sys
+import time
+
+import numpy as np
+
+from .constants import FACTOR_I_OPTIONS, FACTOR_R_OPTIONS
+from .seismic_calculations import (
+    REGIONES,
+    REGION_CODIGOS,
+    SUELOS,
+    SUELO_CODIGOS,
+    ZONAS,
+    ZONA_CODIGOS,
+    calculate_parameters_many,
+    calculate_spectrum_many,
+    encode_labels,
+)
+from .export_utilities import _avance
+from .instrumentation import span
+
+# Ejes del barrido en el orden de las dimensiones de los resultados
+EJES = ('suelo', 'zona', 'region', 'R', 'I', 'phi_p', 'phi_e')
+EJES_ETIQUETA = {'suelo': (SUELOS, SUELO_CODIGOS), 'zona': (ZONAS, ZONA_CODIGOS), 'region': (REGIONES, REGION_CODIGOS)}
+NOMBRES_EJES = {'suelo': 'Tipo de suelo', 'zona': 'Zona sísmica', 'region': 'Región', 'R': 'Factor R',
+                'I': 'Factor I', 'phi_p': 'Factor ØP', 'phi_e': 'Factor ØE'}
+
+# Valores de los menús de la aplicación y rango por defecto de ØP y ØE
+VALORES_R = tuple(float(opcion.split(' ')[0]) for opcion in FACTOR_R_OPTIONS)
+VALORES_I = tuple(float(opcion.split(' ')[0]) for opcion in FACTOR_I_OPTIONS)
+VALORES_PHI = tuple(np.round(np.linspace(0.82, 1.0, 10), 2).tolist())
+
+PERIODOS_BARRIDO = (0.2, 0.5, 1.0, 2.0)
+
+
+def parse_axis(texto, etiquetas=None):
+    """
+    Interpreta los valores de un eje escritos en la línea de comandos
+
+    Acepta una lista separada por comas ('8,6,5'), un rango 'inicio:fin:n'
+    con n valores equiespaciados ('0.8:1:5') o, en los ejes de etiquetas,
+    'todos'.
+
+    Args:
+        etiquetas: Etiquetas válidas si el eje es de suelo, zona o región
+
+    Returns:
+        Tupla de valores (cadenas en los ejes de etiquetas, float en los demás)
+    """
+    texto = str(texto).strip()
+    if etiquetas is not None:
+        if texto.lower() == 'todos':
+            return tuple(etiquetas)
+        return tuple(valor.strip() for valor in texto.split(',') if valor.strip())
+    if texto.count(':') == 2:
+        inicio, fin, n = texto.split(':')
+        return tuple(np.linspace(float(inicio), float(fin), int(n)).tolist())
+    return tuple(float(valor) for valor in texto.split(',') if valor.strip())
+
+
+def _valores_eje(eje, valores):
+    if isinstance(valores, (str, int, float)):
+        valores = (valores,)
+    if eje in EJES_ETIQUETA:
+        valores = tuple(str(v) for v in valores)
+        codigos = EJES_ETIQUETA[eje][1]
+        desconocidos = [v for v in valores if v not in codigos]
+        if desconocidos:
+            raise ValueError(f"Valor de {NOMBRES_EJES[eje].lower()} no reconocido: {desconocidos[0]!r}")
+        return np.asarray(valores)
+    valores = np.asarray(valores, dtype=np.float64).reshape(-1)
+    if np.any(valores <= 0):
+        raise ValueError(f"Todos los valores de {NOMBRES_EJES[eje]} deben ser mayores que cero.")
+    return valores
+
+
+def parameter_sweep(suelo='D', zona='V', region=REGIONES[0], R=VALORES_R, I=VALORES_I, phi_p=VALORES_PHI,
+                    phi_e=VALORES_PHI, periodos=PERIODOS_BARRIDO):
+    """
+    Evalúa Si en la malla cartesiana de los valores dados, por difusión
+
+    Sa solo depende del suelo, la zona y la región, así que se calcula una vez
+    por combinación de etiquetas en los períodos pedidos, y Si = I·Sa / (R·ØP·ØE)
+    se forma difundiendo cada eje en su propia dimensión.
+
+    Args:
+        suelo, zona, region: Etiqueta o secuencia de etiquetas
+        R, I, phi_p, phi_e: Valor o secuencia de valores
+        periodos: Períodos (s) en los que se evalúa Si
+
+    Returns:
+        Diccionario con:
+            'ejes': Nombres de los ejes barridos (los de más de un valor), en el orden de EJES
+            'valores': Valores de cada eje barrido
+            'fijos': Valor de cada eje con un único valor
+            'periodos': Arreglo de períodos
+            'Si': Arreglo (*ejes, n_periodos) con Si en cada período
+            'meseta': Arreglo (*ejes) con Si en la meseta (η·Z·Fa·I / (R·ØP·ØE))
+    """
+    entradas = dict(zip(EJES, (suelo, zona, region, R, I, phi_p, phi_e)))
+    valores = {eje: _valores_eje(eje, entradas[eje]) for eje in EJES}
+    periodos = np.atleast_1d(np.asarray(periodos, dtype=np.float64))
+    forma = tuple(valores[eje].size for eje in EJES)
+
+    with span("barrido.espectros", combinaciones=int(np.prod(forma[:3]))):
+        codigos = np.meshgrid(*(encode_labels(valores[eje], EJES_ETIQUETA[eje][1]) for eje in EJES[:3]),
+                              indexing='ij')
+        parametros, eta, Z = calculate_parameters_many(*(c.reshape(-1) for c in codigos))
+        _, Sa, _, _, _, _, _ = calculate_spectrum_many(Z, parametros['Fa'], parametros['Fd'], parametros['Fs'], eta,
+                                                       1.0, 1.0, 1.0, 1.0, parametros['r'], T=periodos)
+        Sa = Sa.reshape(*forma[:3], 1, 1, 1, 1, periodos.size)
+        meseta_Sa = (eta * Z * parametros['Fa']).reshape(*forma[:3], 1, 1, 1, 1)
+
+    with span("barrido.difusion", puntos=int(np.prod(forma))):
+        # Cada factor en su dimensión; el orden de las operaciones es el de calculate_spectrum
+        R_, I_, phi_p_, phi_e_ = (valores[eje].reshape([-1 if k == j else 1 for k in range(len(EJES))])
+                                  for j, eje in enumerate(EJES) if j >= 3)
+        divisor = R_ * phi_p_ * phi_e_
+        Si = I_[..., None] * Sa / divisor[..., None]
+        meseta = I_ * meseta_Sa / divisor
+
+    barridos = tuple(eje for eje in EJES if valores[eje].size > 1)
+    forma_barrido = tuple(valores[eje].size for eje in barridos)
+    return {
+        'ejes': barridos,
+        'valores': {eje: valores[eje] for eje in barridos},
+        'fijos': {eje: valores[eje][0].item() for eje in EJES if eje not in barridos},
+        'periodos': periodos,
+        'Si': Si.reshape(*forma_barrido, periodos.size),
+        'meseta': meseta.reshape(forma_barrido),
+    }
+
+
+def sweep_slice(resultado, x, y, periodo=None, indices=None):
+    """
+    Corte bidimensional de un barrido para dibujarlo
+
+    Args:
+        x, y: Ejes barridos en las abscisas y ordenadas
+        periodo: Índice del período, o None para la meseta
+        indices: Índice fijo de cada uno de los demás ejes barridos (0 por defecto)
+
+    Returns:
+        Arreglo (n_y, n_x)
+    """
+    ejes = resultado['ejes']
+    if x not in ejes or y not in ejes or x == y:
+        raise ValueError(f"Los ejes del gráfico deben ser dos ejes barridos distintos: {', '.join(ejes)}.")
+    datos = resultado['meseta'] if periodo is None else resultado['Si'][..., periodo]
+    indices = indices or {}
+    corte = tuple(slice(None) if eje in (x, y) else indices.get(eje, 0) for eje in ejes)
+    datos = datos[corte]
+    return datos if ejes.index(y) < ejes.index(x) else datos.T
+
+
+def plot_sweep(ax, resultado, x, y, periodo=None, indices=None, contornos=True):
+    """
+    Dibuja un corte del barrido como mapa de calor con curvas de nivel
+
+    Args:
+        ax: Ejes de matplotlib
+        x, y, periodo, indices: Igual que en sweep_slice
+
+    Returns:
+        El mapa de colores (para fig.colorbar)
+    """
+    datos = sweep_slice(resultado, x, y, periodo, indices)
+    coordenadas = []
+    for eje, fijar_ticks in ((x, ax.set_xticks), (y, ax.set_yticks)):
+        valores = resultado['valores'][eje]
+        if eje in EJES_ETIQUETA:
+            # Ejes categóricos: posiciones enteras rotuladas con la etiqueta
+            coordenadas.append(np.arange(valores.size, dtype=np.float64))
+            fijar_ticks(coordenadas[-1], [str(v) for v in valores.tolist()])
+        else:
+            coordenadas.append(valores)
+    mapa = ax.pcolormesh(coordenadas[0], coordenadas[1], datos, shading='nearest', cmap='viridis')
+    # Las curvas de nivel solo tienen sentido entre ejes numéricos
+    if contornos and min(datos.shape) > 1 and x not in EJES_ETIQUETA and y not in EJES_ETIQUETA:
+        curvas = ax.contour(coordenadas[0], coordenadas[1], datos, levels=8, colors='white', linewidths=0.8)
+        ax.clabel(curvas, fmt='%.3f', fontsize=8)
+    ax.set_xlabel(NOMBRES_EJES[x])
+    ax.set_ylabel(NOMBRES_EJES[y])
+    etiqueta = 'meseta' if periodo is None else f"T = {resultado['periodos'][periodo]:g} s"
+    ax.set_title(f"Si (g), {etiqueta}")
+    return mapa
+
+
+def write_sweep(file_path, resultado, progreso=None):
+    """
+    Exporta un barrido en un único archivo
+
+    Con extensión .npz guarda los arreglos N-D ('Si', 'meseta', 'periodos',
+    'eje_<nombre>' y 'ejes'); con cualquier otra, un CSV con una fila por punto
+    de la malla, los valores de los ejes y las columnas Si_T<periodo> y Si_meseta.
+
+    Args:
+        progreso: Callable opcional progreso(fraccion, mensaje), como en las exportaciones
+    """
+    ejes = resultado['ejes']
+    _avance(progreso, 0.0, "Preparando barrido")
+    if str(file_path).lower().endswith('.npz'):
+        np.savez_compressed(
+            file_path, Si=resultado['Si'], meseta=resultado['meseta'], periodos=resultado['periodos'],
+            ejes=np.asarray(ejes), fijos=np.asarray([f"{eje}={valor}" for eje, valor in resultado['fijos'].items()]),
+            **{f"eje_{eje}": resultado['valores'][eje] for eje in ejes},
+        )
+        _avance(progreso, 1.0, "Barrido escrito")
+        return
+
+    indices = np.indices(resultado['meseta'].shape).reshape(len(ejes), -1)
+    columnas = [resultado['valores'][eje][i] for eje, i in zip(ejes, indices)]
+    n_periodos = resultado['periodos'].size
+    datos = np.column_stack([resultado['Si'].reshape(-1, n_periodos), resultado['meseta'].reshape(-1)])
+    _avance(progreso, 0.3, "Escribiendo CSV del barrido")
+    with open(file_path, 'w', newline='', encoding='utf-8') as archivo:
+        writer = csv.writer(archivo)
+        for eje, valor in resultado['fijos'].items():
+            writer.writerow([f"# {eje}={valor}"])
+        writer.writerow([*ejes, *(f"Si_T{t:g}" for t in resultado['periodos'].tolist()), 'Si_meseta'])
+        filas = zip(*(c.tolist() for c in columnas), *datos.T.tolist())
+        writer.writerows(filas)
+    _avance(progreso, 1.0, "Barrido escrito")
+
+
+def add_arguments(parser):
+    parser.add_argument('--suelo', default='D', help="Tipos de suelo: 'D', 'C,D,E' o 'todos'")
+    parser.add_argument('--zona', default='V', help="Zonas sísmicas: 'V', 'IV,V' o 'todos'")
+    parser.add_argument('--region', default=REGIONES[0], help="Regiones separadas por comas o 'todos'")
+    parser.add_argument('--r', default=','.join(f"{v:g}" for v in VALORES_R),
+                        help="Valores de R: lista '8,6,5' o rango 'inicio:fin:n' (por defecto los del menú)")
+    parser.add_argument('--i', default=','.join(f"{v:g}" for v in VALORES_I), help="Valores de I (lista o rango)")
+    parser.add_argument('--phi-p', default='0.82:1:10', help="Valores de ØP (lista o rango)")
+    parser.add_argument('--phi-e', default='0.82:1:10', help="Valores de ØE (lista o rango)")
+    parser.add_argument('--periodos', type=float, nargs='+', default=list(PERIODOS_BARRIDO),
+                        help="Períodos (s) en los que se evalúa Si")
+    parser.add_argument('-o', '--output', required=True, help="Archivo de salida (.npz con arreglos N-D o .csv)")
+    parser.add_argument('--figura', metavar='PNG', help="Guarda además un mapa de calor del barrido")
+    parser.add_argument('--x', default='R', choices=EJES, help="Eje de abscisas de la figura")
+    parser.add_argument('--y', default='phi_p', choices=EJES, help="Eje de ordenadas de la figura")
+
+
+def run(args):
+    inicio = time.perf_counter()
+    resultado = parameter_sweep(
+        parse_axis(args.suelo, SUELOS), parse_axis(args.zona, ZONAS), parse_axis(args.region, REGIONES),
+        parse_axis(args.r), parse_axis(args.i), parse_axis(args.phi_p), parse_axis(args.phi_e), args.periodos,
+    )
+    segundos = time.perf_counter() - inicio
+    write_sweep(args.output, resultado)
+
+    if args.figura:
+        from matplotlib.figure import Figure
+        fig = Figure(figsize=(7, 5.5))
+        ax = fig.add_subplot()
+        fig.colorbar(plot_sweep(ax, resultado, args.x, args.y), ax=ax, label='Si (g)')
+        fig.savefig(args.figura, dpi=150, bbox_inches='tight')
+
+    forma = '×'.join(str(n) for n in resultado['meseta'].shape) or '1'
+    print(f"Barrido {forma} ({', '.join(resultado['ejes']) or 'sin ejes'}) en {segundos * 1000:.1f} ms",
+          file=sys.stderr)
+    return 0
@@ -0,0 +1,520 @@
+"""Servicio HTTP/JSON local del motor de cálculo (subcomando ``espectro-nec serve``)."""
+
+import asyncio
+import hashlib
+import json
+import sys
+import time
+from collections import OrderedDict
+from urllib.parse import parse_qsl, urlsplit
+
+import numpy as np
+
+from .batch import ALIAS_COLUMNAS, compute_block
+from .export_utilities import FORMATOS_EXPORTACION, export_bytes, export_spectrum
+from .seismic_calculations import (
+    N_PERIODOS,
+    REGION_CODIGOS,
+    SUELO_CODIGOS,
+    T_MAX,
+    ZONA_CODIGOS,
+    calculate_parameters_many,
+    characteristic_periods,
+    encode_labels,
+)
+
+
+# Nombres de los campos de SpectrumInput del motor web (apps/web/src/lib/nec-engine.ts)
+CAMPOS_WEB = ('zone', 'region', 'soil', 'rFactor', 'importance', 'phiP', 'phiE')
+NOMBRES_WEB = {columna: web for web, columna in ALIAS_COLUMNAS.items()}
+
+MAX_CUERPO = 8 * 1024 * 1024
+MAX_ENCABEZADOS = 64 * 1024
+
+ESTADOS = {
+    200: "OK", 204: "No Content", 304: "Not Modified", 400: "Bad Request", 404: "Not Found",
+    405: "Method Not Allowed", 413: "Payload Too Large", 500: "Internal Server Error",
+}
+
+
+class ServiceError(Exception):
+    """Error de la petición que se responde con el código HTTP indicado."""
+
+    def __init__(self, mensaje, estado=400):
+        super().__init__(mensaje)
+        self.estado = estado
+
+
+class ResponseCache:
+    """
+    Caché LRU de respuestas JSON ya serializadas, acotada en bytes
+
+    Los resultados son deterministas, así que la clave (hash de la entrada
+    normalizada) sirve también como ETag.
+    """
+
+    def __init__(self, max_bytes=128 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._datos = OrderedDict()
+
+    def get(self, clave):
+        valor = self._datos.get(clave)
+        if valor is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._datos.move_to_end(clave)
+        return valor
+
+    def put(self, clave, valor):
+        if len(valor) > self.max_bytes:
+            return
+        anterior = self._datos.pop(clave, None)
+        if anterior is not None:
+            self.bytes -= len(anterior)
+        self._datos[clave] = valor
+        self.bytes += len(valor)
+        while self.bytes > self.max_bytes:
+            _, descartado = self._datos.popitem(last=False)
+            self.bytes -= len(descartado)
+
+    def stats(self):
+        return {'entradas': len(self._datos), 'bytes': self.bytes, 'hits': self.hits, 'misses': self.misses}
+
+
+def normalize_input(datos):
+    """
+    Normaliza un SpectrumInput (nombres web o de batch) a la tupla canónica
+
+    Returns:
+        Tupla (zona, suelo, region, R, I, phi_P, phi_E) con los factores como float
+
+    Raises:
+        ValueError: Si falta un campo, un valor no está en las tablas o un factor no es positivo
+    """
+    if not isinstance(datos, dict):
+        raise ValueError("Cada entrada debe ser un objeto JSON.")
+    datos = {ALIAS_COLUMNAS.get(clave, clave): valor for clave, valor in datos.items()}
+    try:
+        zona, suelo, region = str(datos['zona_sismica']), str(datos['tipo_suelo']), str(datos['region'])
+        r_valor, i_valor = float(datos['r']), float(datos['i'])
+        phi_p, phi_e = float(datos.get('phi_p', 1.0)), float(datos.get('phi_e', 1.0))
+    except KeyError as e:
+        raise ValueError(f"Falta el campo {NOMBRES_WEB.get(e.args[0], e.args[0])!r}.") from None
+    except (TypeError, ValueError):
+        raise ValueError("Los factores R, I, φP y φE deben ser numéricos.") from None
+    for valor, codigos, nombre in ((suelo, SUELO_CODIGOS, 'tipo de suelo'),
+                                   (zona, ZONA_CODIGOS, 'zona sísmica'),
+                                   (region, REGION_CODIGOS, 'región')):
+        if valor not in codigos:
+            raise ValueError(f"Valor de {nombre} no reconocido: {valor!r}")
+    if min(r_valor, i_valor, phi_p, phi_e) <= 0:
+        raise ValueError("Todos los factores deben ser mayores que cero.")
+    return zona, suelo, region, r_valor, i_valor, phi_p, phi_e
+
+
+def input_key(entrada, prefijo=''):
+    """Hash estable de una entrada normalizada (se usa como clave de caché y ETag)."""
+    return hashlib.sha256(json.dumps([prefijo, *entrada]).encode()).hexdigest()[:32]
+
+
+def _input_web(entrada):
+    zona, suelo, region, r_valor, i_valor, phi_p, phi_e = entrada
+    return dict(zip(CAMPOS_WEB, (zona, region, suelo, r_valor, i_valor, phi_p, phi_e)))
+
+
+def _prefijos_periodos(T):
+    # El texto de cada período es común a todos los espectros de la misma malla
+    return [f'{{"period":{t!r},"sa":' for t in T]
+
+
+def _puntos_json(prefijos, Sa, Si):
+    # repr de float es JSON válido y reproduce el valor exacto; Se es igual a Sa
+    return ','.join(f'{p}{sa},"se":{sa},"si":{si}}}'
+                    for p, sa, si in zip(prefijos, map(repr, Sa), map(repr, Si)))
+
+
+def compute_spectra(entradas, T=None):
+    """
+    Calcula varias entradas normalizadas y las serializa con la forma SpectrumResult
+
+    Args:
+        entradas: Lista de tuplas devueltas por normalize_input
+        T: Malla de períodos (por defecto la de calculate_spectrum_many)
+
+    Returns:
+        Lista de bytes JSON, uno por entrada y en el mismo orden
+    """
+    filas = [dict(zip(('zona_sismica', 'tipo_suelo', 'region', 'r', 'i', 'phi_p', 'phi_e'), entrada))
+             for entrada in entradas]
+    bloque = compute_block(filas, T)
+    if bloque['errores']:
+        raise ValueError(bloque['errores'][0][1])
+
+    prefijos = _prefijos_periodos(bloque['T'].tolist())
+    escalares = np.column_stack([bloque[c] for c in ('Z', 'eta', 'Fa', 'Fd', 'Fs', 'r', 'T0', 'Tc', 'TL')]).tolist()
+    respuestas = []
+    for k, entrada in enumerate(entradas):
+        cabecera = dict(zip(('z', 'eta', 'fa', 'fd', 'fs', 'falloff', 't0', 'tc', 'tl'), escalares[k]))
+        cabecera = json.dumps({'input': _input_web(entrada), **cabecera}, ensure_ascii=False)
+        puntos = _puntos_json(prefijos, bloque['Sa'][k].tolist(), bloque['Si'][k].tolist())
+        respuestas.append(f'{cabecera[:-1]},"points":[{puntos}]}}'.encode())
+    return respuestas
+
+
+def compute_parameters(entradas):
+    """
+    Parámetros sísmicos (sin malla de períodos) de entradas (zona, suelo, región)
+
+    Returns:
+        Lista de diccionarios con z, eta, fa, fd, fs, falloff, t0, tc y tl
+    """
+    zona, suelo, region = zip(*entradas)
+    parametros, eta, Z = calculate_parameters_many(
+        encode_labels(suelo, SUELO_CODIGOS), encode_labels(zona, ZONA_CODIGOS), encode_labels(region, REGION_CODIGOS)
+    )
+    T0, Tc, TL = characteristic_periods(parametros['Fa'], parametros['Fd'], parametros['Fs'])
+    columnas = (Z, eta, parametros['Fa'], parametros['Fd'], parametros['Fs'], parametros['r'], T0, Tc, TL)
+    return [dict(zip(('z', 'eta', 'fa', 'fd', 'fs', 'falloff', 't0', 'tc', 'tl'), fila))
+            for fila in np.column_stack(columnas).tolist()]
+
+
+def export_document(entrada, formato, T=None):
+    """
+    Calcula una entrada normalizada y la exporta en memoria
+
+    Args:
+        formato: Clave de FORMATOS_EXPORTACION ('etabs', 'xlsx', 'pdf', 'png' o 'svg')
+
+    Returns:
+        memoryview con el documento
+    """
+    fila = dict(zip(('zona_sismica', 'tipo_suelo', 'region', 'r', 'i', 'phi_p', 'phi_e'), entrada))
+    bloque = compute_block([fila], T)
+    if bloque['errores']:
+        raise ValueError(bloque['errores'][0][1])
+    Sa, Si = bloque['Sa'][0], bloque['Si'][0]
+    return export_bytes(export_spectrum, formato, bloque['T'], Sa, Sa, Si, *entrada)
+
+
+def _etag_coincide(etag, if_none_match):
+    """Indica si etag figura en la lista de If-None-Match (comparación débil, admite W/ y *)."""
+    etiquetas = [etiqueta.strip() for etiqueta in if_none_match.split(',')]
+    return '*' in etiquetas or etag in (etiqueta.removeprefix('W/') for etiqueta in etiquetas)
+
+
+class SpectrumService:
+    """
+    Servidor HTTP/1.1 mínimo sobre asyncio con conexiones persistentes
+
+    Rutas:
+        GET  /health       Estado y contadores de la caché
+        GET  /parameters   ?zone=&soil=&region= -> parámetros sísmicos
+        POST /parameters   Objeto o lista de objetos -> parámetros o lista
+        GET  /spectrum     ?zone=&soil=&region=&rFactor=&importance=&phiP=&phiE= -> SpectrumResult
+        POST /spectrum     Objeto o lista de SpectrumInput -> SpectrumResult o lista
+        GET  /export       Igual que GET /spectrum más &format=etabs|xlsx|pdf|png|svg -> el documento
+        POST /export       SpectrumInput con "format" -> el documento
+
+    Las respuestas de espectros llevan ETag; un GET con If-None-Match igual
+    responde 304 sin cuerpo. En las listas, una entrada inválida se devuelve
+    como {"error": ...} sin afectar al resto.
+    """
+
+    def __init__(self, cache_bytes=128 * 1024 * 1024, t_max=T_MAX, n=N_PERIODOS):
+        self.cache = ResponseCache(cache_bytes)
+        self.T = np.linspace(0, t_max, n)
+        self._prefijo = f"{t_max!r}:{n}"
+        self.peticiones = 0
+        self.espectros = 0
+        self._server = None
+
+    async def start(self, host='127.0.0.1', port=8765):
+        self._server = await asyncio.start_server(self._conexion, host, port, limit=MAX_ENCABEZADOS)
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _conexion(self, reader, writer):
+        try:
+            while True:
+                try:
+                    encabezado = await reader.readuntil(b'\r\n\r\n')
+                except asyncio.IncompleteReadError:
+                    break
+                except asyncio.LimitOverrunError:
+                    await self._responder(writer, 413, b'{"error":"Encabezados demasiado grandes."}', cerrar=True)
+                    break
+                linea, *lineas = encabezado.decode('latin-1').split('\r\n')
+                metodo, ruta, version = (linea.split(' ') + ['', ''])[:3]
+                encabezados = {}
+                for texto in lineas:
+                    if ':' in texto:
+                        nombre, _, valor = texto.partition(':')
+                        encabezados[nombre.strip().lower()] = valor.strip()
+
+                try:
+                    largo = int(encabezados.get('content-length') or 0)
+                except ValueError:
+                    largo = -1
+                if largo < 0:
+                    datos = json.dumps({'error': "Content-Length inválido."}, ensure_ascii=False).encode()
+                    await self._responder(writer, 400, datos, cerrar=True)
+                    break
+                if largo > MAX_CUERPO:
+                    await self._responder(writer, 413, b'{"error":"Cuerpo demasiado grande."}', cerrar=True)
+                    break
+                cuerpo = await reader.readexactly(largo) if largo else b''
+
+                cerrar = (encabezados.get('connection', '').lower() == 'close'
+                          or (version == 'HTTP/1.0' and encabezados.get('connection', '').lower() != 'keep-alive'))
+                self.peticiones += 1
+                documento = None
+                try:
+                    estado, datos, etag, documento = await self._atender(metodo, ruta, cuerpo)
+                except ServiceError as e:
+                    estado, datos, etag = e.estado, json.dumps({'error': str(e)}, ensure_ascii=False).encode(), None
+                except Exception as e:
+                    estado, datos, etag = 500, json.dumps({'error': f"{type(e).__name__}: {e}"}).encode(), None
+
+                if etag is not None and metodo == 'GET' and _etag_coincide(etag, encabezados.get('if-none-match', '')):
+                    estado, datos = 304, b''
+                await self._responder(writer, estado, datos, etag=etag, cerrar=cerrar, documento=documento)
+                if cerrar:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _responder(self, writer, estado, datos, etag=None, cerrar=False, documento=None):
+        # documento: (tipo MIME, nombre de archivo) de las respuestas de /export
+        lineas = [
+            f"HTTP/1.1 {estado} {ESTADOS.get(estado, '')}",
+            f"Content-Type: {documento[0] if documento else 'application/json; charset=utf-8'}",
+            f"Content-Length: {len(datos)}",
+            "Access-Control-Allow-Origin: *",
+            "Access-Control-Allow-Headers: Content-Type, If-None-Match",
+            "Access-Control-Expose-Headers: ETag",
+        ]
+        if etag is not None:
+            lineas += [f"ETag: {etag}", "Cache-Control: public, max-age=86400"]
+        if documento:
+            lineas.append(f'Content-Disposition: attachment; filename="{documento[1]}"')
+        if cerrar:
+            lineas.append("Connection: close")
+        # El cuerpo se escribe aparte: los documentos llegan como memoryview y no se copian
+        writer.write(('\r\n'.join(lineas) + '\r\n\r\n').encode('latin-1'))
+        writer.write(datos)
+        await writer.drain()
+
+    async def _atender(self, metodo, ruta, cuerpo):
+        partes = urlsplit(ruta)
+        if metodo == 'OPTIONS':
+            return 204, b'', None, None
+        if partes.path == '/health' and metodo == 'GET':
+            estado = {'estado': 'ok', 'peticiones': self.peticiones, 'espectros': self.espectros,
+                      'cache': self.cache.stats()}
+            return 200, json.dumps(estado).encode(), None, None
+        if partes.path not in ('/spectrum', '/parameters', '/export'):
+            raise ServiceError(f"Ruta no encontrada: {partes.path}", 404)
+
+        if metodo == 'GET':
+            entradas, es_lista = [dict(parse_qsl(partes.query))], False
+        elif metodo == 'POST':
+            try:
+                entradas = json.loads(cuerpo or b'null')
+            except ValueError as e:
+                raise ServiceError(f"JSON inválido: {e}") from None
+            es_lista = isinstance(entradas, list)
+            if not es_lista:
+                entradas = [entradas]
+        else:
+            raise ServiceError(f"Método no permitido: {metodo}", 405)
+
+        if partes.path == '/parameters':
+            return self._parametros(entradas, es_lista)
+        if partes.path == '/export':
+            if es_lista:
+                raise ServiceError("La exportación admite una sola entrada.")
+            return await self._exportar(entradas[0])
+        return await self._espectros(entradas, es_lista)
+
+    async def _exportar(self, datos):
+        if datos is None:
+            datos = {}
+        if not isinstance(datos, dict):
+            raise ServiceError("Cada entrada debe ser un objeto JSON.")
+        datos = dict(datos)
+        formato = str(datos.pop('format', 'etabs'))
+        if formato not in FORMATOS_EXPORTACION:
+            raise ServiceError(f"Formato no soportado: {formato!r}; use {', '.join(FORMATOS_EXPORTACION)}.")
+        try:
+            entrada = normalize_input(datos)
+        except ValueError as e:
+            raise ServiceError(str(e)) from None
+
+        clave = input_key(entrada, f"{self._prefijo}:{formato}")
+        contenido = self.cache.get(clave)
+        if contenido is None:
+            loop = asyncio.get_running_loop()
+            contenido = await loop.run_in_executor(None, export_document, entrada, formato, self.T)
+            self.cache.put(clave, contenido)
+        tipo, extension = FORMATOS_EXPORTACION[formato]
+        return 200, contenido, f'"{clave}"', (tipo, f"espectro_{entrada[0]}_{entrada[1]}{extension}")
+
+    def _parametros(self, entradas, es_lista):
+        resultados, validas = [], []
+        for datos in entradas:
+            try:
+                datos = {ALIAS_COLUMNAS.get(clave, clave): valor for clave, valor in dict(datos).items()}
+                entrada = normalize_input({'r': 1, 'i': 1, **datos})[:3]
+            except (TypeError, ValueError) as e:
+                if not es_lista:
+                    raise ServiceError(str(e)) from None
+                resultados.append({'error': str(e)})
+                continue
+            resultados.append(len(validas))
+            validas.append(entrada)
+        calculados = compute_parameters(validas) if validas else []
+        resultados = [calculados[r] if isinstance(r, int) else r for r in resultados]
+        return 200, json.dumps(resultados if es_lista else resultados[0]).encode(), None, None
+
+    async def _espectros(self, entradas, es_lista):
+        claves, respuestas, faltantes = [], {}, {}
+        for datos in entradas:
+            try:
+                entrada = normalize_input(datos)
+            except ValueError as e:
+                if not es_lista:
+                    raise ServiceError(str(e)) from None
+                claves.append(json.dumps({'error': str(e)}, ensure_ascii=False).encode())
+                continue
+            clave = input_key(entrada, self._prefijo)
+            claves.append(clave)
+            if clave not in respuestas and clave not in faltantes:
+                cacheado = self.cache.get(clave)
+                if cacheado is None:
+                    faltantes[clave] = entrada
+                else:
+                    respuestas[clave] = cacheado
+
+        if faltantes:
+            # El cálculo y la serialización se hacen fuera del bucle de eventos
+            loop = asyncio.get_running_loop()
+            calculados = await loop.run_in_executor(None, compute_spectra, list(faltantes.values()), self.T)
+            for clave, datos in zip(faltantes, calculados):
+                self.cache.put(clave, datos)
+                respuestas[clave] = datos
+            self.espectros += len(calculados)
+
+        cuerpos = [respuestas[c] if isinstance(c, str) else c for c in claves]
+        if not es_lista:
+            return 200, cuerpos[0], f'"{claves[0]}"', None
+        etag = hashlib.sha256(''.join(c if isinstance(c, str) else c.decode() for c in claves).encode())
+        return 200, b'[' + b','.join(cuerpos) + b']', f'"{etag.hexdigest()[:32]}"', None
+
+
+async def _cliente(host, port, peticiones, resultados):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for peticion in peticiones:
+            writer.write(peticion)
+            await writer.drain()
+            encabezado = await reader.readuntil(b'\r\n\r\n')
+            largo = 0
+            for linea in encabezado.split(b'\r\n'):
+                if linea.lower().startswith(b'content-length:'):
+                    largo = int(linea.split(b':')[1])
+            await reader.readexactly(largo)
+            resultados.append(int(encabezado.split(b' ', 2)[1]))
+    finally:
+        writer.close()
+
+
+def _peticion(metodo, ruta, cuerpo=b''):
+    return (f"{metodo} {ruta} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(cuerpo)}\r\n\r\n").encode() + cuerpo
+
+
+async def load_test(host, port, conexiones=16, peticiones=2000, lote=32, semilla=0):
+    """
+    Prueba de carga contra un servicio en ejecución
+
+    Cada conexión persistente envía peticiones POST /spectrum con lotes de
+    entradas aleatorias de las tablas NEC (R e I de constants.py), de modo que
+    se mezclan aciertos y fallos de la caché.
+
+    Returns:
+        Diccionario con 'peticiones', 'espectros', 'segundos', 'peticiones_por_segundo',
+        'espectros_por_segundo' y 'errores' (respuestas distintas de 200)
+    """
+    from .constants import FACTOR_I_OPTIONS, FACTOR_R_OPTIONS
+    from .seismic_calculations import REGIONES, SUELOS, ZONAS
+
+    rng = np.random.default_rng(semilla)
+    opciones = (ZONAS, SUELOS, REGIONES, FACTOR_R_OPTIONS, FACTOR_I_OPTIONS)
+    por_conexion = [[] for _ in range(conexiones)]
+    for k in range(peticiones):
+        elegidos = [rng.integers(len(o), size=lote) for o in opciones]
+        cuerpo = [
+            {'zone': ZONAS[z], 'soil': SUELOS[s], 'region': REGIONES[g],
+             'rFactor': FACTOR_R_OPTIONS[r].split(' ')[0], 'importance': FACTOR_I_OPTIONS[i].split(' ')[0]}
+            for z, s, g, r, i in zip(*(e.tolist() for e in elegidos))
+        ]
+        por_conexion[k % conexiones].append(_peticion('POST', '/spectrum', json.dumps(cuerpo).encode()))
+
+    resultados = []
+    inicio = time.perf_counter()
+    await asyncio.gather(*(_cliente(host, port, p, resultados) for p in por_conexion))
+    segundos = time.perf_counter() - inicio
+    return {
+        'peticiones': len(resultados),
+        'espectros': len(resultados) * lote,
+        'segundos': segundos,
+        'peticiones_por_segundo': len(resultados) / segundos,
+        'espectros_por_segundo': len(resultados) * lote / segundos,
+        'errores': sum(estado != 200 for estado in resultados),
+    }
+
+
+async def _serve(args):
+    servicio = SpectrumService(cache_bytes=args.cache_mb * 1024 * 1024, t_max=args.t_max, n=args.puntos)
+    host, port = await servicio.start(args.host, args.port)
+    if args.bench:
+        resumen = await load_test(host, port, conexiones=args.conexiones, peticiones=args.bench, lote=args.lote)
+        await servicio.close()
+        print(f"{resumen['peticiones']} peticiones de {args.lote} espectros en {resumen['segundos']:.2f} s: "
+              f"{resumen['peticiones_por_segundo']:.0f} peticiones/s, "
+              f"{resumen['espectros_por_segundo']:.0f} espectros/s "
+              f"({resumen['errores']} errores, caché {servicio.cache.stats()})")
+        return 1 if resumen['errores'] else 0
+    print(f"Servicio de espectros NEC en http://{host}:{port} (Ctrl+C para detener)", file=sys.stderr)
+    async with servicio._server:
+        await servicio._server.serve_forever()
+
+
+def add_arguments(parser):
+    parser.add_argument('--host', default='127.0.0.1', help="Dirección de escucha (por defecto 127.0.0.1)")
+    parser.add_argument('--port', type=int, default=8765, help="Puerto (por defecto 8765; 0 elige uno libre)")
+    parser.add_argument('--cache-mb', type=int, default=128, help="Tamaño máximo de la caché de respuestas en MB")
+    parser.add_argument('--t-max', type=float, default=T_MAX, help="Período máximo en s (por defecto 6)")
+    parser.add_argument('--puntos', type=int, default=N_PERIODOS, help="Puntos de la malla de períodos (por defecto 1000)")
+    parser.add_argument('--bench', type=int, default=0, metavar='N',
+                        help="En lugar de quedar a la escucha, envía N peticiones de prueba y muestra el rendimiento")
+    parser.add_argument('--conexiones', type=int, default=16, help="Conexiones simultáneas de --bench")
+    parser.add_argument('--lote', type=int, default=32, help="Entradas por petición de --bench")
+
+
+def run(args):
+    try:
+        return asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        return 0
@@ -0,0 +1,270 @@
+"""Caché en disco (SQLite) de espectros calculados, compartida entre sesiones y procesos."""
+
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+import numpy as np
+
+from .seismic_calculations import (
+    ENGINE_VERSION,
+    ETA_TABLA,
+    FA_TABLA,
+    FD_TABLA,
+    FS_TABLA,
+    R_CAIDA_TABLA,
+    Z_TABLA,
+    SpectrumResult,
+    spectrum_grid,
+)
+
+
+def _version_tablas():
+    contenido = hashlib.sha256()
+    for tabla in (FA_TABLA, FD_TABLA, FS_TABLA, R_CAIDA_TABLA, ETA_TABLA, Z_TABLA):
+        contenido.update(np.ascontiguousarray(tabla, dtype='<f8').tobytes())
+    return contenido.hexdigest()[:16]
+
+
+# Parte común de todas las claves: cambia si cambian las fórmulas o las tablas NEC
+VERSION = f"motor-{ENGINE_VERSION}:tablas-{_version_tablas()}"
+
+MAX_BYTES = 256 * 1024 * 1024
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS espectros (
+    clave TEXT PRIMARY KEY,
+    sa BLOB NOT NULL,
+    si BLOB NOT NULL,
+    bytes INTEGER NOT NULL,
+    usado REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS espectros_usado ON espectros (usado);
+CREATE TABLE IF NOT EXISTS contadores (nombre TEXT PRIMARY KEY, valor INTEGER NOT NULL);
+INSERT OR IGNORE INTO contadores VALUES ('hits', 0), ('misses', 0);
+-- Total de bytes guardados, mantenido por disparadores para no sumar la tabla en cada inserción
+CREATE TRIGGER IF NOT EXISTS espectros_bytes_insert AFTER INSERT ON espectros BEGIN
+    UPDATE contadores SET valor = valor + NEW.bytes WHERE nombre = 'bytes';
+END;
+CREATE TRIGGER IF NOT EXISTS espectros_bytes_delete AFTER DELETE ON espectros BEGIN
+    UPDATE contadores SET valor = valor - OLD.bytes WHERE nombre = 'bytes';
+END;
+CREATE TRIGGER IF NOT EXISTS espectros_bytes_update AFTER UPDATE OF bytes ON espectros BEGIN
+    UPDATE contadores SET valor = valor + NEW.bytes - OLD.bytes WHERE nombre = 'bytes';
+END;
+INSERT OR IGNORE INTO contadores SELECT 'bytes', COALESCE(SUM(bytes), 0) FROM espectros;
+"""
+
+
+def default_cache_path():
+    """
+    Ruta por defecto del archivo de caché
+
+    Se puede cambiar con la variable de entorno ESPECTRO_NEC_CACHE; con el
+    valor '0' u 'off' la caché queda desactivada y se devuelve None.
+    """
+    ruta = os.environ.get('ESPECTRO_NEC_CACHE')
+    if ruta is not None:
+        return None if ruta.strip().lower() in ('', '0', 'off') else ruta
+    if sys.platform == 'win32':
+        base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~')
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'espectro_nec', 'espectros.sqlite')
+
+
+def spectrum_key(T, Z, Fa, Fd, Fs, eta, R, I, phi_P, phi_E, r=1, digest_T=None):
+    """
+    Clave canónica de un espectro: hash de VERSION, los factores y la malla de períodos
+
+    Args:
+        T: Malla de períodos
+        digest_T: Hash de T ya calculado (para no repetirlo en lotes con la misma malla)
+    """
+    if digest_T is None:
+        digest_T = grid_digest(T)
+    factores = [float(v) for v in (Z, Fa, Fd, Fs, eta, R, I, phi_P, phi_E, r)]
+    return hashlib.sha256(json.dumps([VERSION, digest_T, *factores]).encode()).hexdigest()
+
+
+def grid_digest(T):
+    return hashlib.sha256(np.ascontiguousarray(T, dtype='<f8').tobytes()).hexdigest()[:32]
+
+
+class SpectrumCache:
+    """
+    Caché LRU de espectros en un archivo SQLite, acotada en bytes
+
+    Guarda Sa y Si por clave canónica (ver spectrum_key); T se conoce por la
+    clave y T0, Tc y TL se recalculan, y Se es igual a Sa. El archivo puede
+    usarse a la vez desde varios procesos (modo WAL) y la instancia desde
+    varios hilos. Los errores de SQLite no se propagan: la consulta cuenta
+    como fallo y el espectro se calcula normalmente.
+
+    Atributos:
+        hits, misses: Aciertos y fallos de esta instancia
+    """
+
+    def __init__(self, path=None, max_bytes=MAX_BYTES):
+        self.path = path or default_cache_path()
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        if self.path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._conexion = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+        self._conexion.execute('PRAGMA journal_mode=WAL')
+        self._conexion.execute('PRAGMA synchronous=NORMAL')
+        self._conexion.executescript(_ESQUEMA)
+
+    def close(self):
+        with self._lock:
+            self._conexion.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def get_many(self, claves):
+        """
+        Busca varias claves a la vez
+
+        Returns:
+            Diccionario clave -> (Sa, Si) con las encontradas (arreglos de solo lectura)
+        """
+        claves = list(dict.fromkeys(claves))
+        encontrados = {}
+        with self._lock:
+            try:
+                for inicio in range(0, len(claves), 500):
+                    parte = claves[inicio:inicio + 500]
+                    consulta = f"SELECT clave, sa, si FROM espectros WHERE clave IN ({','.join('?' * len(parte))})"
+                    for clave, sa, si in self._conexion.execute(consulta, parte):
+                        encontrados[clave] = (np.frombuffer(sa, dtype='<f8'), np.frombuffer(si, dtype='<f8'))
+                ahora = time.time()
+                with self._conexion:
+                    self._conexion.executemany("UPDATE espectros SET usado = ? WHERE clave = ?",
+                                               [(ahora, clave) for clave in encontrados])
+                    self._contar(len(encontrados), len(claves) - len(encontrados))
+            except sqlite3.Error:
+                encontrados = {}
+            self.hits += len(encontrados)
+            self.misses += len(claves) - len(encontrados)
+        return encontrados
+
+    def put_many(self, elementos):
+        """
+        Guarda varios espectros y descarta los menos usados si se supera max_bytes
+
+        Args:
+            elementos: Iterable de (clave, Sa, Si)
+        """
+        ahora = time.time()
+        filas = []
+        for clave, Sa, Si in elementos:
+            sa = np.ascontiguousarray(Sa, dtype='<f8').tobytes()
+            si = np.ascontiguousarray(Si, dtype='<f8').tobytes()
+            filas.append((clave, sa, si, len(sa) + len(si), ahora))
+        if not filas:
+            return
+        with self._lock:
+            try:
+                with self._conexion:
+                    # Upsert en lugar de INSERT OR REPLACE: el reemplazo no dispara espectros_bytes_delete
+                    self._conexion.executemany(
+                        "INSERT INTO espectros VALUES (?, ?, ?, ?, ?) ON CONFLICT (clave) DO UPDATE SET "
+                        "sa = excluded.sa, si = excluded.si, bytes = excluded.bytes, usado = excluded.usado", filas)
+                    self._descartar()
+            except sqlite3.Error:
+                pass
+
+    def _contar(self, hits, misses):
+        self._conexion.executemany("UPDATE contadores SET valor = valor + ? WHERE nombre = ?",
+                                   ((hits, 'hits'), (misses, 'misses')))
+
+    def _descartar(self):
+        total = self._conexion.execute("SELECT valor FROM contadores WHERE nombre = 'bytes'").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Se libera hasta el 90 % del límite para no descartar en cada inserción
+        exceso = total - int(0.9 * self.max_bytes)
+        claves = []
+        for clave, tamano in self._conexion.execute("SELECT clave, bytes FROM espectros ORDER BY usado"):
+            claves.append((clave,))
+            exceso -= tamano
+            if exceso <= 0:
+                break
+        self._conexion.executemany("DELETE FROM espectros WHERE clave = ?", claves)
+
+    def calculate_spectrum(self, Z, Fa, Fd, Fs, eta, R, I, phi_P, phi_E, r=1, **muestreo):
+        """
+        Igual que seismic_calculations.calculate_spectrum, consultando antes la caché
+
+        Returns:
+            SpectrumResult, con Sa y Si de solo lectura
+        """
+        T = spectrum_grid(Z, Fa, Fd, Fs, eta, R, I, phi_P, phi_E, r, **muestreo)
+        clave = spectrum_key(T, Z, Fa, Fd, Fs, eta, R, I, phi_P, phi_E, r)
+
+        encontrado = self.get_many([clave]).get(clave)
+        if encontrado is not None and encontrado[0].size == T.size:
+            Sa, Si = encontrado
+            return SpectrumResult(T, Sa, Z, Fa, Fd, Fs, eta, R, I, phi_P, phi_E, r, Si=Si)
+        resultado = SpectrumResult.compute(T, Z, Fa, Fd, Fs, eta, R, I, phi_P, phi_E, r)
+        self.put_many([(clave, resultado.Sa, resultado.Si)])
+        return resultado
+
+    def stats(self):
+        """
+        Returns:
+            Diccionario con los aciertos y fallos de la sesión ('hits', 'misses'),
+            los acumulados del archivo ('hits_total', 'misses_total'),
+            'entradas' y 'bytes'
+        """
+        with self._lock:
+            try:
+                contadores = dict(self._conexion.execute("SELECT nombre, valor FROM contadores"))
+                entradas = self._conexion.execute("SELECT COUNT(*) FROM espectros").fetchone()[0]
+                total = contadores.get('bytes', 0)
+            except sqlite3.Error:
+                contadores, entradas, total = {}, 0, 0
+        return {
+            'hits': self.hits, 'misses': self.misses,
+            'hits_total': contadores.get('hits', 0), 'misses_total': contadores.get('misses', 0),
+            'entradas': entradas, 'bytes': total,
+        }
+
+    def clear(self):
+        with self._lock, self._conexion:
+            self._conexion.execute("DELETE FROM espectros")
+            self._conexion.execute("UPDATE contadores SET valor = 0")
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def default_cache(path=None):
+    """
+    Instancia compartida de SpectrumCache para el proceso actual
+
+    Returns:
+        SpectrumCache, o None si la caché está desactivada o no se puede abrir
+    """
+    path = path or default_cache_path()
+    if path is None:
+        return None
+    with _caches_lock:
+        if path not in _caches:
+            try:
+                _caches[path] = SpectrumCache(path)
+            except (OSError, sqlite3.Error):
+                _caches[path] = None
+        return _caches[path]
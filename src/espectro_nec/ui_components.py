@@ -17,7 +17,9 @@ def _labeled_combo(panel, row, text, variable, values):
     return combo
 
 
-def create_input_panel(panel, variables, generar_callback, exportar_callback, imagen_callback, pdf_callback, etabs_callback):
+def create_input_panel(panel, variables, generar_callback, exportar_callback, imagen_callback, pdf_callback, etabs_callback,
+                       vista_previa_var=None, registros_callback=None, quitar_registros_callback=None,
+                       barrido_callback=None):
     """
     Crea los componentes de la interfaz de usuario en el panel izquierdo
     """
@@ -59,6 +61,23 @@ def create_input_panel(panel, variables, generar_callback, exportar_callback, im
     menu.add_separator()
     menu.add_command(label="Generar Reporte PDF", command=pdf_callback)
     export_menu['menu'] = menu
+
+    if vista_previa_var is not None:
+        ttk.Checkbutton(botones_frame, text="Vista previa en vivo", variable=vista_previa_var,
+                        bootstyle="round-toggle").grid(column=2, row=0, padx=(10, 0))
+
+    if registros_callback is not None:
+        registros_menu = ttk.Menubutton(botones_frame, text="Registros", bootstyle="secondary")
+        registros_menu.grid(column=0, row=1, columnspan=2, sticky=W, pady=(8, 0))
+        menu_registros = ttk.Menu(registros_menu)
+        menu_registros.add_command(label="Comparar con acelerogramas...", command=registros_callback)
+        menu_registros.add_command(label="Quitar registros", command=quitar_registros_callback)
+        registros_menu['menu'] = menu_registros
+
+    if barrido_callback is not None:
+        ttk.Button(botones_frame, text="Sensibilidad", command=barrido_callback, bootstyle="secondary-outline").grid(
+            column=2, row=1, sticky=W, padx=(10, 0), pady=(8, 0)
+        )
     
     info_frame = ttk.Labelframe(panel, text="Información", padding="10 10 10 10")
     info_frame.grid(column=0, row=9, columnspan=3, sticky=(W, E), pady=10)
@@ -70,4 +89,33 @@ def create_input_panel(panel, variables, generar_callback, exportar_callback, im
         "Fuente: Ing. Vinces Mendoza Maikel Andres - CodeNormative v.0.2"
     )
 
-    ttk.Label(info_frame, text=info_text, wraplength=360).grid(column=0, row=0, sticky=W)
\ No newline at end of file
+    ttk.Label(info_frame, text=info_text, wraplength=360).grid(column=0, row=0, sticky=W)
+
+
+def create_status_bar(panel, cancelar_callback, traza_callback=None):
+    """
+    Crea la barra de estado con el avance de las exportaciones en segundo plano
+
+    Args:
+        traza_callback: Si se indica, añade un botón para guardar la traza de rendimiento
+
+    Returns:
+        Diccionario con 'mensaje_var', 'progreso' y 'cancelar'
+    """
+    barra = ttk.Frame(panel)
+    barra.pack(fill=X, pady=(6, 0))
+
+    mensaje_var = ttk.StringVar(value="Listo")
+    ttk.Label(barra, textvariable=mensaje_var, anchor=W).pack(side=LEFT, fill=X, expand=True)
+
+    cancelar = ttk.Button(barra, text="Cancelar", command=cancelar_callback, bootstyle="secondary-outline",
+                          state=DISABLED)
+    cancelar.pack(side=RIGHT, padx=(5, 0))
+
+    if traza_callback is not None:
+        ttk.Button(barra, text="Traza", command=traza_callback, bootstyle="info-outline").pack(side=RIGHT, padx=(5, 0))
+
+    progreso = ttk.Progressbar(barra, mode="determinate", maximum=1.0, length=160, bootstyle="info")
+    progreso.pack(side=RIGHT)
+
+    return {"mensaje_var": mensaje_var, "progreso": progreso, "cancelar": cancelar}
\ No newline at end of file
@@ -0,0 +1,404 @@
+"""Propagación de incertidumbre por Monte Carlo: espectros percentiles (subcomando ``espectro-nec montecarlo``)."""
+
+import csv
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .seismic_calculations import (
+    REGIONES,
+    REGION_CODIGOS,
+    SUELOS,
+    SUELO_CODIGOS,
+    T_MAX,
+    ZONAS,
+    ZONA_CODIGOS,
+    calculate_parameters_many,
+    calculate_spectrum_many,
+)
+from .instrumentation import span
+
+# Límites de Vs30 (m/s) entre perfiles E|D|C|B|A, como classifyProfile de geotech-engine.ts
+LIMITES_VS30 = (180.0, 360.0, 760.0, 1500.0)
+
+# Malla de períodos de los espectros percentiles
+PERIODOS_MONTE_CARLO = np.linspace(0, T_MAX, 121)
+
+# Histograma logarítmico por período: resolución relativa de ~0.6 % entre 1e-4 g y 10 g
+HISTOGRAMA_MIN = 1e-4
+HISTOGRAMA_MAX = 10.0
+HISTOGRAMA_CLASES = 2000
+
+PERCENTILES = (16, 50, 84)
+TAMANO_BLOQUE = 50_000
+
+# Modelo por defecto: sitio de Vs30 incierto en zona V, sistema de pórticos
+MODELO_EJEMPLO = {
+    'vs30': ['lognormal', 300.0, 0.3],
+    'zona': 'V',
+    'region': 'Costa (Excepto Esmeralda)',
+    'R': 8.0,
+    'I': 1.0,
+    'phi_p': 1.0,
+    'phi_e': 1.0,
+}
+
+
+def soil_from_vs30(vs30):
+    """
+    Códigos de tipo de suelo (índices de SUELOS) a partir de Vs30
+
+    Returns:
+        Arreglo de códigos: A si Vs30 ≥ 1500, B si ≥ 760, C si ≥ 360, D si ≥ 180 y E en otro caso
+    """
+    return (len(LIMITES_VS30) - np.searchsorted(LIMITES_VS30, vs30, side='right')).astype(np.intp)
+
+
+def _muestrear(rng, especificacion, n, nombre):
+    """
+    Muestrea n valores según la especificación de un factor del modelo
+
+    Especificaciones aceptadas:
+        - Valor fijo: 8.0 o 'V'
+        - Diccionario valor -> probabilidad: {'IV': 0.3, 'V': 0.7}
+        - Lista de valores equiprobables: [6, 7, 8]
+        - ['uniforme', a, b], ['normal', media, desviacion] o ['lognormal', mediana, sigma_ln]
+    """
+    if isinstance(especificacion, dict):
+        valores = list(especificacion)
+        probabilidades = np.asarray(list(especificacion.values()), dtype=np.float64)
+        if np.any(probabilidades < 0) or probabilidades.sum() <= 0:
+            raise ValueError(f"Probabilidades no válidas para {nombre}.")
+        return np.asarray(valores)[rng.choice(len(valores), size=n, p=probabilidades / probabilidades.sum())]
+    if isinstance(especificacion, (list, tuple)):
+        if especificacion and isinstance(especificacion[0], str) and especificacion[0] in (
+                'uniforme', 'normal', 'lognormal'):
+            distribucion, a, b = especificacion
+            if distribucion == 'uniforme':
+                return rng.uniform(a, b, size=n)
+            if distribucion == 'normal':
+                return rng.normal(a, b, size=n)
+            return a * np.exp(rng.normal(0.0, b, size=n))
+        return np.asarray(especificacion)[rng.integers(len(especificacion), size=n)]
+    return np.full(n, especificacion)
+
+
+def sample_parameters(rng, modelo, n):
+    """
+    Muestrea n realizaciones de los parámetros del modelo
+
+    Args:
+        rng: numpy.random.Generator
+        modelo: Diccionario con 'vs30' o 'suelo', 'zona', 'region', 'R', 'I',
+            'phi_p' y 'phi_e' (ver _muestrear)
+
+    Returns:
+        Diccionario con los códigos 'suelo', 'zona' y 'region' y los factores
+        'R', 'I', 'phi_p', 'phi_e'
+    """
+    if 'vs30' in modelo:
+        suelo = soil_from_vs30(_muestrear(rng, modelo['vs30'], n, 'vs30').astype(np.float64))
+    else:
+        suelo = _codigos(_muestrear(rng, modelo.get('suelo', 'D'), n, 'suelo'), SUELO_CODIGOS, 'suelo')
+    muestras = {
+        'suelo': suelo,
+        'zona': _codigos(_muestrear(rng, modelo.get('zona', 'V'), n, 'zona'), ZONA_CODIGOS, 'zona'),
+        'region': _codigos(_muestrear(rng, modelo.get('region', REGIONES[0]), n, 'region'), REGION_CODIGOS,
+                           'region'),
+    }
+    for clave in ('R', 'I', 'phi_p', 'phi_e'):
+        valores = _muestrear(rng, modelo.get(clave, 1.0), n, clave).astype(np.float64)
+        if np.any(valores <= 0):
+            raise ValueError(f"El modelo de {clave} produce valores no positivos; use una distribución acotada.")
+        muestras[clave] = valores
+    return muestras
+
+
+def _codigos(valores, codigos, nombre):
+    unicos, inversa = np.unique(valores.astype(str), return_inverse=True)
+    try:
+        return np.array([codigos[v] for v in unicos.tolist()], dtype=np.intp)[inversa]
+    except KeyError as e:
+        raise ValueError(f"Valor de {nombre} no reconocido: {e.args[0]!r}") from None
+
+
+def combination_spectra(T):
+    """
+    Sa de todas las combinaciones (suelo, zona, región) en la malla T
+
+    Sa solo depende de estas tres etiquetas, así que cada muestra toma su fila
+    de esta tabla y Si es Sa escalado por I / (R·ØP·ØE).
+
+    Returns:
+        Arreglo (n_suelos · n_zonas · n_regiones, n_periodos), indexado por
+        (suelo · n_zonas + zona) · n_regiones + region
+    """
+    suelo, zona, region = (c.reshape(-1) for c in np.meshgrid(
+        np.arange(len(SUELOS)), np.arange(len(ZONAS)), np.arange(len(REGIONES)), indexing='ij'))
+    parametros, eta, Z = calculate_parameters_many(suelo, zona, region)
+    _, Sa, _, _, _, _, _ = calculate_spectrum_many(Z, parametros['Fa'], parametros['Fd'], parametros['Fs'], eta,
+                                                   1.0, 1.0, 1.0, 1.0, parametros['r'], T=T)
+    return Sa
+
+
+class StreamingHistogram:
+    """
+    Histograma logarítmico por período para percentiles sin guardar las muestras
+
+    Las clases cubren [minimo, maximo) con espaciado logarítmico, más una de
+    desborde por cada lado. Los conteos son enteros, de modo que la suma de
+    histogramas de bloques es exacta e independiente del orden. Las sumas
+    para la media se guardan por bloque y se combinan con math.fsum, que
+    tampoco depende del orden ni del agrupamiento de los bloques.
+
+    Atributos:
+        conteos: Arreglo (n_periodos, clases + 2) de int64
+        sumas: Sumas parciales por período, una por llamada a add
+        n: Número de muestras acumuladas
+    """
+
+    def __init__(self, n_periodos, minimo=HISTOGRAMA_MIN, maximo=HISTOGRAMA_MAX, clases=HISTOGRAMA_CLASES):
+        self.minimo, self.maximo, self.clases = minimo, maximo, clases
+        self._log_min = np.log(minimo)
+        self._paso = np.log(maximo / minimo) / clases
+        self.conteos = np.zeros((n_periodos, clases + 2), dtype=np.int64)
+        self.sumas = []
+        self.n = 0
+
+    def _indices(self, valores):
+        with np.errstate(divide='ignore'):
+            indices = np.floor((np.log(valores) - self._log_min) / self._paso)
+        return np.clip(indices, -1, self.clases).astype(np.intp) + 1
+
+    def add(self, valores, pesos=None):
+        """
+        Acumula valores con forma (n_muestras, n_periodos), o (n_filas, n_periodos) con pesos enteros por fila
+        """
+        valores = np.asarray(valores, dtype=np.float64)
+        n_periodos = self.conteos.shape[0]
+        planos = self._indices(valores) + np.arange(n_periodos) * (self.clases + 2)
+        if pesos is None:
+            self.n += valores.shape[0]
+            self.sumas.append(valores.sum(axis=0))
+            repetidos = None
+        else:
+            pesos = np.asarray(pesos, dtype=np.int64)
+            self.n += int(pesos.sum())
+            self.sumas.append(pesos @ valores)
+            repetidos = np.broadcast_to(pesos[:, None], valores.shape).reshape(-1)
+        self.conteos += np.bincount(planos.reshape(-1), weights=repetidos,
+                                    minlength=self.conteos.size).reshape(self.conteos.shape).astype(np.int64)
+
+    def merge(self, otro):
+        self.conteos += otro.conteos
+        self.sumas.extend(otro.sumas)
+        self.n += otro.n
+        return self
+
+    @property
+    def suma(self):
+        """Suma de los valores por período, redondeada una sola vez."""
+        if not self.sumas:
+            return np.zeros(self.conteos.shape[0])
+        return np.array([math.fsum(columna) for columna in np.column_stack(self.sumas).tolist()])
+
+    def mean(self):
+        return self.suma / max(self.n, 1)
+
+    def percentiles(self, q):
+        """
+        Percentiles por período, interpolando en escala logarítmica dentro de la clase
+
+        Args:
+            q: Percentiles entre 0 y 100
+
+        Returns:
+            Arreglo (len(q), n_periodos)
+        """
+        q = np.atleast_1d(np.asarray(q, dtype=np.float64))
+        acumulado = np.cumsum(self.conteos, axis=1)
+        resultado = np.empty((q.size, self.conteos.shape[0]))
+        bordes = self.minimo * np.exp(self._paso * np.arange(self.clases + 1))
+        for k, percentil in enumerate(q.tolist()):
+            objetivo = percentil / 100 * self.n
+            clase = np.minimum((acumulado < objetivo).sum(axis=1), self.clases + 1)
+            previo = np.where(clase > 0, acumulado[np.arange(clase.size), np.maximum(clase - 1, 0)], 0)
+            en_clase = self.conteos[np.arange(clase.size), clase]
+            fraccion = np.where(en_clase > 0, (objetivo - previo) / np.maximum(en_clase, 1), 0.0)
+            # Clase interior i (1..clases) = [bordes[i-1], bordes[i]); los desbordes se fijan al límite
+            interior = np.clip(clase - 1, 0, self.clases - 1)
+            valor = bordes[interior] * np.exp(self._paso * np.clip(fraccion, 0.0, 1.0))
+            valor = np.where(clase == 0, self.minimo, np.where(clase == self.clases + 1, self.maximo, valor))
+            resultado[k] = valor
+        return resultado
+
+
+def simulate_block(modelo, T, semilla, n, Sa_combinaciones=None):
+    """
+    Simula un bloque de n realizaciones y devuelve sus histogramas
+
+    Args:
+        modelo: Modelo de incertidumbre (ver sample_parameters)
+        T: Malla de períodos
+        semilla: numpy.random.SeedSequence del bloque
+        n: Número de realizaciones
+        Sa_combinaciones: Tabla de combination_spectra(T), si ya está calculada
+
+    Returns:
+        Tupla con (histograma_Sa, histograma_Si, conteo de realizaciones por tipo de suelo)
+    """
+    if Sa_combinaciones is None:
+        Sa_combinaciones = combination_spectra(T)
+    rng = np.random.default_rng(semilla)
+    with span("montecarlo.muestrear", n=n):
+        muestras = sample_parameters(rng, modelo, n)
+    combinacion = (muestras['suelo'] * len(ZONAS) + muestras['zona']) * len(REGIONES) + muestras['region']
+    factor = muestras['I'] / (muestras['R'] * muestras['phi_p'] * muestras['phi_e'])
+
+    with span("montecarlo.histograma", n=n):
+        hist_sa = StreamingHistogram(T.size)
+        # Sa toma pocos valores distintos: se acumula cada curva con su número de repeticiones
+        presentes, repeticiones = np.unique(combinacion, return_counts=True)
+        hist_sa.add(Sa_combinaciones[presentes], pesos=repeticiones)
+
+        hist_si = StreamingHistogram(T.size)
+        hist_si.add(Sa_combinaciones[combinacion] * factor[:, None])
+    return hist_sa, hist_si, np.bincount(muestras['suelo'], minlength=len(SUELOS))
+
+
+def _simular_bloques(modelo, T, semillas, tamanos):
+    # Un trabajo de proceso: varios bloques acumulados localmente para reducir la transferencia
+    Sa_combinaciones = combination_spectra(T)
+    total = None
+    for semilla, n in zip(semillas, tamanos):
+        parcial = simulate_block(modelo, T, semilla, n, Sa_combinaciones)
+        if total is None:
+            total = parcial
+        else:
+            total[0].merge(parcial[0])
+            total[1].merge(parcial[1])
+            total = (total[0], total[1], total[2] + parcial[2])
+    return total
+
+
+def monte_carlo(modelo, n_muestras=1_000_000, T=None, semilla=0, workers=None, tamano_bloque=TAMANO_BLOQUE,
+                percentiles=PERCENTILES, progreso=None):
+    """
+    Espectros percentiles de Sa y Si bajo incertidumbre de Vs30, zona y factores estructurales
+
+    Las realizaciones se generan por bloques de tamano_bloque con semillas
+    derivadas de semilla mediante SeedSequence.spawn, y cada bloque se reduce a
+    histogramas por período. El resultado depende solo de la semilla, de
+    n_muestras y de tamano_bloque, no del número de procesos.
+
+    Args:
+        modelo: Modelo de incertidumbre (ver sample_parameters)
+        n_muestras: Número total de realizaciones
+        T: Malla de períodos (por defecto PERIODOS_MONTE_CARLO)
+        semilla: Entero o SeedSequence
+        workers: Número de procesos (None usa os.cpu_count(); 0 calcula en el proceso actual)
+        percentiles: Percentiles a calcular
+        progreso: Callable opcional progreso(fraccion, mensaje)
+
+    Returns:
+        Diccionario con 'T', 'percentiles', 'Sa' y 'Si' (len(percentiles), n_periodos),
+        'media_Sa', 'media_Si', 'muestras' y 'fraccion_suelos' (fracción de realizaciones por tipo de suelo)
+    """
+    T = PERIODOS_MONTE_CARLO if T is None else np.asarray(T, dtype=np.float64)
+    if n_muestras <= 0 or tamano_bloque <= 0:
+        raise ValueError("El número de muestras y el tamaño de bloque deben ser mayores que cero.")
+    sample_parameters(np.random.default_rng(0), modelo, 1)  # valida el modelo antes de repartirlo
+
+    raiz = semilla if isinstance(semilla, np.random.SeedSequence) else np.random.SeedSequence(semilla)
+    tamanos = [min(tamano_bloque, n_muestras - inicio) for inicio in range(0, n_muestras, tamano_bloque)]
+    semillas = raiz.spawn(len(tamanos))
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    # Grupos contiguos de bloques por trabajo; se combinan en orden para que la media no dependa de workers
+    n_trabajos = 1 if workers <= 1 else min(len(tamanos), 4 * workers)
+    cortes = np.linspace(0, len(tamanos), n_trabajos + 1).astype(int)
+    trabajos = [(semillas[a:b], tamanos[a:b]) for a, b in zip(cortes[:-1], cortes[1:])]
+
+    hist_sa = StreamingHistogram(T.size)
+    hist_si = StreamingHistogram(T.size)
+    suelos = np.zeros(len(SUELOS), dtype=np.int64)
+    hechos = 0
+
+    def acumular(parcial, n):
+        nonlocal suelos, hechos
+        hist_sa.merge(parcial[0])
+        hist_si.merge(parcial[1])
+        suelos = suelos + parcial[2]
+        hechos += n
+        if progreso is not None:
+            progreso(hechos / n_muestras, f"{hechos} de {n_muestras} realizaciones")
+
+    if n_trabajos == 1:
+        for semilla_bloque, n in zip(semillas, tamanos):
+            acumular(_simular_bloques(modelo, T, [semilla_bloque], [n]), n)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futuros = [executor.submit(_simular_bloques, modelo, T, s, t) for s, t in trabajos]
+            for futuro, (_, t) in zip(futuros, trabajos):
+                acumular(futuro.result(), sum(t))
+
+    return {
+        'T': T,
+        'percentiles': tuple(percentiles),
+        'Sa': hist_sa.percentiles(percentiles),
+        'Si': hist_si.percentiles(percentiles),
+        'media_Sa': hist_sa.mean(),
+        'media_Si': hist_si.mean(),
+        'muestras': hist_si.n,
+        'fraccion_suelos': dict(zip(SUELOS, (suelos / max(hist_si.n, 1)).tolist())),
+    }
+
+
+def write_percentiles_csv(file_path, resultado):
+    """Escribe T y las columnas Sa_P16, ..., Si_P84, Sa_media y Si_media ('-' en stdout)."""
+    archivo = sys.stdout if file_path == '-' else open(file_path, 'w', newline='', encoding='utf-8')
+    try:
+        writer = csv.writer(archivo)
+        nombres = [f"P{p:g}" for p in resultado['percentiles']]
+        writer.writerow(['T', *(f"Sa_{n}" for n in nombres), *(f"Si_{n}" for n in nombres), 'Sa_media', 'Si_media'])
+        columnas = np.column_stack([resultado['T'], resultado['Sa'].T, resultado['Si'].T,
+                                    resultado['media_Sa'], resultado['media_Si']])
+        writer.writerows(columnas.tolist())
+    finally:
+        if archivo is not sys.stdout:
+            archivo.close()
+
+
+def add_arguments(parser):
+    parser.add_argument('--modelo', metavar='JSON',
+                        help="Archivo JSON con el modelo de incertidumbre (claves vs30 o suelo, zona, region, "
+                             "R, I, phi_p, phi_e); por defecto Vs30 lognormal de mediana 300 m/s en zona V")
+    parser.add_argument('-n', '--muestras', type=int, default=1_000_000, help="Número de realizaciones")
+    parser.add_argument('--semilla', type=int, default=0, help="Semilla (resultados reproducibles)")
+    parser.add_argument('--percentiles', type=float, nargs='+', default=list(PERCENTILES),
+                        help="Percentiles a calcular (por defecto 16 50 84)")
+    parser.add_argument('--bloque', type=int, default=TAMANO_BLOQUE, help="Realizaciones por bloque")
+    parser.add_argument('-j', '--workers', type=int, default=None,
+                        help="Número de procesos (por defecto todos los núcleos; 0 sin procesos)")
+    parser.add_argument('-o', '--output', default='-', help="Archivo CSV de salida (por defecto stdout)")
+
+
+def run(args):
+    modelo = MODELO_EJEMPLO
+    if args.modelo:
+        with open(args.modelo, encoding='utf-8') as archivo:
+            modelo = json.load(archivo)
+    inicio = time.perf_counter()
+    resultado = monte_carlo(modelo, args.muestras, semilla=args.semilla, workers=args.workers,
+                            tamano_bloque=args.bloque, percentiles=args.percentiles)
+    segundos = time.perf_counter() - inicio
+    write_percentiles_csv(args.output, resultado)
+    fracciones = ", ".join(f"{s} {f:.1%}" for s, f in resultado['fraccion_suelos'].items() if f > 0)
+    print(f"{resultado['muestras']} realizaciones en {segundos:.2f} s · suelos: {fracciones}", file=sys.stderr)
+    return 0
@@ -0,0 +1,36 @@
+import time
+
+import pytest
+
+
+class RaizFalsa:
+    """Sustituto de la ventana de Tk: guarda los root.after y los ejecuta al procesar."""
+
+    def __init__(self):
+        self.pendientes = []
+
+    def after(self, ms, func, *args):
+        self.pendientes.append((func, args))
+        return len(self.pendientes)
+
+    def after_cancel(self, identificador):
+        pass
+
+    def procesar(self):
+        pendientes, self.pendientes = self.pendientes, []
+        for func, args in pendientes:
+            func(*args)
+
+    def esperar(self, job, timeout=10.0):
+        """Atiende el bucle de eventos hasta que job termine."""
+        limite = time.monotonic() + timeout
+        while not job.terminado:
+            if time.monotonic() > limite:
+                raise TimeoutError(job.descripcion)
+            self.procesar()
+            time.sleep(0.005)
+
+
+@pytest.fixture
+def raiz():
+    return RaizFalsa()
@@ -0,0 +1,80 @@
+"""Salidas JSONL y CSV de 'espectro-nec batch' frente al cálculo escalar."""
+
+import csv
+import json
+
+import numpy as np
+import pytest
+
+from espectro_nec.batch import COLUMNAS, COLUMNAS_ESCALARES, run_batch
+from espectro_nec.seismic_calculations import REGIONES, DesignSpectrum, calculate_spectrum
+
+FILAS = [
+    {'id': 'A', 'zone': 'V', 'soil': 'D', 'region': REGIONES[0], 'rFactor': 8, 'importance': 1.0},
+    {'id': 'B', 'zona_sismica': 'II', 'tipo_suelo': 'E', 'region': REGIONES[1], 'r': 5, 'i': 1.3,
+     'phi_p': 0.9, 'phi_e': 0.9},
+    {'id': 'malo', 'zona_sismica': 'IX', 'tipo_suelo': 'D', 'region': REGIONES[0], 'r': 8, 'i': 1.0},
+    {'id': 'C', 'zona_sismica': 'VI', 'tipo_suelo': 'A', 'region': REGIONES[2], 'r': 3, 'i': 1.5},
+    {'id': 'cero', 'zona_sismica': 'V', 'tipo_suelo': 'D', 'region': REGIONES[0], 'r': 0, 'i': 1.0},
+]
+VALIDAS = ('A', 'B', 'C')
+
+
+@pytest.fixture
+def entrada(tmp_path):
+    path = tmp_path / 'proyectos.jsonl'
+    path.write_text(''.join(json.dumps(fila, ensure_ascii=False) + '\n' for fila in FILAS), encoding='utf-8')
+    return str(path)
+
+
+def _esperado(proyecto):
+    fila = next(f for f in FILAS if f['id'] == proyecto)
+    zona, suelo = fila.get('zona_sismica', fila.get('zone')), fila.get('tipo_suelo', fila.get('soil'))
+    R, I = fila.get('r', fila.get('rFactor')), fila.get('i', fila.get('importance'))
+    espectro = DesignSpectrum.from_labels(suelo, zona, fila['region'])
+    return calculate_spectrum(espectro.Z, espectro.Fa, espectro.Fd, espectro.Fs, espectro.eta, R, I,
+                              fila.get('phi_p', 1.0), fila.get('phi_e', 1.0), espectro.r)
+
+
+@pytest.mark.parametrize('workers', [0, 2])
+def test_jsonl(entrada, tmp_path, workers):
+    salida = tmp_path / 'resultados.jsonl'
+    resumen = run_batch(entrada, str(salida), workers=workers, chunk_size=2, progress=None)
+    assert (resumen['filas'], resumen['errores']) == (3, 2)
+
+    registros = [json.loads(linea) for linea in salida.read_text(encoding='utf-8').splitlines()]
+    assert [r['id'] for r in registros] == list(VALIDAS)
+    for registro in registros:
+        assert set(registro) == {*COLUMNAS, *COLUMNAS_ESCALARES, 'Sa', 'Si'}
+        _, Sa, _, Si, T0, Tc, TL = _esperado(registro['id'])
+        np.testing.assert_allclose(registro['Sa'], Sa, rtol=1e-14)
+        np.testing.assert_allclose(registro['Si'], Si, rtol=1e-14)
+        assert (registro['T0'], registro['Tc'], registro['TL']) == pytest.approx((T0, Tc, TL), rel=1e-14)
+
+
+def test_csv(entrada, tmp_path):
+    salida = tmp_path / 'resultados.csv'
+    run_batch(entrada, str(salida), workers=0, chunk_size=2, progress=None)
+    with open(salida, newline='', encoding='utf-8') as archivo:
+        encabezado, *filas = list(csv.reader(archivo))
+
+    T = _esperado('A')[0]
+    periodos = encabezado[len(COLUMNAS) + len(COLUMNAS_ESCALARES):]
+    assert periodos == [f"Si@{t:.4f}" for t in T]
+    assert [fila[0] for fila in filas] == list(VALIDAS)
+    for fila in filas:
+        Si = np.array(fila[-len(periodos):], dtype=np.float64)
+        np.testing.assert_allclose(Si, _esperado(fila[0])[3], rtol=1e-15)
+
+
+def test_errores_informados(entrada, tmp_path):
+    mensajes = []
+
+    class Flujo:
+        def write(self, texto):
+            mensajes.append(texto)
+
+    run_batch(entrada, str(tmp_path / 'resultados.jsonl'), workers=0, progress=Flujo())
+    texto = ''.join(mensajes)
+    assert 'Fila malo:' in texto and 'Fila cero:' in texto
+    assert 'Listo: 3 espectros, 2 errores' in texto
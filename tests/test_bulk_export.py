@@ -0,0 +1,87 @@
+"""Formatos de los archivos de función espectral y manifiesto del exportador masivo."""
+
+import hashlib
+import io
+import json
+import zipfile
+
+import numpy as np
+import pytest
+
+from espectro_nec.bulk_export import (
+    FORMATOS,
+    MANIFIESTO,
+    export_bundle_bytes,
+    format_csv,
+    format_etabs,
+    format_opensees,
+    format_sap2000,
+)
+from espectro_nec.seismic_calculations import GRAVEDAD, DesignSpectrum
+
+T = np.array([0.1, 0.5, 1.0, 2.0])
+SI = np.array([0.25, 0.3, 0.2125, 0.1])
+
+
+def test_etabs_agrega_periodo_cero():
+    lineas = format_etabs(T, SI).decode('ascii').splitlines()
+    assert lineas[0] == "Espectro Sismico"
+    datos = np.array([linea.split() for linea in lineas[1:]], dtype=float)
+    np.testing.assert_array_equal(datos[:, 0], [0.0, *T])
+    np.testing.assert_allclose(datos[:, 1], [SI[0], *SI], atol=5e-5)
+
+
+def test_etabs_sin_duplicar_periodo_cero():
+    lineas = format_etabs(np.concatenate(([0.0], T)), np.concatenate(([0.2], SI))).decode().splitlines()
+    assert len(lineas) == 1 + T.size + 1
+
+
+def test_sap2000_separado_por_tabuladores():
+    lineas = format_sap2000(T, SI).decode('ascii').splitlines()
+    assert lineas[0] == "Period\tAcceleration"
+    assert all(len(linea.split('\t')) == 2 for linea in lineas[1:])
+    assert lineas[1] == "0.000000\t0.250000"
+
+
+def test_opensees_serie_path():
+    texto = format_opensees(T, SI, nombre='Edificio A', etiqueta=3).decode('utf-8')
+    assert texto.startswith("# Espectro de diseño NEC: Edificio A\n")
+    assert f"timeSeries Path 3 -factor {GRAVEDAD} -time {{" in texto
+    tiempos = texto.split('-time {')[1].split('}')[0].split()
+    valores = texto.split('-values {')[1].split('}')[0].split()
+    np.testing.assert_allclose(np.array(tiempos, dtype=float), T)
+    np.testing.assert_allclose(np.array(valores, dtype=float), SI)
+
+
+def test_csv_columnas():
+    Sa = SI * 8
+    datos = np.loadtxt(io.StringIO(format_csv(T, SI, Sa=Sa).decode()), delimiter=',', skiprows=1)
+    assert format_csv(T, SI).startswith(b"T,Sa,Si\n")
+    np.testing.assert_allclose(datos, np.column_stack((T, Sa, SI)), atol=5e-7)
+
+
+@pytest.fixture
+def resultados():
+    espectro = DesignSpectrum.from_labels('D', 'V', 'Oriente', R=8)
+    malla = np.linspace(0, 4, 41)
+    return [{'id': 'Torre 1', 'T': malla, 'Sa': espectro.sa(malla), 'Si': espectro.si(malla), 'Z': espectro.Z},
+            {'id': 'Torre 1', 'T': malla, 'Sa': espectro.sa(malla), 'Si': espectro.si(malla) / 2}]
+
+
+def test_paquete_zip_con_manifiesto(resultados):
+    archivo = zipfile.ZipFile(io.BytesIO(export_bundle_bytes(resultados)))
+    manifiesto = json.loads(archivo.read(MANIFIESTO))
+    assert set(manifiesto['formatos']) == set(FORMATOS)
+    assert [caso['nombre'] for caso in manifiesto['casos']] == ['Torre_1', 'Torre_1_2']
+    assert manifiesto['casos'][0]['parametros'] == {'Z': resultados[0]['Z']}
+    for caso in manifiesto['casos']:
+        for formato, descripcion in caso['archivos'].items():
+            contenido = archivo.read(descripcion['ruta'])
+            assert descripcion['ruta'].endswith(FORMATOS[formato][0])
+            assert descripcion['bytes'] == len(contenido)
+            assert descripcion['sha256'] == hashlib.sha256(contenido).hexdigest()
+
+
+def test_formato_desconocido(resultados):
+    with pytest.raises(ValueError):
+        export_bundle_bytes(resultados, formatos=('etabs', 'staad'))
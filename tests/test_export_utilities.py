@@ -0,0 +1,59 @@
+"""Libro .xlsx en streaming: estructura del zip y valores no finitos."""
+
+import io
+import math
+import zipfile
+import xml.etree.ElementTree as ET
+
+import numpy as np
+
+from espectro_nec.export_utilities import SpectrumWorkbookWriter, _xlsx_celda
+
+NS = {'s': 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'}
+
+
+def _filas(libro, n):
+    hoja = ET.fromstring(libro.read(f'xl/worksheets/sheet{n}.xml'))
+    return [[c.findtext('s:v', namespaces=NS) for c in fila.findall('s:c', NS)]
+            for fila in hoja.iterfind('s:sheetData/s:row', NS)]
+
+
+def _libro(*resultados):
+    destino = io.BytesIO()
+    with SpectrumWorkbookWriter(destino) as libro:
+        for resultado in resultados:
+            libro.add(resultado)
+    return zipfile.ZipFile(io.BytesIO(destino.getvalue()))
+
+
+def test_celdas_no_finitas_vacias():
+    assert _xlsx_celda(float('nan')) == '<c/>'
+    assert _xlsx_celda(np.float64('inf')) == '<c/>'
+    assert _xlsx_celda(-math.inf) == '<c/>'
+    assert _xlsx_celda(None) == '<c/>'
+    assert _xlsx_celda(0.1) == '<c><v>0.1</v></c>'
+    assert _xlsx_celda('a<b') == '<c t="inlineStr"><is><t>a&lt;b</t></is></c>'
+
+
+def test_libro_con_valores_finitos_exactos():
+    T = np.linspace(0, 2, 7)
+    Sa = np.sqrt(T + 0.1)
+    libro = _libro({'id': 'A', 'T': T, 'Sa': Sa, 'Si': Sa / 3})
+    assert libro.testzip() is None
+    filas = _filas(libro, 1)
+    assert len(filas) == 1 + T.size
+    np.testing.assert_array_equal(np.array(filas[1:], dtype=np.float64),
+                                  np.column_stack((T, Sa, Sa, Sa / 3)))
+
+
+def test_libro_con_nan_e_infinito():
+    T = np.array([0.0, 0.5, 1.0])
+    Sa = np.array([1.0, np.nan, np.inf])
+    libro = _libro({'id': 'Raro', 'T': T, 'Sa': Sa, 'Si': -Sa}, {'T': T, 'Sa': T, 'Si': T})
+    filas = _filas(libro, 1)
+    assert filas[1:] == [['0.0', '1.0', '1.0', '-1.0'], ['0.5', None, None, None], ['1.0', None, None, None]]
+    # Cada fila conserva sus cuatro celdas para que las columnas no se desplacen
+    assert all(len(fila) == 4 for fila in filas)
+    # La hoja índice sigue siendo la última entrada escrita
+    assert len(_filas(libro, 3)) >= 3
+    assert b'name="Par' in libro.read('xl/workbook.xml')
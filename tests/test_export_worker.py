@@ -0,0 +1,91 @@
+"""Estados de la cola de exportaciones: cancelación, errores y cierre."""
+
+import threading
+
+import pytest
+
+from espectro_nec.export_worker import ExportWorker
+
+
+@pytest.fixture
+def worker(raiz):
+    worker = ExportWorker(raiz, on_update=lambda job: None, poll_ms=1)
+    yield worker
+    worker.shutdown(timeout=5)
+
+
+def _exportacion(escrito, seguir):
+    def exportar(destino, progreso):
+        progreso(0.5, "Escribiendo")
+        progreso(1.0, "Escrito")
+        escrito.set()
+        seguir.wait(5)
+        # Tras progreso(1.0) la cancelación ya no interrumpe el trabajo
+        progreso(1.0, "Cerrando")
+        return destino
+
+    return exportar
+
+
+def test_cancelar_tras_escribir_completa(raiz, worker):
+    escrito, seguir = threading.Event(), threading.Event()
+    job = worker.submit("Exportar", _exportacion(escrito, seguir), 'salida.txt')
+    assert escrito.wait(5)
+    worker.cancel(job)
+    seguir.set()
+    raiz.esperar(job)
+    assert (job.estado, job.resultado, job.progreso) == ('completado', 'salida.txt', 1.0)
+
+
+def test_cancelar_antes_de_escribir(raiz, worker):
+    iniciado, seguir = threading.Event(), threading.Event()
+
+    def exportar(progreso):
+        progreso(0.1, "Preparando")
+        iniciado.set()
+        seguir.wait(5)
+        progreso(0.5, "Escribiendo")
+        return 'no debe llegar'
+
+    job = worker.submit("Exportar", exportar)
+    en_cola = worker.submit("Otra", lambda progreso: 'tampoco')
+    assert iniciado.wait(5)
+    worker.cancel(job)
+    worker.cancel(en_cola)
+    seguir.set()
+    raiz.esperar(job)
+    raiz.esperar(en_cola)
+    assert (job.estado, job.resultado) == ('cancelado', None)
+    assert (en_cola.estado, en_cola.resultado) == ('cancelado', None)
+
+
+def test_error_y_orden(raiz, worker):
+    def falla(progreso):
+        raise OSError("disco lleno")
+
+    actualizaciones = []
+    worker.on_update = lambda job: actualizaciones.append((job.descripcion, job.estado))
+    primero = worker.submit("Falla", falla)
+    segundo = worker.submit("Bien", lambda x, progreso: x * 2, 21)
+    raiz.esperar(segundo)
+    assert (primero.estado, str(primero.error)) == ('error', "disco lleno")
+    assert segundo.resultado == 42
+    assert actualizaciones.index(('Falla', 'error')) < actualizaciones.index(('Bien', 'completado'))
+    assert worker.pendientes == []
+
+
+def test_shutdown_cancela_y_detiene_el_hilo(raiz):
+    worker = ExportWorker(raiz, on_update=lambda job: None, poll_ms=1)
+    iniciado = threading.Event()
+
+    def lenta(progreso):
+        iniciado.set()
+        while True:
+            progreso(0.5, "Esperando")
+            threading.Event().wait(0.01)
+
+    job = worker.submit("Lenta", lenta)
+    assert iniciado.wait(5)
+    worker.shutdown(timeout=5)
+    assert not worker._hilo.is_alive()
+    assert job.cancel_event.is_set()
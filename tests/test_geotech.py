@@ -0,0 +1,122 @@
+"""Paridad de geotech con validateBorehole, materialAtDepth y correlateLayer de geotech-engine.ts."""
+
+import math
+import random
+
+import numpy as np
+import pytest
+
+from espectro_nec.geotech import BoreholeSet, correlate_layers, material_at_depth, validate_boreholes
+
+USCS = ('GW', 'SP', 'SM', 'SC', 'ML', 'CL', 'CH', 'OH', 'PT')
+PROPIEDADES_WEB = {'gamma': 'gamma', 'cohesion': 'cohesion', 'friccion': 'friction',
+                   'permeabilidad': 'permeability', 'modulo': 'modulus'}
+
+
+# Traducción literal de las funciones del motor web, como referencia
+
+def validate_borehole_web(sondeo):
+    errores = []
+    if not sondeo['id'].strip():
+        errores.append("La perforacion requiere identificador.")
+    if sondeo['x'] is None or not math.isfinite(sondeo['x']):
+        errores.append(f"{sondeo['id'] or 'Sondeo'}: falta coordenada Este.")
+    if sondeo['y'] is None or not math.isfinite(sondeo['y']):
+        errores.append(f"{sondeo['id'] or 'Sondeo'}: falta coordenada Norte.")
+    if sondeo['finalDepth'] <= 0:
+        errores.append(f"{sondeo['id']}: profundidad final invalida.")
+    capas = sondeo['layers']
+    for indice, capa in enumerate(capas):
+        if capa['from'] < 0 or capa['to'] <= capa['from']:
+            errores.append(f"{sondeo['id']}, estrato {indice + 1}: intervalo invalido.")
+        if indice and abs(capa['from'] - capas[indice - 1]['to']) > .001:
+            errores.append(f"{sondeo['id']}: existe vacio o traslape entre estratos {indice} y {indice + 1}.")
+    if capas and capas[-1]['to'] > sondeo['finalDepth'] + .001:
+        errores.append(f"{sondeo['id']}: los estratos exceden la profundidad final.")
+    return errores
+
+
+def material_at_depth_web(sondeo, profundidad):
+    return next((k for k, capa in enumerate(sondeo['layers']) if capa['from'] <= profundidad <= capa['to']), None)
+
+
+def correlate_layer_web(capa):
+    n = max(0, capa['n2'] + capa['n3'])
+    cohesivo = capa['uscs'] in ("ML", "CL", "OL", "MH", "CH", "OH", "PT")
+    return {
+        'gamma': capa['gamma'] if capa['gamma'] > 0 else 16 + min(n, 30) * 0.12,
+        'cohesion': capa['cohesion'] if capa['cohesion'] > 0 else max(5, n * 2.5) if cohesivo else 0,
+        'friction': capa['friction'] if capa['friction'] > 0 else 22 if cohesivo else min(38, 27 + n * 0.3),
+        'permeability': capa['permeability'] if capa['permeability'] > 0 else 1e-8 if cohesivo else 1e-5,
+        'modulus': capa['modulus'] if capa['modulus'] > 0 else max(2, n * 2.5),
+    }
+
+
+def _sondeo(rng, numero, defectos):
+    espesores = [round(rng.uniform(0.5, 4.0), 2) for _ in range(rng.randint(0 if defectos else 1, 8))]
+    capas, tope = [], 0.0
+    for espesor in espesores:
+        capa = {
+            'from': tope, 'to': round(tope + espesor, 3), 'uscs': rng.choice(USCS),
+            'n2': rng.randint(0, 40), 'n3': rng.randint(0, 40),
+            **{nombre: rng.choice((0.0, round(rng.uniform(1, 30), 2))) for nombre in PROPIEDADES_WEB.values()},
+        }
+        capas.append(capa)
+        tope = capa['to']
+    sondeo = {'id': f"P-{numero}", 'x': rng.uniform(0, 500), 'y': rng.uniform(0, 500), 'elevation': 0.0,
+              'finalDepth': tope, 'waterDepth': None, 'layers': capas}
+    if defectos:
+        falla = rng.randrange(7)
+        if falla == 0:
+            sondeo['id'] = ' '
+        elif falla == 1:
+            sondeo['x'] = None
+        elif falla == 2:
+            sondeo['finalDepth'] = 0
+        elif falla == 3 and len(capas) > 1:
+            capas[1]['from'] += 0.3  # vacío entre estratos
+        elif falla == 4 and capas:
+            capas[-1]['to'] = capas[-1]['from']  # intervalo inválido
+        elif falla == 5 and capas:
+            sondeo['finalDepth'] -= 1.0  # estratos más profundos que el sondeo
+    return sondeo
+
+
+@pytest.fixture(scope='module')
+def sondeos_web():
+    rng = random.Random(2024)
+    return [_sondeo(rng, k, defectos=k % 2 == 1) for k in range(60)]
+
+
+def test_validacion_igual_a_validate_borehole(sondeos_web):
+    esperado = [mensaje for sondeo in sondeos_web for mensaje in validate_borehole_web(sondeo)]
+    assert esperado  # la muestra incluye sondeos con observaciones
+    assert validate_boreholes(BoreholeSet.from_records(sondeos_web)) == esperado
+
+
+def test_material_igual_a_material_at_depth(sondeos_web):
+    validos = [sondeo for sondeo in sondeos_web if not validate_borehole_web(sondeo)]
+    conjunto = BoreholeSet.from_records(validos)
+    profundidades = sorted({0.0, -0.5, 50.0, *np.linspace(0, 30, 121).tolist(),
+                            *(capa['to'] for sondeo in validos for capa in sondeo['layers'])})
+    estrato = material_at_depth(conjunto, np.arange(len(validos))[:, None], np.array(profundidades)[None, :])
+    for b, sondeo in enumerate(validos):
+        for j, profundidad in enumerate(profundidades):
+            local = material_at_depth_web(sondeo, profundidad)
+            assert estrato[b, j] == (-1 if local is None else conjunto.inicio[b] + local)
+
+
+def test_correlacion_igual_a_correlate_layer(sondeos_web):
+    capas = [capa for sondeo in sondeos_web for capa in sondeo['layers']]
+    propiedades = BoreholeSet.from_records(sondeos_web).correlated()
+    for k, capa in enumerate(capas):
+        esperado = correlate_layer_web(capa)
+        for nombre, nombre_web in PROPIEDADES_WEB.items():
+            assert propiedades[nombre][k] == esperado[nombre_web]
+
+
+def test_n_spt_faltante_cuenta_como_cero():
+    completo = correlate_layers(['SM', 'CL'], [0, 10], [5, 0])
+    faltante = correlate_layers(['SM', 'CL'], [np.nan, 10], [5, np.nan])
+    for nombre in completo:
+        np.testing.assert_array_equal(faltante[nombre], completo[nombre])
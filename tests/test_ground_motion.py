@@ -0,0 +1,57 @@
+"""Lectura de acelerogramas y espectros de respuesta con solución analítica."""
+
+import numpy as np
+import pytest
+
+from espectro_nec.ground_motion import read_accelerogram, record_spectrum, response_spectrum
+from espectro_nec.seismic_calculations import GRAVEDAD
+
+
+def test_escalon_sin_amortiguamiento():
+    # u(t) = (1 - cos ωt)/ω², con máximo 2/ω² en t = T/2 (múltiplo exacto de dt)
+    dt, periodos = 0.01, np.array([0.0, 0.5, 1.0])
+    resultado = response_spectrum(np.ones(301), dt, periodos, amortiguamientos=0.0)
+    np.testing.assert_allclose(resultado['PSA'][0], [1.0, 2.0, 2.0], rtol=1e-9)
+    omega = 2 * np.pi / periodos[1:]
+    np.testing.assert_allclose(resultado['Sd'][0, 1:], 2 / omega ** 2 * GRAVEDAD, rtol=1e-9)
+    np.testing.assert_allclose(resultado['PSV'][0, 1:], resultado['Sd'][0, 1:] * omega, rtol=1e-15)
+
+
+def test_escalon_amortiguado_y_bloques():
+    # Más pasos que PASOS_BLOQUE: el máximo cruza el borde de los bloques
+    dt, zeta, T = 0.001, 0.05, 2.2
+    resultado = response_spectrum(np.ones(3000), dt, [T], amortiguamientos=[0.0, zeta])
+    pico = 1 + np.exp(-zeta * np.pi / np.sqrt(1 - zeta ** 2))
+    np.testing.assert_allclose(resultado['PSA'][:, 0], [2.0, pico], rtol=1e-6)
+
+
+def test_leer_at2_y_dos_columnas(tmp_path):
+    at2 = tmp_path / 'registro.AT2'
+    at2.write_text("PEER NGA\nsismo de prueba\nACCELERATION TIME SERIES IN UNITS OF G\n"
+                   "NPTS=    5, DT=   .0100 SEC\n  .1000E-01 -.2000E-01  .3000E-01\n  .4000D-01 -.5000E-01\n")
+    acc, dt = read_accelerogram(str(at2))
+    assert dt == 0.01
+    np.testing.assert_array_equal(acc, [0.01, -0.02, 0.03, 0.04, -0.05])
+
+    columnas = tmp_path / 'registro.txt'
+    columnas.write_text("t (s), a (g)\n" + "".join(f"{k * 0.02:.2f}, {v}\n" for k, v in enumerate(acc)))
+    acc2, dt2 = read_accelerogram(str(columnas))
+    assert dt2 == pytest.approx(0.02)
+    np.testing.assert_array_equal(acc2, acc)
+
+    resultado = record_spectrum(str(at2), periodos=[0.0, 0.5], escala=2.0)
+    assert resultado['nombre'] == 'registro'
+    assert resultado['PGA'] == pytest.approx(0.1)
+    assert resultado['PSA'][0, 0] == pytest.approx(0.1)
+
+
+def test_errores_de_lectura(tmp_path):
+    corto = tmp_path / 'corto.AT2'
+    corto.write_text("a\nb\nc\nNPTS= 4, DT= 0.01\n0.1 0.2\n")
+    with pytest.raises(ValueError):
+        read_accelerogram(str(corto))
+    una = tmp_path / 'una.txt'
+    una.write_text("0.1\n0.2\n")
+    with pytest.raises(ValueError):
+        read_accelerogram(str(una))
+    np.testing.assert_array_equal(read_accelerogram(str(una), dt=0.01)[0], [0.1, 0.2])
@@ -0,0 +1,73 @@
+"""Fuerza lateral equivalente frente a la evaluación escalar del espectro."""
+
+import numpy as np
+import pytest
+
+from espectro_nec.lateral_force import (
+    building_category,
+    compute_chunk,
+    compute_inventory,
+    distribution_exponent,
+    vertical_distribution,
+)
+from espectro_nec.seismic_calculations import REGIONES, DesignSpectrum
+
+EDIFICIOS = {
+    'sistema': ['rc-frame', 'steel-braced', 'masonry'],
+    'altura': [9.0, 42.0, 6.0],
+    'pisos': np.array([3, 14, 2]),
+    'peso': [1500.0, 24000.0, 600.0],
+    'zona': ['V', 'IV', 'VI'],
+    'suelo': ['D', 'C', 'F'],
+    'region': [REGIONES[0], REGIONES[1], REGIONES[2]],
+    'R': [8, 7, 3],
+    'I': [1.0, 1.3, 1.0],
+}
+
+
+@pytest.fixture(scope='module')
+def resultado():
+    return compute_inventory(*EDIFICIOS.values())
+
+
+def test_cortante_basal(resultado):
+    for b in range(3):
+        suelo = 'E' if EDIFICIOS['suelo'][b] == 'F' else EDIFICIOS['suelo'][b]
+        espectro = DesignSpectrum.from_labels(suelo, EDIFICIOS['zona'][b], EDIFICIOS['region'][b])
+        T = resultado['Ct'][b] * EDIFICIOS['altura'][b] ** resultado['alpha'][b]
+        assert resultado['T'][b] == pytest.approx(T, rel=1e-15)
+        assert resultado['Sa'][b] == pytest.approx(espectro.sa(T, exacto=True), rel=1e-12)
+        V = EDIFICIOS['I'][b] * resultado['Sa'][b] / EDIFICIOS['R'][b] * EDIFICIOS['peso'][b]
+        assert resultado['V'][b] == pytest.approx(V, rel=1e-15)
+    assert resultado['requiere_estudio_sitio'].tolist() == [False, False, True]
+
+
+def test_distribucion_vertical(resultado):
+    inicio, Fx = resultado['inicio'], resultado['Fx']
+    assert inicio.tolist() == [0, 3, 17, 19]
+    np.testing.assert_allclose(np.add.reduceat(Fx, inicio[:-1]), resultado['V'], rtol=1e-14)
+    # Las fuerzas crecen con la altura dentro de cada edificio
+    for b in range(3):
+        assert np.all(np.diff(Fx[inicio[b]:inicio[b + 1]]) > 0)
+
+
+def test_exponente_y_distribucion_uniforme():
+    np.testing.assert_allclose(distribution_exponent([0.2, 0.5, 1.5, 2.5, 4.0]), [1.0, 1.0, 1.5, 2.0, 2.0])
+    inicio, Cvx, Fx = vertical_distribution([4], [1.0], [100.0])
+    np.testing.assert_allclose(Cvx, np.arange(1, 5) / 10, rtol=1e-15)
+    np.testing.assert_allclose(Fx, np.arange(1, 5) * 10.0, rtol=1e-15)
+
+
+def test_categoria():
+    assert building_category([2, 3, 4, 10, 11, 25]).tolist() == [0, 0, 1, 1, 2, 3]
+    assert building_category([2, 2, 2], [np.nan, 900, 9000]).tolist() == [0, 1, 3]
+
+
+def test_bloque_con_filas_invalidas():
+    fila = {'id': 'A', 'sistema': 'rc-frame', 'altura': 9, 'pisos': 3, 'peso': 1500, 'zona_sismica': 'V',
+            'tipo_suelo': 'D', 'region': REGIONES[0], 'r': 8, 'i': 1.0, 'phi_p': 1.0, 'phi_e': 1.0}
+    filas = [fila, {**fila, 'id': 'B', 'sistema': 'madera'}, {**fila, 'id': 'C', 'pisos': 2.5}]
+    bloque = compute_chunk(filas)
+    assert [f['id'] for f in bloque['filas']] == ['A']
+    assert [fila_id for fila_id, _ in bloque['errores']] == ['B', 'C']
+    assert bloque['V'].shape == (1,)
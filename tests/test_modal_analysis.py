@@ -0,0 +1,70 @@
+"""Ordenadas modales y combinaciones SRSS y CQC."""
+
+import numpy as np
+import pytest
+
+from espectro_nec.modal_analysis import (
+    combine_cqc,
+    combine_srss,
+    cqc_correlation,
+    modal_analysis,
+    spectral_ordinates,
+)
+from espectro_nec.seismic_calculations import GRAVEDAD, REGIONES, DesignSpectrum, calculate_spectrum
+
+
+def test_correlacion_cqc():
+    rho = cqc_correlation([1.0, 0.95, 0.1])
+    np.testing.assert_allclose(np.diag(rho), 1.0, rtol=1e-15)
+    np.testing.assert_allclose(rho, rho.T, rtol=1e-12)
+    assert rho[0, 1] > 0.5
+    assert rho[0, 2] < 1e-3
+
+
+def test_cqc_igual_a_srss_con_modos_separados():
+    respuestas = np.array([[3.0, -1.0], [2.0, 4.0], [-0.5, 0.25]])
+    rho = cqc_correlation([2.0, 0.2, 0.02])
+    np.testing.assert_allclose(combine_cqc(respuestas, rho), combine_srss(respuestas), rtol=1e-3)
+    np.testing.assert_allclose(combine_srss(respuestas), np.sqrt((respuestas ** 2).sum(axis=0)), rtol=1e-15)
+
+
+def test_cqc_suma_absoluta_con_modos_iguales():
+    respuestas = np.array([[3.0], [2.0]])
+    np.testing.assert_allclose(combine_cqc(respuestas, cqc_correlation([0.5, 0.5])), [5.0], rtol=1e-14)
+
+
+def test_ordenadas_interpoladas_y_cerradas_coinciden():
+    espectro = DesignSpectrum.from_labels('D', 'V', REGIONES[0], 8, 1.3)
+    periodos = np.array([0.05, 0.3, 0.9, 2.5])
+    T, Sa, _, Si, *_ = calculate_spectrum(espectro.Z, espectro.Fa, espectro.Fd, espectro.Fs, espectro.eta,
+                                          8, 1.3, 1.0, 1.0, espectro.r)
+    cerradas = spectral_ordinates(periodos, espectro.si)
+    np.testing.assert_allclose(cerradas, espectro.si(periodos), rtol=1e-15)
+    np.testing.assert_allclose(spectral_ordinates(periodos, (T, Si)), cerradas, rtol=2e-3)
+    # Varios espectros sobre la misma malla
+    np.testing.assert_allclose(spectral_ordinates(periodos, (T, np.vstack((Si, 2 * Si))))[1],
+                               2 * np.interp(periodos, T, Si), rtol=1e-14)
+
+
+def test_analisis_modal():
+    espectro = DesignSpectrum.from_labels('D', 'V', REGIONES[0], 8, 1.3)
+    periodos = np.array([1.2, 0.4, 0.15])
+    factores = np.array([1.3, -0.45, 0.15])
+    formas = np.array([[0.3, 0.7, 1.0], [-0.8, -0.6, 1.0], [1.0, -0.9, 0.5]])
+    masas = np.array([0.8, 0.12, 0.05])
+
+    resultado = modal_analysis(periodos, factores, espectro.si, formas, masas, peso=1000.0)
+    Sa = espectro.si(periodos)
+    Sd = Sa * GRAVEDAD * (periodos / (2 * np.pi)) ** 2
+    np.testing.assert_allclose(resultado['Sd'], Sd, rtol=1e-15)
+    np.testing.assert_allclose(resultado['desplazamientos_modales'], (factores * Sd)[:, None] * formas, rtol=1e-15)
+    np.testing.assert_allclose(resultado['cortantes_modales'], masas * 1000.0 * Sa, rtol=1e-15)
+    assert resultado['cortante_cqc'] >= resultado['cortantes_modales'].max()
+    assert np.all(resultado['desplazamientos_cqc'] > 0)
+
+
+def test_analisis_modal_valida_entradas():
+    with pytest.raises(ValueError):
+        modal_analysis([1.0, 0.0], [1.0, 0.5], lambda T: np.ones_like(T))
+    with pytest.raises(ValueError):
+        modal_analysis([1.0, 0.5], [1.0], lambda T: np.ones_like(T))
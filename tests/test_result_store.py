@@ -0,0 +1,99 @@
+"""Ida y vuelta del almacén .nec escrito por 'espectro-nec batch'."""
+
+import csv
+import os
+
+import numpy as np
+import pytest
+
+from espectro_nec.batch import run_batch
+from espectro_nec.result_store import EXTENSION, ResultStore, ResultStoreWriter
+from espectro_nec.seismic_calculations import REGIONES, DesignSpectrum, calculate_spectrum
+
+FILAS = [
+    {'id': 'A-1', 'zona_sismica': 'V', 'tipo_suelo': 'D', 'region': REGIONES[0], 'r': 8, 'i': 1.0,
+     'phi_p': 0.9, 'phi_e': 0.9},
+    {'id': 'Bloque ñ', 'zona_sismica': 'II', 'tipo_suelo': 'E', 'region': REGIONES[1], 'r': 5, 'i': 1.3,
+     'phi_p': 1.0, 'phi_e': 0.9},
+    {'id': '', 'zona_sismica': 'VI', 'tipo_suelo': 'A', 'region': REGIONES[2], 'r': 3, 'i': 1.5,
+     'phi_p': 1.0, 'phi_e': 1.0},
+]
+
+
+@pytest.fixture
+def entrada(tmp_path):
+    path = tmp_path / 'proyectos.csv'
+    with open(path, 'w', newline='', encoding='utf-8') as archivo:
+        escritor = csv.DictWriter(archivo, fieldnames=list(FILAS[0]))
+        escritor.writeheader()
+        escritor.writerows(FILAS)
+    return str(path)
+
+
+def _esperado(fila):
+    espectro = DesignSpectrum.from_labels(fila['tipo_suelo'], fila['zona_sismica'], fila['region'])
+    return calculate_spectrum(espectro.Z, espectro.Fa, espectro.Fd, espectro.Fs, espectro.eta, fila['r'],
+                              fila['i'], fila['phi_p'], fila['phi_e'], espectro.r)
+
+
+def test_ida_y_vuelta_float64(entrada, tmp_path):
+    salida = str(tmp_path / f'resultados{EXTENSION}')
+    resumen = run_batch(entrada, salida, workers=0, chunk_size=2, progress=None)
+    assert resumen['filas'] == len(FILAS)
+
+    with ResultStore(salida) as store:
+        assert len(store) == len(FILAS)
+        assert store.Sa.dtype == np.float64
+        for k, fila in enumerate(FILAS):
+            esperado = _esperado(fila)
+            np.testing.assert_array_equal(store.T, esperado.T)
+            np.testing.assert_array_equal(store.Sa[k], esperado.Sa)
+            np.testing.assert_array_equal(store.Si[k], esperado.Si)
+            resultado = store[k]
+            for clave in ('zona_sismica', 'tipo_suelo', 'region'):
+                assert resultado[clave] == fila[clave]
+            assert (resultado['r'], resultado['i'], resultado['phi_p'], resultado['phi_e']) == (
+                fila['r'], fila['i'], fila['phi_p'], fila['phi_e'])
+            assert (resultado['T0'], resultado['Tc'], resultado['TL']) == (esperado.T0, esperado.Tc, esperado.TL)
+        assert store.ids[:2] == ['A-1', 'Bloque ñ']
+        np.testing.assert_array_equal(store.column('tipo_suelo'), [fila['tipo_suelo'] for fila in FILAS])
+        assert store.Se is store.Sa
+
+
+def test_ida_y_vuelta_float32(entrada, tmp_path):
+    salida = str(tmp_path / f'resultados{EXTENSION}')
+    run_batch(entrada, salida, workers=0, progress=None, precision='float32')
+    with ResultStore(salida) as store:
+        assert store.Si.dtype == np.float32
+        assert store.T.dtype == np.float64
+        np.testing.assert_array_equal(store.Si[1], _esperado(FILAS[1]).Si.astype(np.float32))
+
+
+def _columnas(n):
+    return {nombre: np.zeros(n) for nombre in ('zona_sismica', 'tipo_suelo', 'region', 'r', 'i', 'phi_p',
+                                               'phi_e', 'Z', 'eta', 'Fa', 'Fd', 'Fs', 'r_caida', 'T0', 'Tc', 'TL')}
+
+
+def test_identificador_faltante_queda_vacio(tmp_path):
+    salida = str(tmp_path / f'ids{EXTENSION}')
+    T = np.linspace(0, 1, 3)
+    with ResultStoreWriter(salida) as writer:
+        writer.append(T, np.ones((2, 3)), np.ones((2, 3)), _columnas(2), ['x', None])
+    with ResultStore(salida) as store:
+        assert store.ids == ['x', '']
+
+
+def test_escritura_interrumpida_no_deja_archivo(tmp_path):
+    salida = str(tmp_path / f'parcial{EXTENSION}')
+    with pytest.raises(RuntimeError):
+        with ResultStoreWriter(salida) as writer:
+            writer.append(np.linspace(0, 1, 3), np.ones((1, 3)), np.ones((1, 3)), _columnas(1), ['x'])
+            raise RuntimeError("fallo del lote")
+    assert not os.path.exists(salida)
+
+
+def test_rechaza_archivo_ajeno(tmp_path):
+    path = tmp_path / f'otro{EXTENSION}'
+    path.write_bytes(b'no es un almacen' * 4)
+    with pytest.raises(ValueError):
+        ResultStore(str(path))
@@ -0,0 +1,88 @@
+"""Paridad bit a bit del cálculo vectorizado con el camino escalar (calculate_spectrum y DesignSpectrum)."""
+
+import itertools
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from espectro_nec.seismic_calculations import (
+    REGION_CODIGOS,
+    REGIONES,
+    SUELO_CODIGOS,
+    SUELOS,
+    ZONA_CODIGOS,
+    ZONAS,
+    DesignSpectrum,
+    calculate_parameters,
+    calculate_parameters_many,
+    calculate_spectrum,
+    calculate_spectrum_many,
+    encode_labels,
+)
+
+COMBINACIONES = list(itertools.product(SUELOS, ZONAS, REGIONES))
+FACTORES = (8.0, 1.3, 0.9, 0.9)
+
+
+@pytest.fixture(scope='module')
+def lote():
+    suelos, zonas, regiones = zip(*COMBINACIONES)
+    parametros, eta, Z = calculate_parameters_many(encode_labels(suelos, SUELO_CODIGOS),
+                                                   encode_labels(zonas, ZONA_CODIGOS),
+                                                   encode_labels(regiones, REGION_CODIGOS))
+    return calculate_spectrum_many(Z, parametros['Fa'], parametros['Fd'], parametros['Fs'], eta, *FACTORES,
+                                   parametros['r'])
+
+
+def test_parametros_vectorizados_igual_a_escalares():
+    suelos, zonas, regiones = zip(*COMBINACIONES)
+    parametros, eta, Z = calculate_parameters_many(encode_labels(suelos, SUELO_CODIGOS),
+                                                   encode_labels(zonas, ZONA_CODIGOS),
+                                                   encode_labels(regiones, REGION_CODIGOS))
+    for k, (suelo, zona, region) in enumerate(COMBINACIONES):
+        escalares, eta_k, Z_k = calculate_parameters(suelo, zona, region)
+        assert (eta_k, Z_k) == (eta[k], Z[k])
+        assert escalares == {clave: valor[k] for clave, valor in parametros.items()}
+
+
+def test_lote_igual_a_calculate_spectrum(lote):
+    T, Sa, Se, Si, T0, Tc, TL = lote
+    for k, (suelo, zona, region) in enumerate(COMBINACIONES):
+        espectro = DesignSpectrum.from_labels(suelo, zona, region, *FACTORES)
+        resultado = calculate_spectrum(espectro.Z, espectro.Fa, espectro.Fd, espectro.Fs, espectro.eta,
+                                       *FACTORES, espectro.r)
+        np.testing.assert_array_equal(resultado.T, T)
+        np.testing.assert_array_equal(resultado.Sa, Sa[k])
+        np.testing.assert_array_equal(resultado.Se, Se[k])
+        np.testing.assert_array_equal(resultado.Si, Si[k])
+        assert (resultado.T0, resultado.Tc, resultado.TL) == (T0[k], Tc[k], TL[k])
+
+
+def test_lote_igual_a_evaluacion_escalar(lote):
+    T, Sa, _, Si, _, _, _ = lote
+    for k, (suelo, zona, region) in enumerate(COMBINACIONES):
+        espectro = DesignSpectrum.from_labels(suelo, zona, region, *FACTORES)
+        np.testing.assert_array_equal([espectro.sa(t) for t in T.tolist()], Sa[k])
+        np.testing.assert_array_equal([espectro.si(t) for t in T.tolist()], Si[k])
+        np.testing.assert_array_equal(espectro.sa(T, exacto=True), Sa[k])
+
+
+def test_float32_cercano_a_float64(lote):
+    T, Sa, _, _, _, _, _ = lote
+    parametros, eta, Z = calculate_parameters('E', 'V', REGIONES[0])
+    k = COMBINACIONES.index(('E', 'V', REGIONES[0]))
+    _, Sa32, _, _, _, _, _ = calculate_spectrum_many(Z, parametros['Fa'], parametros['Fd'], parametros['Fs'], eta,
+                                                     *FACTORES, parametros['r'], T=T, dtype=np.float32)
+    assert Sa32.dtype == np.float32
+    np.testing.assert_allclose(Sa32[0], Sa[k], rtol=1e-5)
+
+
+def test_importable_fuera_del_paquete():
+    # Espectro_NEC.py importa el motor como módulo suelto desde la carpeta del paquete
+    carpeta = os.path.join(os.path.dirname(__file__), '..', 'src', 'espectro_nec')
+    proceso = subprocess.run([sys.executable, '-c', 'import seismic_calculations'], cwd=carpeta,
+                             capture_output=True, text=True)
+    assert proceso.returncode == 0, proceso.stderr
@@ -0,0 +1,48 @@
+"""Barridos de sensibilidad y su exportación desde la cola de la interfaz."""
+
+import csv
+
+import numpy as np
+import pytest
+
+from espectro_nec.export_worker import ExportWorker
+from espectro_nec.seismic_calculations import DesignSpectrum
+from espectro_nec.sensitivity import parameter_sweep, write_sweep
+
+
+@pytest.fixture(scope='module')
+def resultado():
+    return parameter_sweep(suelo='D', zona=['IV', 'V'], R=[3, 5, 8], I=1.3, phi_p=0.9, phi_e=1.0,
+                           periodos=np.array([0.5, 1.0]))
+
+
+def test_barrido_igual_a_design_spectrum(resultado):
+    assert resultado['ejes'] == ('zona', 'R')
+    for i, zona in enumerate(resultado['valores']['zona'].tolist()):
+        for j, R in enumerate(resultado['valores']['R'].tolist()):
+            espectro = DesignSpectrum.from_labels('D', zona, resultado['fijos']['region'], R, 1.3, 0.9, 1.0)
+            np.testing.assert_allclose(resultado['Si'][i, j], espectro.si(resultado['periodos']), rtol=1e-15)
+
+
+@pytest.mark.parametrize('extension', ['.csv', '.npz'])
+def test_exportacion_desde_export_worker(raiz, tmp_path, resultado, extension):
+    path = tmp_path / f'barrido{extension}'
+    actualizaciones = []
+    worker = ExportWorker(raiz, actualizaciones.append)
+    try:
+        job = worker.submit("Barrido", write_sweep, str(path), resultado)
+        raiz.esperar(job)
+    finally:
+        worker.shutdown(timeout=5)
+    assert job.estado == 'completado', job.error
+    assert actualizaciones[-1].progreso == 1.0
+
+    n_puntos = resultado['meseta'].size
+    if extension == '.npz':
+        with np.load(path) as datos:
+            np.testing.assert_array_equal(datos['Si'], resultado['Si'])
+    else:
+        with open(path, newline='', encoding='utf-8') as archivo:
+            filas = [fila for fila in csv.reader(archivo) if not fila[0].startswith('#')]
+        assert filas[0] == ['zona', 'R', 'Si_T0.5', 'Si_T1', 'Si_meseta']
+        assert len(filas) == 1 + n_puntos
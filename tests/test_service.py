@@ -0,0 +1,101 @@
+"""Respuestas de error, ETag y Content-Length del servicio HTTP."""
+
+import asyncio
+import json
+
+import pytest
+
+from espectro_nec.seismic_calculations import REGIONES
+from espectro_nec.service import SpectrumService, _etag_coincide
+
+ENTRADA = {'zone': 'V', 'soil': 'D', 'region': REGIONES[0], 'rFactor': 8, 'importance': 1.3}
+CONSULTA = '/spectrum?zone=V&soil=D&region=Costa+%28Excepto+Esmeralda%29&rFactor=8&importance=1.3'
+
+
+async def _enviar(port, peticion):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    try:
+        writer.write(peticion)
+        await writer.drain()
+        encabezado = (await reader.readuntil(b'\r\n\r\n')).decode('latin-1')
+        encabezados = {}
+        for linea in encabezado.split('\r\n')[1:]:
+            if ':' in linea:
+                nombre, _, valor = linea.partition(':')
+                encabezados[nombre.strip().lower()] = valor.strip()
+        cuerpo = await reader.readexactly(int(encabezados.get('content-length', 0)))
+        return int(encabezado.split(' ', 2)[1]), encabezados, cuerpo
+    finally:
+        writer.close()
+
+
+def _peticion(metodo, ruta, cuerpo=b'', largo=None, extra=''):
+    largo = len(cuerpo) if largo is None else largo
+    return (f"{metodo} {ruta} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {largo}\r\n{extra}"
+            "Connection: close\r\n\r\n").encode() + cuerpo
+
+
+@pytest.fixture
+def pedir():
+    """Atiende cada lista de peticiones con un servicio recién iniciado en un puerto libre."""
+
+    def pedir(*peticiones):
+        async def sesion():
+            servicio = SpectrumService(cache_bytes=1024 * 1024)
+            _, port = await servicio.start('127.0.0.1', 0)
+            try:
+                return [await _enviar(port, peticion) for peticion in peticiones]
+            finally:
+                await servicio.close()
+
+        return asyncio.run(sesion())
+
+    return pedir
+
+
+@pytest.mark.parametrize('cuerpo', [b'[]', b'[{"zone": "V"}]', b'5', b'"etabs"', b'true'])
+def test_exportar_cuerpo_no_objeto_es_400(pedir, cuerpo):
+    [(estado, _, datos)] = pedir(_peticion('POST', '/export', cuerpo))
+    assert estado == 400
+    assert 'error' in json.loads(datos)
+
+
+def test_exportar_objeto_valido(pedir):
+    cuerpo = json.dumps({**ENTRADA, 'format': 'etabs'}).encode()
+    [(estado, encabezados, datos)] = pedir(_peticion('POST', '/export', cuerpo))
+    assert estado == 200
+    assert 'attachment' in encabezados['content-disposition']
+    assert datos
+
+
+@pytest.mark.parametrize('largo', ['-5', 'abc'])
+def test_content_length_invalido_es_400(pedir, largo):
+    [(estado, encabezados, datos)] = pedir(_peticion('POST', '/spectrum', largo=largo))
+    assert estado == 400
+    assert encabezados['connection'] == 'close'
+    assert json.loads(datos) == {'error': "Content-Length inválido."}
+
+
+def test_if_none_match_responde_304(pedir):
+    [(estado, encabezados, datos)] = pedir(_peticion('GET', CONSULTA))
+    assert estado == 200 and datos
+    etag = encabezados['etag']
+
+    respuestas = pedir(
+        _peticion('GET', CONSULTA, extra=f"If-None-Match: {etag}\r\n"),
+        _peticion('GET', CONSULTA, extra=f"If-None-Match: W/{etag}\r\n"),
+        _peticion('GET', CONSULTA, extra=f'If-None-Match: "otra", {etag}\r\n'),
+        _peticion('GET', CONSULTA, extra=f'If-None-Match: {etag[:-2]}"\r\n'),
+    )
+    assert [(estado, len(datos)) for estado, _, datos in respuestas[:3]] == [(304, 0)] * 3
+    assert respuestas[3][0] == 200
+
+
+def test_etag_coincide():
+    assert _etag_coincide('"abc"', '"abc"')
+    assert _etag_coincide('"abc"', 'W/"abc"')
+    assert _etag_coincide('"abc"', '"x", "abc"')
+    assert _etag_coincide('"abc"', '*')
+    assert not _etag_coincide('"abc"', '"ab"')
+    assert not _etag_coincide('"abc"', '"abcd"')
+    assert not _etag_coincide('"abc"', '')
@@ -0,0 +1,74 @@
+"""Contador de bytes de la caché SQLite: upserts, descarte LRU y archivos anteriores."""
+
+import sqlite3
+
+import numpy as np
+
+from espectro_nec.spectrum_cache import SpectrumCache
+
+
+def _espectro(n):
+    return np.linspace(0, 1, n), np.linspace(1, 0, n)
+
+
+def _suma_bytes(cache):
+    return cache._conexion.execute("SELECT COALESCE(SUM(bytes), 0) FROM espectros").fetchone()[0]
+
+
+def test_upsert_actualiza_el_contador():
+    with SpectrumCache(':memory:') as cache:
+        cache.put_many([('a', *_espectro(10)), ('b', *_espectro(20))])
+        assert cache.stats()['bytes'] == 2 * 8 * 30
+
+        # Reemplazar una clave con otro tamaño no debe dejar los bytes anteriores contados
+        cache.put_many([('a', *_espectro(50))])
+        stats = cache.stats()
+        assert stats['entradas'] == 2
+        assert stats['bytes'] == 2 * 8 * 70 == _suma_bytes(cache)
+        np.testing.assert_array_equal(cache.get_many(['a'])['a'][0], _espectro(50)[0])
+
+
+def test_descarte_respeta_max_bytes():
+    tamano = 2 * 8 * 100
+    with SpectrumCache(':memory:', max_bytes=10 * tamano) as cache:
+        for k in range(25):
+            cache.put_many([(f'clave-{k}', *_espectro(100))])
+            stats = cache.stats()
+            assert stats['bytes'] == _suma_bytes(cache) <= cache.max_bytes
+        # Se conservan las más recientes
+        assert 'clave-24' in cache.get_many(['clave-0', 'clave-24'])
+        assert 'clave-0' not in cache.get_many(['clave-0'])
+
+
+def test_clear_reinicia_el_contador():
+    with SpectrumCache(':memory:') as cache:
+        cache.put_many([('a', *_espectro(10))])
+        cache.clear()
+        assert cache.stats()['bytes'] == 0
+        cache.put_many([('b', *_espectro(5))])
+        assert cache.stats()['bytes'] == 2 * 8 * 5 == _suma_bytes(cache)
+
+
+def test_archivo_anterior_inicializa_el_contador(tmp_path):
+    path = str(tmp_path / 'anterior.sqlite')
+    conexion = sqlite3.connect(path)
+    conexion.executescript("""
+        CREATE TABLE espectros (clave TEXT PRIMARY KEY, sa BLOB NOT NULL, si BLOB NOT NULL,
+                                bytes INTEGER NOT NULL, usado REAL NOT NULL);
+        CREATE TABLE contadores (nombre TEXT PRIMARY KEY, valor INTEGER NOT NULL);
+        INSERT INTO contadores VALUES ('hits', 3), ('misses', 4);
+    """)
+    with conexion:
+        conexion.executemany("INSERT INTO espectros VALUES (?, ?, ?, ?, ?)",
+                             [('x', b'\0' * 80, b'\0' * 80, 160, 1.0), ('y', b'\0' * 40, b'\0' * 40, 80, 2.0)])
+    conexion.close()
+
+    with SpectrumCache(path) as cache:
+        stats = cache.stats()
+        assert (stats['bytes'], stats['entradas'], stats['hits_total']) == (240, 2, 3)
+        cache.put_many([('x', *_espectro(5))])
+        assert cache.stats()['bytes'] == 80 + 2 * 8 * 5
+
+    # Al reabrir, el contador persistido no se vuelve a sumar
+    with SpectrumCache(path) as cache:
+        assert cache.stats()['bytes'] == 80 + 2 * 8 * 5 == _suma_bytes(cache)
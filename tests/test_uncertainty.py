@@ -0,0 +1,28 @@
+"""El Monte Carlo depende solo de la semilla, del número de muestras y del tamaño de bloque."""
+
+import numpy as np
+import pytest
+
+from espectro_nec.uncertainty import MODELO_EJEMPLO, monte_carlo
+
+T = np.linspace(0, 4, 17)
+
+
+@pytest.fixture(scope='module')
+def referencia():
+    return monte_carlo(MODELO_EJEMPLO, n_muestras=12_000, T=T, semilla=7, workers=0, tamano_bloque=1_000)
+
+
+@pytest.mark.parametrize('workers', [2, 3])
+def test_independiente_del_numero_de_procesos(referencia, workers):
+    resultado = monte_carlo(MODELO_EJEMPLO, n_muestras=12_000, T=T, semilla=7, workers=workers,
+                            tamano_bloque=1_000)
+    for clave in ('Sa', 'Si', 'media_Sa', 'media_Si'):
+        np.testing.assert_array_equal(resultado[clave], referencia[clave])
+    assert resultado['muestras'] == referencia['muestras'] == 12_000
+    assert resultado['fraccion_suelos'] == referencia['fraccion_suelos']
+
+
+def test_semilla_distinta_cambia_el_resultado(referencia):
+    resultado = monte_carlo(MODELO_EJEMPLO, n_muestras=12_000, T=T, semilla=8, workers=0, tamano_bloque=1_000)
+    assert not np.array_equal(resultado['media_Sa'], referencia['media_Sa'])